@@ -0,0 +1,88 @@
+"""Compares the memory and sort/filter time of OutlookCalendarEntry lists, CompactCalendarEntry lists and EventBatch.
+
+The entries are a year of a synthetic calendar read through the fake COM objects.
+Run with: python -m benchmarks.bench_entry_layouts
+"""
+import datetime
+import gc
+import time
+import tracemalloc
+from typing import Any, Callable, List, Tuple
+
+from tests.fakes.outlook import install_fake_win32com
+from tests.fakes.synthetic import generate_fake_namespace
+
+install_fake_win32com()
+
+from utils.outlook_reader.calendar import read_local_outlook_calendar  # noqa: E402
+from utils.outlook_reader.constants import BUSY, OUT_OF_OFFICE  # noqa: E402
+from utils.outlook_reader.event_batch import EventBatch  # noqa: E402
+from utils.outlook_reader.outlook_event import CompactCalendarEntry  # noqa: E402
+
+
+def _traced(build: Callable[[], Any]) -> Tuple[Any, int]:
+    """Returns the result of $build and the memory it still holds (only what isn't shared with other objects)."""
+    gc.collect()
+    start_size, _ = tracemalloc.get_traced_memory()
+    ret = build()
+    gc.collect()
+    return ret, tracemalloc.get_traced_memory()[0] - start_size
+
+
+def _time(func: Callable[[], Any], repeat: int = 5) -> float:
+    start_t = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start_t) / repeat
+
+
+def main(n_events: int = 20000, days_ahead: int = 365) -> None:
+    calendar = generate_fake_namespace(n_events, days_ahead).GetDefaultFolder(9)
+    begin = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(days=30)
+    end = begin + datetime.timedelta(days=7)
+
+    # each layout is built from a fresh read, so none of them shares its strings with the original entries
+    tracemalloc.start()
+    entries, entries_size = _traced(lambda: read_local_outlook_calendar(calendar, days_ahead))
+    compact, compact_size = _traced(
+        lambda: [CompactCalendarEntry.from_entry(ent) for ent in read_local_outlook_calendar(calendar, days_ahead)]
+    )
+    batch, batch_size = _traced(lambda: EventBatch.from_entries(read_local_outlook_calendar(calendar, days_ahead)))
+    tracemalloc.stop()
+    assert batch.to_entries() == entries, "EventBatch should convert back to the same entries"
+
+    def _filter_list(ents: List[Any]) -> List[Any]:
+        return [
+            ent
+            for ent in ents
+            if ent.busystatus in (BUSY, OUT_OF_OFFICE) and begin <= ent.start_date and ent.end_date <= end
+        ]
+
+    for name, size, sort_func, filter_func in (
+        (
+            "OutlookCalendarEntry list",
+            entries_size,
+            lambda: sorted(entries, key=lambda ent: ent.start_date),
+            lambda: _filter_list(entries),
+        ),
+        (
+            "CompactCalendarEntry list",
+            compact_size,
+            lambda: sorted(compact, key=lambda ent: ent.start_date),
+            lambda: _filter_list(compact),
+        ),
+        (
+            "EventBatch",
+            batch_size,
+            batch.sorted_by_start,
+            lambda: batch.take(batch.with_busystatus(BUSY, OUT_OF_OFFICE) & batch.between(begin, end)),
+        ),
+    ):
+        print(
+            f"{name}: {len(entries)} entries, {size / 2 ** 20:.1f}MB, "
+            f"sort by start {_time(sort_func) * 1000:.1f}ms, filter a busy week {_time(filter_func) * 1000:.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Compares the QR payload of export_codec with the legacy str/eval format: size, QR version and encode/decode time.
+
+Run with: python -m benchmarks.bench_export_codec
+"""
+import time
+from typing import Callable, List, Sequence
+
+from qrcode import constants, QRCode
+
+from tests.fakes.synthetic import generate_entries
+from utils.outlook_reader.outlook_event import OutlookCalendarEntry
+from websites.export_codec import decode_entries, encode_entries
+from websites.export_utils import _encode_to_alphanumeric, import_from_clean_str, SPLIT_STR
+
+
+def _legacy_encode(entries: List[OutlookCalendarEntry]) -> str:
+    """export_entry_list_as_str() before export_codec, without the export name lookup."""
+    return SPLIT_STR.join(
+        _encode_to_alphanumeric(
+            str(
+                [
+                    ent.busystatus,
+                    ent.categories_colors[:1],
+                    ent.conversation_id,
+                    ent.end_date.isoformat(),
+                    ent.location,
+                    ent.start_date.isoformat(),
+                    ent.subject,
+                ]
+            )
+        )
+        for ent in entries
+    )
+
+
+def _legacy_decode(exported_str: str) -> List[OutlookCalendarEntry]:
+    return [import_from_clean_str(repr_s) for repr_s in exported_str.split(SPLIT_STR)]
+
+
+def _qr_version(payload: str) -> int:
+    qr = QRCode(error_correction=constants.ERROR_CORRECT_L)
+    qr.add_data(payload, optimize=0)
+    try:
+        qr.make(fit=True)
+    except ValueError:  # qrcode.exceptions.DataOverflowError, larger than a version 40 code
+        return -1
+    return int(qr.version)
+
+
+def _time_per_call(func: Callable[[], object], repeat: int = 20) -> float:
+    start_t = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start_t) / repeat
+
+
+def main(sizes: Sequence[int] = (10, 50, 200)) -> None:
+    for n_entries in sizes:
+        entries = generate_entries(n_entries)
+        legacy, compact = _legacy_encode(entries), encode_entries(entries)
+        assert decode_entries(compact) == entries, "codec round trip should keep the entries"
+        print(
+            f"{n_entries} entries: legacy {len(legacy)} chars (QR version {_qr_version(legacy)}), "
+            f"encode {_time_per_call(lambda: _legacy_encode(entries)):.4f}s, "
+            f"decode {_time_per_call(lambda: _legacy_decode(legacy)):.4f}s | "
+            f"codec {len(compact)} chars (QR version {_qr_version(compact)}), "
+            f"encode {_time_per_call(lambda: encode_entries(entries)):.4f}s, "
+            f"decode {_time_per_call(lambda: decode_entries(compact)):.4f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
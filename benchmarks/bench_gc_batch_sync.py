@@ -0,0 +1,47 @@
+"""Compares sync_outlook_events_with_gc() with its batched version against a fake calendar with network latency.
+
+Run with: python -m benchmarks.bench_gc_batch_sync
+"""
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+from benchmarks.temp_db import use_temp_db
+
+use_temp_db()
+
+from tests.fakes.google_calendar import FakeGoogleCalendar  # noqa: E402
+from utils.google_calendar.events import sync_outlook_events_with_gc, sync_outlook_events_with_gc_batched  # noqa: E402
+from utils.outlook_reader.constants import BUSY  # noqa: E402
+from utils.outlook_reader.outlook_event import OutlookCalendarEntry  # noqa: E402
+
+
+def _synthetic_entries(n: int) -> List[OutlookCalendarEntry]:
+    base = datetime(2022, 1, 2, 8, tzinfo=timezone(timedelta(hours=2)))
+    return [
+        OutlookCalendarEntry(
+            f"meeting {i}",
+            base + timedelta(minutes=30 * i),
+            base + timedelta(minutes=30 * i + 25),
+            busystatus=BUSY,
+            conversation_id=f"CONV{i}",
+        )
+        for i in range(n)
+    ]
+
+
+def main(n_events: int = 300, latency_s: float = 0.005) -> None:
+    for sync_func in (sync_outlook_events_with_gc, sync_outlook_events_with_gc_batched):
+        gc = FakeGoogleCalendar(latency_s=latency_s)
+        sync_func(gc, _synthetic_entries(n_events))  # first sync fills the calendar
+        gc.round_trips = 0
+        start_t = time.perf_counter()
+        stats = sync_func(gc, _synthetic_entries(n_events))
+        print(
+            f"{sync_func.__name__}: {n_events} events, {gc.round_trips} round trips, "
+            f"{time.perf_counter() - start_t:.2f}s, {stats}"
+        )
+
+
+if __name__ == "__main__":
+    main()
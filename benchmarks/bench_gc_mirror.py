@@ -0,0 +1,39 @@
+"""Round trips of refresh_mirror(): the first full sync, incremental ones and the full resync after a 410.
+
+Run with: python -m benchmarks.bench_gc_mirror
+"""
+from benchmarks.temp_db import use_temp_db
+
+use_temp_db()
+
+from benchmarks.bench_gc_batch_sync import _synthetic_entries  # noqa: E402
+from tests.fakes.google_calendar import FakeGoogleCalendar  # noqa: E402
+from utils.google_calendar.events import sync_outlook_events_with_gc_batched  # noqa: E402
+from utils.google_calendar.mirror import refresh_mirror, reset_mirror  # noqa: E402
+
+
+def main(n_events: int = 2000, n_deleted: int = 20) -> None:
+    gc = FakeGoogleCalendar("bench-mirror")
+    reset_mirror(gc.calendar)
+    entries = _synthetic_entries(n_events)
+    sync_outlook_events_with_gc_batched(gc, entries)  # fills the calendar, refreshes the mirror before that
+
+    def _delete_from_outlook() -> None:
+        # from the middle, the sync only deletes events in the range of the entries it's given
+        k = n_events // 2
+        stats = sync_outlook_events_with_gc_batched(gc, entries[:k] + entries[k + n_deleted :])
+        assert stats.deleted == n_deleted, f"{stats.deleted} events were deleted instead of {n_deleted}"
+
+    for title, prepare in (
+        ("full sync", lambda: reset_mirror(gc.calendar)),
+        (f"incremental sync after {n_deleted} deletions", _delete_from_outlook),
+        ("expired sync token", gc.expire_sync_tokens),
+    ):
+        prepare()
+        gc.round_trips = 0
+        n_listed = refresh_mirror(gc)
+        print(f"{title}: {n_listed} events listed, {gc.round_trips} round trips")
+
+
+if __name__ == "__main__":
+    main()
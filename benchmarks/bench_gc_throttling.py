@@ -0,0 +1,37 @@
+"""Syncs against a fake calendar that throttles a fraction of the calls, checks every entry still made it.
+
+Run with: python -m benchmarks.bench_gc_throttling
+"""
+import time
+
+from benchmarks.temp_db import use_temp_db
+
+use_temp_db()
+
+from benchmarks.bench_gc_batch_sync import _synthetic_entries  # noqa: E402
+from tests.fakes.google_calendar import FakeGoogleCalendar  # noqa: E402
+from utils.google_calendar.events import sync_outlook_events_with_gc, sync_outlook_events_with_gc_batched  # noqa: E402
+from utils.google_calendar.rate_limit import AdaptiveRateLimiter, RateLimitedGoogleCalendar, RetryPolicy  # noqa: E402
+
+
+def main(n_events: int = 200, throttle_rate: float = 0.2) -> None:
+    for sync_func in (sync_outlook_events_with_gc, sync_outlook_events_with_gc_batched):
+        for throttle_status in (403, 429, 503):
+            fake_gc = FakeGoogleCalendar(throttle_rate=throttle_rate, throttle_status=throttle_status)
+            limiter = AdaptiveRateLimiter(rate_per_s=500, max_rate_per_s=1000, min_rate_per_s=50)
+            gc = RateLimitedGoogleCalendar(fake_gc, limiter, RetryPolicy(max_retries=10, base_delay_s=0.001))
+            start_t = time.perf_counter()
+            stats = sync_func(gc, _synthetic_entries(n_events))
+
+            live_events = [e for e in fake_gc.events.values() if e.get("status") != "cancelled"]
+            assert len(live_events) == n_events, f"{len(live_events)} of {n_events} events were synced"
+            assert len(stats.failures) == 0, f"throttled calls weren't retried: {stats.failures}"
+            print(
+                f"{sync_func.__name__}, {throttle_status} on {throttle_rate:.0%} of the calls: "
+                f"{fake_gc.throttled_calls} throttled calls retried, {time.perf_counter() - start_t:.2f}s, "
+                f"limiter ended at {limiter.rate_per_s:.0f} calls/s"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""Compares the GetOccurrence calls of the local recurrence engine with probing every day since the pattern start.
+
+Run with: python -m benchmarks.bench_recurrence
+"""
+import datetime
+import time
+
+from tests.fakes.outlook import FakeRecurrencePattern
+from utils.outlook_reader.recurrence import iter_occurrence_dates, OL_RECURS_WEEKLY
+
+_MONDAY_MASK = 2
+
+
+def main(years_since_creation: int = 3, days_ahead: int = 7) -> None:
+    begin = datetime.date.today()
+    end = begin + datetime.timedelta(days=days_ahead)
+    pattern_start = datetime.datetime.combine(begin, datetime.time(10))
+    pattern_start -= datetime.timedelta(weeks=52 * years_since_creation)
+    rp = FakeRecurrencePattern(
+        RecurrenceType=OL_RECURS_WEEKLY,
+        PatternStartDate=pattern_start,
+        PatternEndDate=datetime.datetime(4501, 1, 1),
+        NoEndDate=True,
+        DayOfWeekMask=_MONDAY_MASK,
+        occurrence_dates=set(),
+    )
+
+    start_t = time.perf_counter()
+    occurrence_dates = list(iter_occurrence_dates(rp, begin, end))
+    print(
+        f"weekly meeting created {years_since_creation} years ago, {days_ahead} days read: "
+        f"{(end - pattern_start.date()).days} GetOccurrence calls when probing every day, "
+        f"{len(occurrence_dates)} with the local engine ({time.perf_counter() - start_t:.4f}s to compute)"
+    )
+
+
+if __name__ == "__main__":
+    main()
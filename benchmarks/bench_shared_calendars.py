@@ -0,0 +1,50 @@
+"""Reads 20 shared calendars from a fake namespace with COM latency, sequentially and on a worker pool.
+
+Run with: python -m benchmarks.bench_shared_calendars
+"""
+import datetime
+import time
+
+from tests.fakes.outlook import FakeAppointmentItem, FakeFolder, FakeNamespace, install_fake_win32com, SlowComProxy
+
+install_fake_win32com()
+
+from utils.outlook_reader.shared_calendars import read_outlook_calendars_concurrently  # noqa: E402
+
+
+def _fake_calendar(name: str, n_events: int) -> FakeFolder:
+    first_start = datetime.datetime.combine(datetime.date.today(), datetime.time(9), tzinfo=datetime.timezone.utc)
+    return FakeFolder(
+        name,
+        [
+            FakeAppointmentItem(
+                f"{name} meeting {i}",
+                first_start + datetime.timedelta(hours=3 * i),
+                first_start + datetime.timedelta(hours=3 * i + 1),
+                EntryID=f"{name}{i}",
+                ConversationID=f"{name}C{i}",
+            )
+            for i in range(n_events)
+        ],
+    )
+
+
+def main(n_calendars: int = 20, n_events: int = 20, latency_s: float = 0.001) -> None:
+    shared_calendars = [_fake_calendar(f"shared{i}", n_events) for i in range(n_calendars)]
+    namespace = FakeNamespace(
+        _fake_calendar("mine", n_events), folders=[FakeFolder("Shared Calendars", folders=shared_calendars)]
+    )
+    folder_paths = [["Shared Calendars", cal.Name] for cal in shared_calendars]
+
+    for max_workers in (1, 8):
+        proxy = SlowComProxy(namespace, latency_s)
+        start_t = time.perf_counter()
+        results = list(read_outlook_calendars_concurrently(folder_paths, 7, max_workers, lambda: proxy))
+        print(
+            f"{max_workers} workers: {sum(len(res.entries) for res in results)} entries from {len(results)} calendars, "
+            f"{sum(proxy.calls.values())} COM calls, {time.perf_counter() - start_t:.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
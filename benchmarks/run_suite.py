@@ -0,0 +1,180 @@
+"""Offline benchmark suite: reads, exports, QR codes and syncs of synthetic calendars of growing sizes.
+
+Outlook and Google Calendar are faked with a latency per call. The wall time and round trips (COM calls, HTTP
+requests) of every benchmark are written as JSON to benchmarks/results/<label>.json, to compare releases:
+    python -m benchmarks.run_suite --sizes 100 1000 10000 --label v1.2
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import time
+from typing import Any, Callable, Dict, List, Sequence
+
+import cv2
+import numpy as np
+
+from benchmarks.temp_db import use_temp_db
+from tests.fakes.outlook import install_fake_win32com, SlowComProxy
+from tests.fakes.synthetic import generate_fake_namespace
+
+install_fake_win32com()
+use_temp_db()
+
+from tests.fakes.google_calendar import FakeGoogleCalendar  # noqa: E402
+from utils.google_calendar.events import (  # noqa: E402
+    sync_outlook_events_with_gc,
+    sync_outlook_events_with_gc_batched,
+    sync_outlook_events_with_gc_streaming,
+)
+from utils.google_calendar.rate_limit import AdaptiveRateLimiter, RateLimitedGoogleCalendar  # noqa: E402
+from utils.outlook_reader.calendar import iter_local_outlook_calendar, read_local_outlook_calendar  # noqa: E402
+from utils.outlook_reader.outlook_event import OutlookCalendarEntry  # noqa: E402
+from utils.outlook_reader.table import read_local_outlook_calendar_table  # noqa: E402
+from utils.qr.generate import create_qr_pngs  # noqa: E402
+from utils.qr.read import read_qr_codes_from_frames, reassemble_qr_chunks  # noqa: E402
+from websites.export_codec import decode_entries, encode_entries  # noqa: E402
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+DAYS_AHEAD = 7
+
+
+def _timed(func: Callable[[], Any]) -> Dict[str, Any]:
+    start_t = time.perf_counter()
+    func()
+    return {"seconds": round(time.perf_counter() - start_t, 4)}
+
+
+def bench_outlook_read(n_events: int, com_latency_s: float) -> Dict[str, Any]:
+    """Reads the synthetic calendar with each reader, round trips are the COM calls made."""
+    results = {}
+    for reader in (read_local_outlook_calendar, read_local_outlook_calendar_table):
+        calendar = SlowComProxy(generate_fake_namespace(n_events, DAYS_AHEAD).GetDefaultFolder(9), com_latency_s)
+        entries: List[OutlookCalendarEntry] = []
+        results[reader.__name__] = _timed(lambda: entries.extend(reader(calendar, DAYS_AHEAD)))  # noqa: B023
+        results[reader.__name__].update(entries=len(entries), round_trips=sum(calendar.calls.values()))
+    return results
+
+
+def bench_export(entries: List[OutlookCalendarEntry]) -> Dict[str, Any]:
+    """export_codec without the export names lookup of websites.export_utils (which needs the streamlit secrets)."""
+    payload = encode_entries(entries)
+    results = {"encode": _timed(lambda: encode_entries(entries)), "decode": _timed(lambda: decode_entries(payload))}
+    results["encode"]["chars"] = len(payload)
+    return results
+
+
+def bench_qr(entries: List[OutlookCalendarEntry]) -> Dict[str, Any]:
+    payload = encode_entries(entries)
+    pngs: List[bytes] = []
+    results = {"generate": _timed(lambda: pngs.extend(create_qr_pngs([], payload)))}
+    results["generate"]["images"] = len(pngs)
+
+    frames = [_png_to_frame(png) for png in pngs]
+    read_payloads: List[str] = []
+
+    def _read() -> None:
+        codes = [code for res in read_qr_codes_from_frames(frames) for code in res.codes]
+        read_payloads.append(codes[0] if len(pngs) == 1 else reassemble_qr_chunks(codes))
+
+    results["read"] = _timed(_read)
+    assert read_payloads == [payload], "the QR codes should be read back to the exported payload"
+    return results
+
+
+def _png_to_frame(png: bytes) -> np.ndarray:
+    frame = cv2.imdecode(np.frombuffer(png, np.uint8), cv2.IMREAD_GRAYSCALE)
+    assert frame is not None, "create_qr_pngs() should return valid PNGs"
+    return frame
+
+
+def bench_gc_sync(entries: List[OutlookCalendarEntry], api_latency_s: float) -> Dict[str, Any]:
+    """First sync (inserts all the events) and a second one without changes, round trips are HTTP requests."""
+    results = {}
+    # a limiter that never paces the calls, the fake calendar doesn't throttle
+    limiter = AdaptiveRateLimiter(rate_per_s=1e6, max_rate_per_s=1e6, max_concurrency=64)
+    for sync_func in (
+        sync_outlook_events_with_gc,
+        sync_outlook_events_with_gc_batched,
+        sync_outlook_events_with_gc_streaming,
+    ):
+        fake_gc = FakeGoogleCalendar(f"bench-{sync_func.__name__}-{len(entries)}", latency_s=api_latency_s)
+        gc = RateLimitedGoogleCalendar(fake_gc, limiter)
+        for run in ("first", "unchanged"):
+            fake_gc.round_trips = 0
+            results[f"{sync_func.__name__}/{run}"] = _timed(lambda: sync_func(gc, entries))  # noqa: B023
+            results[f"{sync_func.__name__}/{run}"]["round_trips"] = fake_gc.round_trips
+    return results
+
+
+def bench_read_and_sync(n_events: int, com_latency_s: float, api_latency_s: float) -> Dict[str, Any]:
+    """Reads the synthetic calendar then syncs it, vs. the streaming sync which uploads while reading."""
+
+    def _read_then_sync(calendar: Any, gc: RateLimitedGoogleCalendar) -> None:
+        sync_outlook_events_with_gc_batched(gc, read_local_outlook_calendar(calendar, DAYS_AHEAD))
+
+    def _sync_streaming(calendar: Any, gc: RateLimitedGoogleCalendar) -> None:
+        sync_outlook_events_with_gc_streaming(gc, iter_local_outlook_calendar(calendar, DAYS_AHEAD))
+
+    results = {}
+    limiter = AdaptiveRateLimiter(rate_per_s=1e6, max_rate_per_s=1e6, max_concurrency=64)
+    for pipeline in (_read_then_sync, _sync_streaming):
+        calendar = SlowComProxy(generate_fake_namespace(n_events, DAYS_AHEAD).GetDefaultFolder(9), com_latency_s)
+        fake_gc = FakeGoogleCalendar(f"bench{pipeline.__name__}-{n_events}", latency_s=api_latency_s)
+        name = pipeline.__name__.lstrip("_")
+        results[name] = _timed(lambda: pipeline(calendar, RateLimitedGoogleCalendar(fake_gc, limiter)))  # noqa: B023
+        results[name].update(com_calls=sum(calendar.calls.values()), round_trips=fake_gc.round_trips)
+    return results
+
+
+def run_suite(sizes: Sequence[int], com_latency_s: float, api_latency_s: float) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    for n_events in sizes:
+        print(f"benchmarking {n_events} events")
+        entries = read_local_outlook_calendar(generate_fake_namespace(n_events, DAYS_AHEAD).GetDefaultFolder(9))
+        results[str(n_events)] = {
+            "outlook_read": bench_outlook_read(n_events, com_latency_s),
+            "export": bench_export(entries),
+            "qr": bench_qr(entries),
+            "gc_sync": bench_gc_sync(entries, api_latency_s),
+            "read_and_sync": bench_read_and_sync(n_events, com_latency_s, api_latency_s),
+        }
+    return results
+
+
+def _git_label() -> str:
+    try:
+        return subprocess.check_output(["git", "describe", "--always", "--dirty"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000], help="events per calendar")
+    parser.add_argument("--label", default=None, help="results file name, defaults to git describe")
+    parser.add_argument("--com-latency-ms", type=float, default=0.05, help="latency of every COM call")
+    parser.add_argument("--api-latency-ms", type=float, default=1.0, help="latency of every google calendar request")
+    parser.add_argument("--output-dir", default=RESULTS_DIR)
+    args = parser.parse_args()
+
+    label = _git_label() if args.label is None else args.label
+    report = {
+        "label": label,
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "com_latency_ms": args.com_latency_ms,
+        "api_latency_ms": args.api_latency_ms,
+        "results": run_suite(args.sizes, args.com_latency_ms / 1000, args.api_latency_ms / 1000),
+    }
+    os.makedirs(args.output_dir, exist_ok=True)
+    report_path = os.path.join(args.output_dir, f"{label}.json")
+    with open(report_path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"results written to {report_path}")
+
+
+if __name__ == "__main__":
+    main()
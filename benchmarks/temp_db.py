@@ -0,0 +1,20 @@
+"""Keeps the benchmarks out of the project's database."""
+import os
+import sys
+import tempfile
+
+
+def use_temp_db() -> str:
+    """Points the project's DB (the gc sync ledger and mirror) at a temporary file, unless OUTLOOK_EXPORTER_DB is set.
+
+    Keeps the benchmarks out of the project's database.db, call it before anything imports utils.config.
+    Returns:
+        Path of the DB the benchmark uses
+    """
+    db_path = os.environ.setdefault("OUTLOOK_EXPORTER_DB", os.path.join(tempfile.mkdtemp(), "benchmarks.db"))
+    config = sys.modules.get("utils.config")
+    if config is not None and config.DB_PATH != db_path:
+        raise RuntimeError(
+            f"utils.config was imported before use_temp_db(), the benchmark would write to {config.DB_PATH}"
+        )
+    return db_path
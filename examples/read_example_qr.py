@@ -2,12 +2,15 @@ import os
 
 import cv2
 
-from utils.qr.read import read_qr_from_ndarray
+from utils.qr.read import read_qr_codes_from_ndarray, read_qr_from_ndarray
 
 
-def read_qr_code(fname: str):
+def read_qr_code(fname: str) -> None:
     # read the QRCODE image
     image = cv2.imread(fname)
+    if image is None:
+        print(f"Couldn't read {fname}")
+        return
     data = read_qr_from_ndarray(image)
 
     if data is not None:
@@ -21,3 +24,17 @@ read_qr_code(os.path.join("qr_images", "qr_wild.png"))
 read_qr_code(os.path.join("qr_images", "qr_code.png"))
 read_qr_code(os.path.join("qr_images", "qr_code_diff_position.png"))
 # "multi_diff_r.png" - works with multi, "curved.png" - doesn't work with curved
+
+
+def read_all_qr_codes(fname: str) -> None:
+    image = cv2.imread(fname)
+    if image is None:
+        print(f"Couldn't read {fname}")
+        return
+    result = read_qr_codes_from_ndarray(image)
+    print(f"{len(result.codes)} QRCodes found at scale {result.scale} in {result.seconds:.3f}s:")
+    for data in result.codes:
+        print(data)
+
+
+read_all_qr_codes(os.path.join("qr_images", "multi_diff_r.png"))
@@ -1,8 +1,9 @@
 import win32com.client
 
-from utils.google_calendar.events import sync_outlook_events_with_gc
+from utils.google_calendar.events import sync_outlook_events_with_gc_streaming
 from utils.google_calendar.general import create_gc_object
-from utils.outlook_reader.calendar import read_local_outlook_calendar
+from utils.outlook_reader.calendar import iter_local_outlook_calendar
+from utils.profiling import profiling_from_env
 
 if __name__ == "__main__":
     Outlook = win32com.client.Dispatch("Outlook.Application")
@@ -13,7 +14,8 @@ if __name__ == "__main__":
     # get own calendar
     calendar = namespace.GetDefaultFolder(9)
     days_ahead = 7
-    entries = read_local_outlook_calendar(calendar, days_ahead=days_ahead)
-    gc = create_gc_object("primary")
+    with profiling_from_env():  # writes a profile report when OUTLOOK_EXPORTER_PROFILE is set
+        gc = create_gc_object("primary")
 
-    sync_outlook_events_with_gc(gc, entries)
+        # the entries are uploaded while the later ones are still read from outlook
+        sync_outlook_events_with_gc_streaming(gc, iter_local_outlook_calendar(calendar, days_ahead=days_ahead))
@@ -0,0 +1,22 @@
+import logging
+
+import win32com.client
+
+from utils.google_calendar.general import create_gc_object
+from utils.google_calendar.watch import watch_outlook_calendar
+from utils.profiling import profiling_from_env
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    Outlook = win32com.client.Dispatch("Outlook.Application")
+
+    # get the Namespace / Session object
+    namespace = Outlook.Session  # identical to GetNameSpace("MAPI") (starting with Outlook 98)
+
+    # get own calendar
+    calendar = namespace.GetDefaultFolder(9)
+    with profiling_from_env():  # writes a profile report when OUTLOOK_EXPORTER_PROFILE is set
+        gc = create_gc_object("primary")
+
+        # pushes every change made in outlook within a few seconds, and fully syncs the next week every hour
+        watch_outlook_calendar(calendar, gc, days_ahead=7)  # runs until interrupted (ctrl+c)
@@ -0,0 +1,13 @@
+from benchmarks.run_suite import run_suite
+
+
+def test_run_suite_smoke() -> None:
+    results = run_suite([20], com_latency_s=0, api_latency_s=0)["20"]
+
+    assert set(results) == {"outlook_read", "export", "qr", "gc_sync", "read_and_sync"}
+    assert results["qr"]["generate"]["images"] > 1
+    gc_sync = results["gc_sync"]
+    batched_round_trips = [
+        gc_sync[f"sync_outlook_events_with_gc_batched/{run}"]["round_trips"] for run in ("first", "unchanged")
+    ]
+    assert 0 < batched_round_trips[1] < batched_round_trips[0]
@@ -0,0 +1,9 @@
+"""Offline test setup: stand-in Outlook COM modules, and a temporary database for the sync ledger and mirror."""
+import os
+import tempfile
+
+os.environ.setdefault("OUTLOOK_EXPORTER_DB", os.path.join(tempfile.mkdtemp(), "tests.db"))
+
+from tests.fakes.outlook import install_fake_win32com  # noqa: E402
+
+install_fake_win32com()
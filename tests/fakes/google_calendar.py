@@ -0,0 +1,261 @@
+"""In-memory stand-in for a gcsa GoogleCalendar, used to test and benchmark the sync offline.
+
+Every HTTP round trip (a single call, a whole batch or a page of a list) sleeps $latency_s and is counted in
+$round_trips. Lists return a nextSyncToken, expire_sync_tokens() makes the older ones fail with 410 like the API.
+With $throttle_rate, that fraction of the calls (single ones and ones inside batches) fail with $throttle_status,
+like a project that exceeds its API quota. The next $lost_insert_responses inserts are written but fail with 503,
+like a server error after the write.
+"""
+import copy
+import json
+import random
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import httplib2
+from gcsa.event import Event
+from gcsa.serializers.event_serializer import EventSerializer
+from googleapiclient.errors import HttpError
+
+from utils.google_calendar.batch import MAX_BATCH_SIZE
+
+DEFAULT_EVENT_COLORS = {
+    "1": "#a4bdfc",
+    "2": "#7ae7bf",
+    "3": "#dbadff",
+    "4": "#ff887c",
+    "5": "#fbd75b",
+    "6": "#ffb878",
+    "7": "#46d6db",
+    "8": "#e1e1e1",
+    "9": "#5484ed",
+    "10": "#51b749",
+    "11": "#dc2127",
+}
+
+
+_THROTTLE_REASONS = {403: "rateLimitExceeded", 429: "rateLimitExceeded", 503: "backendError"}
+
+
+def _http_error(status: int, reason: str) -> HttpError:
+    content = json.dumps({"error": {"code": status, "message": reason, "errors": [{"reason": reason}]}})
+    return HttpError(httplib2.Response({"status": status, "reason": reason}), content.encode())
+
+
+def _merge_patch(resource: Dict[str, Any], body: Dict[str, Any]) -> None:
+    """Patch semantics of the API, nested objects are merged and null fields are cleared."""
+    for key, value in body.items():
+        if value is None:
+            resource.pop(key, None)
+        elif isinstance(value, dict) and isinstance(resource.get(key), dict):
+            _merge_patch(resource[key], value)
+        else:
+            resource[key] = value
+
+
+def _etag_number(event_json: Dict[str, Any]) -> int:
+    return int(event_json["etag"].strip('"'))
+
+
+class _FakeRequest:
+    def __init__(self, calendar: "FakeGoogleCalendar", operation: Callable[[], Any]):
+        self._calendar = calendar
+        self._operation = operation
+
+    def execute(self) -> Any:
+        self._calendar._round_trip()
+        self._calendar._maybe_throttle()
+        return self._operation()
+
+
+class _FakeBatch:
+    def __init__(self, calendar: "FakeGoogleCalendar", callback: Callable[[str, Any, Optional[Exception]], None]):
+        self._calendar = calendar
+        self._callback = callback
+        self._requests: List[Tuple[str, _FakeRequest]] = []
+
+    def add(self, request: _FakeRequest, request_id: str) -> None:
+        assert len(self._requests) < MAX_BATCH_SIZE, "the calendar API rejects batches with more than 50 calls"
+        self._requests.append((request_id, request))
+
+    def execute(self) -> None:
+        self._calendar._round_trip()
+        for request_id, request in self._requests:
+            try:
+                self._calendar._maybe_throttle()
+                response, exception = request._operation(), None
+            except HttpError as e:
+                response, exception = None, e
+            self._callback(request_id, response, exception)
+
+
+class _FakeEventsResource:
+    def __init__(self, calendar: "FakeGoogleCalendar"):
+        self._calendar = calendar
+
+    def get(self, calendarId: str, eventId: str) -> _FakeRequest:  # noqa: N803
+        return _FakeRequest(self._calendar, lambda: self._calendar._get(eventId))
+
+    def delete(self, calendarId: str, eventId: str) -> _FakeRequest:  # noqa: N803
+        return _FakeRequest(self._calendar, lambda: self._calendar._delete(eventId))
+
+    def patch(self, calendarId: str, eventId: str, body: Dict[str, Any]) -> _FakeRequest:  # noqa: N803
+        return _FakeRequest(self._calendar, lambda: self._calendar._patch(eventId, body))
+
+    def insert(self, calendarId: str, body: Dict[str, Any], **_kwargs: Any) -> _FakeRequest:  # noqa: N803
+        return _FakeRequest(self._calendar, lambda: self._calendar._insert(body))
+
+    def list(  # noqa: A003
+        self,
+        calendarId: str,  # noqa: N803
+        syncToken: Optional[str] = None,  # noqa: N803
+        pageToken: Optional[str] = None,  # noqa: N803
+        maxResults: int = 250,  # noqa: N803
+        **_kwargs: Any,
+    ) -> _FakeRequest:
+        return _FakeRequest(self._calendar, lambda: self._calendar._list(syncToken, pageToken, maxResults))
+
+
+class _FakeCalendarsResource:
+    def __init__(self, calendar: "FakeGoogleCalendar"):
+        self._calendar = calendar
+
+    def get(self, calendarId: str) -> _FakeRequest:  # noqa: N803
+        return _FakeRequest(self._calendar, lambda: {"id": self._calendar.calendar_id})
+
+
+class _FakeService:
+    def __init__(self, calendar: "FakeGoogleCalendar"):
+        self._calendar = calendar
+
+    def events(self) -> _FakeEventsResource:
+        return _FakeEventsResource(self._calendar)
+
+    def calendars(self) -> _FakeCalendarsResource:
+        return _FakeCalendarsResource(self._calendar)
+
+    def new_batch_http_request(self, callback: Callable[[str, Any, Optional[Exception]], None]) -> _FakeBatch:
+        return _FakeBatch(self._calendar, callback)
+
+
+class FakeGoogleCalendar:
+    """Implements the parts of gcsa's GoogleCalendar (and its raw service) that this project uses.
+
+    Deleted events are kept with a "cancelled" status, like the real API they can still be fetched by id,
+    their id can't be reused and deleting them again returns 410. The "primary" calendar is $account's own calendar.
+    """
+
+    def __init__(
+        self,
+        calendar: str = "primary",
+        latency_s: float = 0.0,
+        throttle_rate: float = 0.0,
+        throttle_status: int = 403,
+        seed: int = 0,
+        account: str = "user@example.com",
+    ):
+        self.calendar = calendar
+        self.calendar_id = account if calendar == "primary" else calendar
+        self.service = _FakeService(self)
+        self.latency_s = latency_s
+        self.throttle_rate = throttle_rate
+        self.throttle_status = throttle_status
+        self.round_trips = 0
+        self.throttled_calls = 0
+        self.lost_insert_responses = 0
+        self._random = random.Random(seed)
+        self.events: Dict[str, Dict[str, Any]] = {}
+        self._etag_counter = 0
+        self._sync_token_generation = 0  # sync tokens are "$generation:$etag counter"
+
+    def _round_trip(self) -> None:
+        self.round_trips += 1
+        if self.latency_s > 0:
+            time.sleep(self.latency_s)
+
+    def _maybe_throttle(self) -> None:
+        if self.throttle_rate > 0 and self._random.random() < self.throttle_rate:
+            self.throttled_calls += 1
+            raise _http_error(self.throttle_status, _THROTTLE_REASONS.get(self.throttle_status, "rateLimitExceeded"))
+
+    def _next_etag(self) -> str:
+        self._etag_counter += 1
+        return f'"{self._etag_counter}"'
+
+    def _get(self, event_id: str) -> Dict[str, Any]:
+        if event_id not in self.events:
+            raise _http_error(404, "notFound")
+        return copy.deepcopy(self.events[event_id])
+
+    def _delete(self, event_id: str) -> None:
+        if self._get(event_id).get("status") == "cancelled":
+            raise _http_error(410, "deleted")
+        self.events[event_id].update(status="cancelled", etag=self._next_etag())
+
+    def _patch(self, event_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        if self._get(event_id).get("status") == "cancelled":
+            raise _http_error(410, "deleted")
+        _merge_patch(self.events[event_id], copy.deepcopy(body))
+        self.events[event_id]["etag"] = self._next_etag()
+        return copy.deepcopy(self.events[event_id])
+
+    def _list(self, sync_token: Optional[str], page_token: Optional[str], max_results: int) -> Dict[str, Any]:
+        """All the live events, or all the ones changed after $sync_token (cancelled included), by their etags."""
+        if sync_token is None:
+            events = [e for e in self.events.values() if e.get("status") != "cancelled"]
+        else:
+            generation, etag_counter = map(int, sync_token.split(":"))
+            if generation != self._sync_token_generation:
+                raise _http_error(410, "fullSyncRequired")
+            events = [e for e in self.events.values() if _etag_number(e) > etag_counter]
+        events.sort(key=_etag_number)
+        offset = int(page_token) if page_token is not None else 0
+        page: Dict[str, Any] = {"items": copy.deepcopy(events[offset : offset + max_results])}
+        if offset + max_results < len(events):
+            page["nextPageToken"] = str(offset + max_results)
+        else:
+            page["nextSyncToken"] = f"{self._sync_token_generation}:{self._etag_counter}"
+        return page
+
+    def expire_sync_tokens(self) -> None:
+        """The sync tokens returned until now are rejected with 410 Gone."""
+        self._sync_token_generation += 1
+
+    def _insert(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        if body["id"] in self.events:
+            raise _http_error(409, "duplicate")
+        self.events[body["id"]] = dict(copy.deepcopy(body), status="confirmed", etag=self._next_etag())
+        if self.lost_insert_responses > 0:
+            self.lost_insert_responses -= 1
+            raise _http_error(503, "backendError")
+        return copy.deepcopy(self.events[body["id"]])
+
+    def get_events(self, time_min: datetime, time_max: datetime, **_kwargs: Any) -> Iterator[Event]:
+        self._round_trip()
+        self._maybe_throttle()
+        for event_json in list(self.events.values()):
+            start = datetime.fromisoformat(event_json["start"]["dateTime"])
+            end = datetime.fromisoformat(event_json["end"]["dateTime"])
+            if event_json.get("status") != "cancelled" and start < time_max and end > time_min:
+                yield EventSerializer.to_object(copy.deepcopy(event_json))
+
+    def get_event(self, event_id: str) -> Event:
+        self._round_trip()
+        self._maybe_throttle()
+        return EventSerializer.to_object(self._get(event_id))
+
+    def delete_event(self, event: Event, **_kwargs: Any) -> None:
+        self._round_trip()
+        self._maybe_throttle()
+        self._delete(event.event_id)
+
+    def add_event(self, event: Event, **_kwargs: Any) -> Event:
+        self._round_trip()
+        self._maybe_throttle()
+        return EventSerializer.to_object(self._insert(EventSerializer.to_json(event)))
+
+    def list_event_colors(self) -> Dict[str, Dict[str, str]]:
+        self._round_trip()
+        self._maybe_throttle()
+        return {cid: {"background": c_hex, "foreground": "#1d1d1d"} for cid, c_hex in DEFAULT_EVENT_COLORS.items()}
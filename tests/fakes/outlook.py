@@ -0,0 +1,402 @@
+"""Stand-ins for Outlook COM objects, used to test and benchmark the reader on machines without Outlook.
+
+Like pywin32, dates are returned as the local wall clock time labeled as UTC.
+"""
+import copy
+import datetime
+import re
+import sys
+import threading
+import time
+import types
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from utils.profiling import register_com_type
+
+try:
+    from pywintypes import com_error
+except ImportError:  # not on windows
+
+    class com_error(Exception):  # type: ignore # noqa: N801
+        pass
+
+
+@dataclass
+class FakeRecurrencePattern:
+    """RecurrencePattern with the fields read by utils.outlook_reader.recurrence.
+
+    $occurrence_dates are the dates GetOccurrence() succeeds on, like Outlook it raises com_error on other dates.
+    """
+
+    RecurrenceType: int  # noqa: N815
+    PatternStartDate: datetime.datetime  # noqa: N815
+    PatternEndDate: datetime.datetime  # noqa: N815
+    occurrence_dates: Set[datetime.date]
+    master_item: Any = None
+    Interval: int = 1  # noqa: N815
+    DayOfWeekMask: int = 0  # noqa: N815
+    DayOfMonth: int = 0  # noqa: N815
+    MonthOfYear: int = 0  # noqa: N815
+    Instance: int = 0  # noqa: N815
+    Occurrences: int = 0  # noqa: N815
+    NoEndDate: bool = False  # noqa: N815
+    Exceptions: List[Any] = field(default_factory=list)  # noqa: N815
+    get_occurrence_calls: int = 0
+
+    def GetOccurrence(self, start: datetime.datetime) -> Any:  # noqa: N802
+        self.get_occurrence_calls += 1
+        if start.date() not in self.occurrence_dates:
+            raise com_error(-2147352567, "Exception occurred.", None, None)
+        occurrence = copy.copy(self.master_item)
+        occurrence.__dict__.update(Start=start, End=start + (self.master_item.End - self.master_item.Start))
+        return occurrence
+
+
+@dataclass
+class FakeException:
+    """RecurrencePattern.Exceptions item, $AppointmentItem is the moved (or modified) occurrence."""
+
+    AppointmentItem: Any  # noqa: N815
+    OriginalDate: datetime.datetime  # noqa: N815
+    Deleted: bool = False  # noqa: N815
+
+
+@dataclass
+class FakeTimeZone:
+    Bias: int = 0  # noqa: N815
+    DaylightBias: int = 0  # noqa: N815
+
+
+@dataclass
+class FakeAppointmentItem:
+    Subject: str  # noqa: N815
+    Start: datetime.datetime  # noqa: N815
+    End: datetime.datetime  # noqa: N815
+    EntryID: str  # noqa: N815
+    ConversationID: str  # noqa: N815
+    Location: str = ""  # noqa: N815
+    Organizer: str = ""  # noqa: N815
+    BusyStatus: int = 2  # noqa: N815
+    Categories: str = ""  # noqa: N815
+    RequiredAttendees: str = ""  # noqa: N815
+    OptionalAttendees: str = ""  # noqa: N815
+    StartTimeZone: FakeTimeZone = field(default_factory=FakeTimeZone)  # noqa: N815
+    EndTimeZone: FakeTimeZone = field(default_factory=FakeTimeZone)  # noqa: N815
+    LastModificationTime: datetime.datetime = datetime.datetime(2000, 1, 1, tzinfo=datetime.timezone.utc)  # noqa
+    recurrence_pattern: Optional[FakeRecurrencePattern] = None
+
+    @property
+    def IsRecurring(self) -> bool:  # noqa: N802
+        return self.recurrence_pattern is not None
+
+    def GetRecurrencePattern(self) -> FakeRecurrencePattern:  # noqa: N802
+        assert self.recurrence_pattern is not None, "only recurring items have a recurrence pattern"
+        self.recurrence_pattern.master_item = self
+        return self.recurrence_pattern
+
+
+_FILTER_CONDITION = re.compile(r"\[(\w+)\]\s*(>=|<=|<>|=|>|<)\s*('[^']*'|True|False)")
+_FILTER_OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    ">=": lambda a, b: a >= b,
+    "<=": lambda a, b: a <= b,
+    "<>": lambda a, b: a != b,
+    "=": lambda a, b: a == b,
+    ">": lambda a, b: a > b,
+    "<": lambda a, b: a < b,
+}
+
+
+def _parse_filter(restriction: str) -> List[Tuple[str, str, Any]]:
+    """Parses a Jet filter made of "[Property] op 'value'" conditions joined by AND."""
+    conditions = []
+    for prop, op, raw_value in _FILTER_CONDITION.findall(restriction):
+        value: Any = raw_value == "True" if raw_value in ("True", "False") else raw_value.strip("'")
+        if isinstance(value, str):
+            for date_format in ("%d/%m/%Y %H:%M", "%d/%m/%Y"):
+                try:
+                    value = datetime.datetime.strptime(value, date_format).replace(tzinfo=datetime.timezone.utc)
+                    break
+                except ValueError:
+                    pass
+        conditions.append((prop, op, value))
+    return conditions
+
+
+def _matches(item: FakeAppointmentItem, conditions: List[Tuple[str, str, Any]]) -> bool:
+    return all(_FILTER_OPERATORS[op](getattr(item, prop), value) for prop, op, value in conditions)
+
+
+class FakeItems:
+    """Folder.Items collection, recurring items are kept by Restrict() when IncludeRecurrences is set."""
+
+    def __init__(self, items: List[FakeAppointmentItem]):
+        self._items = items
+        self.IncludeRecurrences = False  # noqa: N815
+
+    def Restrict(self, restriction: str) -> "FakeItems":  # noqa: N802
+        conditions = _parse_filter(restriction)
+        return FakeItems(
+            [
+                item
+                for item in self._items
+                if _matches(item, conditions) or (self.IncludeRecurrences and item.IsRecurring)
+            ]
+        )
+
+    def Sort(self, _property: str) -> None:  # noqa: N802
+        self._items.sort(key=lambda item: item.Start)
+
+    def __iter__(self) -> Iterator[FakeAppointmentItem]:
+        return iter(list(self._items))
+
+    @property
+    def Count(self) -> int:  # noqa: N802
+        return len(self._items)
+
+
+class _FakeColumns:
+    def __init__(self) -> None:
+        self.names: List[str] = []
+
+    def RemoveAll(self) -> None:  # noqa: N802
+        self.names = []
+
+    def Add(self, name: str) -> None:  # noqa: N802
+        self.names.append(name)
+
+
+class FakeTable:
+    """Table returned by Folder.GetTable(), serves the rows of the matching items in GetArray() chunks."""
+
+    def __init__(self, items: Sequence[FakeAppointmentItem]):
+        self._items = list(items)
+        self._position = 0
+        self.Columns = _FakeColumns()  # noqa: N815
+        self.get_array_calls = 0
+
+    @property
+    def EndOfTable(self) -> bool:  # noqa: N802
+        return self._position >= len(self._items)
+
+    def GetArray(self, max_rows: int) -> Tuple[Tuple[Any, ...], ...]:  # noqa: N802
+        self.get_array_calls += 1
+        rows = self._items[self._position : self._position + max_rows]
+        self._position += len(rows)
+        return tuple(tuple(getattr(item, column) for column in self.Columns.names) for item in rows)
+
+
+@dataclass
+class FakeCategory:
+    Name: str  # noqa: N815
+    Color: int  # noqa: N815
+
+
+class FakeCategories(list):  # type: ignore
+    @property
+    def Count(self) -> int:  # noqa: N802
+        return len(self)
+
+
+class FakeFolder:
+    def __init__(
+        self,
+        name: str,
+        items: Optional[List[FakeAppointmentItem]] = None,
+        folders: Optional[List["FakeFolder"]] = None,
+        default_item_type: int = 1,  # olAppointmentItem
+    ):
+        self.Name = name  # noqa: N815
+        self.DefaultItemType = default_item_type  # noqa: N815
+        self.Folders = folders if folders is not None else []  # noqa: N815
+        self.items = items if items is not None else []
+        self.Session: Optional[FakeNamespace] = None  # noqa: N815
+        self.EntryID = f"folder-{name}-{id(self)}"  # noqa: N815
+        self.StoreID = ""  # noqa: N815 # set by FakeNamespace to its root folder's store
+
+    def iter_tree(self) -> Iterator["FakeFolder"]:
+        yield self
+        for sub_folder in self.Folders:
+            yield from sub_folder.iter_tree()
+
+    @property
+    def folders(self) -> List["FakeFolder"]:  # COM names are case insensitive, find_folder() uses this one
+        return self.Folders
+
+    @property
+    def Items(self) -> FakeItems:  # noqa: N802
+        return FakeItems(list(self.items))
+
+    def GetTable(self, restriction: str, _table_contents: int = 0) -> FakeTable:  # noqa: N802
+        conditions = _parse_filter(restriction)
+        return FakeTable(sorted((item for item in self.items if _matches(item, conditions)), key=lambda i: i.Start))
+
+
+class FakeNamespace:
+    """Outlook namespace whose default calendar is $calendar, $folders is the root of its folder tree."""
+
+    def __init__(
+        self,
+        calendar: FakeFolder,
+        categories: Sequence[FakeCategory] = (),
+        folders: Optional[List[FakeFolder]] = None,
+    ):
+        self.calendar = calendar
+        self.Categories = FakeCategories(categories)  # noqa: N815
+        self.Folders = folders if folders is not None else [calendar]  # noqa: N815
+        calendar.Session = self
+        for i, root_folder in enumerate(self.Folders):  # like Outlook, root folders of two stores can share a name
+            for folder in root_folder.iter_tree():
+                folder.StoreID = f"store-{i}-{root_folder.Name}"
+
+    def GetDefaultFolder(self, _folder_type: int) -> FakeFolder:  # noqa: N802
+        return self.calendar
+
+    def GetItemFromID(self, entry_id: str, store_id: Optional[str] = None) -> FakeAppointmentItem:  # noqa: N802
+        store_id = self.calendar.StoreID if store_id is None else store_id  # like Outlook, the default store
+        folders = [self.calendar] + [folder for root_folder in self.Folders for folder in root_folder.iter_tree()]
+        for folder in folders:
+            for item in folder.items:
+                if item.EntryID == entry_id and folder.StoreID == store_id:
+                    return item
+        raise com_error(-2147221233, "The item could not be found.", None, None)
+
+    def GetFolderFromID(self, entry_id: str, store_id: str) -> FakeFolder:  # noqa: N802
+        for root_folder in self.Folders:
+            for folder in root_folder.iter_tree():
+                if folder.EntryID == entry_id and folder.StoreID == store_id:
+                    return folder
+        raise com_error(-2147221233, "The folder could not be found.", None, None)
+
+
+class FakeItemsEventSource:
+    """Stands in for win32com.client.DispatchWithEvents on the Items of $folder, for testing watch mode.
+
+    Items added, changed or removed through it fire OnItemAdd/OnItemChange/OnItemRemove on every subscribed handler.
+    """
+
+    def __init__(self, folder: FakeFolder):
+        self.folder = folder
+        self.handlers: List[Any] = []
+
+    def dispatch_with_events(self, _items: FakeItems, handler_cls: type) -> Any:
+        handler = handler_cls()
+        self.handlers.append(handler)
+        return handler
+
+    def add_item(self, item: FakeAppointmentItem) -> None:
+        self.folder.items.append(item)
+        for handler in self.handlers:
+            handler.OnItemAdd(item)
+
+    def change_item(self, entry_id: str, **changes: Any) -> None:
+        """Sets $changes on the item (e.g. Subject="new"), and its LastModificationTime to now."""
+        item = self._item(entry_id)
+        item.__dict__.update(changes, LastModificationTime=datetime.datetime.now(datetime.timezone.utc))
+        for handler in self.handlers:
+            handler.OnItemChange(item)
+
+    def remove_item(self, entry_id: str) -> None:
+        self.folder.items.remove(self._item(entry_id))
+        for handler in self.handlers:
+            handler.OnItemRemove()  # like Outlook, doesn't tell which item was removed
+
+    def _item(self, entry_id: str) -> FakeAppointmentItem:
+        return next(item for item in self.folder.items if item.EntryID == entry_id)
+
+
+class SlowComProxy:
+    """Wraps a fake COM object, every attribute access sleeps $latency_s (like a cross-process COM call) and is counted.
+
+    Fake COM objects returned by the wrapped object (directly, in lists or from method calls) are wrapped as well,
+    all of them share the same $calls counter.
+    """
+
+    def __init__(self, obj: Any, latency_s: float = 0.0, calls: Optional["Counter[str]"] = None):
+        object.__setattr__(self, "_obj", obj)
+        object.__setattr__(self, "_latency_s", latency_s)
+        object.__setattr__(self, "calls", Counter() if calls is None else calls)
+        object.__setattr__(self, "_lock", threading.Lock())
+
+    def _call(self, name: str) -> None:
+        with self._lock:
+            self.calls[name] += 1
+        if self._latency_s > 0:
+            time.sleep(self._latency_s)
+
+    def _wrap(self, value: Any) -> Any:
+        if isinstance(value, list) and any(_is_fake_com_object(v) for v in value):
+            return type(value)(self._wrap(v) for v in value)  # keeps FakeCategories.Count
+        if _is_fake_com_object(value):
+            return SlowComProxy(value, self._latency_s, self.calls)
+        if callable(value) and not isinstance(value, type):
+            return lambda *args, **kwargs: self._wrap(value(*args, **kwargs))
+        return value
+
+    def __getattr__(self, name: str) -> Any:
+        self._call(name)
+        return self._wrap(getattr(self._obj, name))
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        self._call(name)
+        setattr(self._obj, name, value)
+
+    def __iter__(self) -> Iterator[Any]:
+        return (self._wrap(v) for v in self._obj)
+
+    def __len__(self) -> int:
+        return len(self._obj)
+
+
+def _is_fake_com_object(value: Any) -> bool:
+    return type(value).__module__ == __name__ and not isinstance(value, SlowComProxy)
+
+
+for _com_type in (
+    FakeRecurrencePattern,
+    FakeException,
+    FakeTimeZone,
+    FakeAppointmentItem,
+    FakeItems,
+    _FakeColumns,
+    FakeTable,
+    FakeCategory,
+    FakeCategories,
+    FakeFolder,
+    FakeNamespace,
+    SlowComProxy,
+):
+    register_com_type(_com_type)
+
+
+def install_fake_win32com() -> None:
+    """Registers stand-in win32com, pythoncom and pywintypes modules, so utils.outlook_reader imports without pywin32.
+
+    Does nothing if pywin32 is installed.
+    """
+    try:
+        import win32com.client  # noqa: F401 # pylint: disable=C0415,W0611
+
+        return
+    except ImportError:
+        pass
+
+    win32com_module, client_module = types.ModuleType("win32com"), types.ModuleType("win32com.client")
+    client_module.CDispatch = object  # type: ignore
+    win32com_module.client = client_module  # type: ignore
+    pythoncom_module = types.ModuleType("pythoncom")
+    pythoncom_module.CoInitialize = lambda: None  # type: ignore
+    pythoncom_module.CoUninitialize = lambda: None  # type: ignore
+    pythoncom_module.PumpWaitingMessages = lambda: 0  # type: ignore # FakeItemsEventSource fires events right away
+    pywintypes_module = types.ModuleType("pywintypes")
+    pywintypes_module.com_error = com_error  # type: ignore
+    pywintypes_module.TimeType = datetime.datetime  # type: ignore
+    sys.modules.update(
+        {
+            "win32com": win32com_module,
+            "win32com.client": client_module,
+            "pythoncom": pythoncom_module,
+            "pywintypes": pywintypes_module,
+        }
+    )
@@ -0,0 +1,138 @@
+"""Synthetic calendars for the tests and benchmarks: fake Outlook namespaces and OutlookCalendarEntry lists."""
+import datetime
+import random
+from typing import List, Set
+
+from tests.fakes.outlook import (
+    FakeAppointmentItem,
+    FakeCategory,
+    FakeException,
+    FakeFolder,
+    FakeNamespace,
+    FakeRecurrencePattern,
+    FakeTimeZone,
+)
+from utils.outlook_reader.constants import BUSY, BUSYSTATUS_ENUM, FREE, NO_COLOR, OUTLOOK_COLOR_ENUM, RED, TENTATIVE
+from utils.outlook_reader.outlook_event import OutlookCalendarEntry
+from utils.outlook_reader.recurrence import OL_RECURS_DAILY, OL_RECURS_WEEKLY
+
+SUBJECTS = ["DAILY STANDUP", "פגישת צוות", "1:1", "DESIGN REVIEW", "לא לייצא", "Lunch & learn", ""]
+LOCATIONS = ["", "ROOM 4", "ZOOM", "חדר ישיבות"]
+ATTENDEES = [f"Person {i}" for i in range(30)]
+CATEGORIES = [FakeCategory(f"Category {color_id}", color_id) for color_id in OUTLOOK_COLOR_ENUM]
+TIME_ZONES = [FakeTimeZone(-120, -60), FakeTimeZone(0, 0), FakeTimeZone(300, -60)]  # UTC+3, UTC, UTC-4 (DST)
+
+_ALL_DAYS_MASK = 127
+_UTC = datetime.timezone.utc
+
+
+def generate_fake_namespace(
+    n_events: int, days_ahead: int = 7, recurring_fraction: float = 0.3, seed: int = 0
+) -> FakeNamespace:
+    """Generates a fake namespace whose calendar has about $n_events entries in the next $days_ahead days.
+
+    About $recurring_fraction of the entries are occurrences of daily and weekly series (created up to a year ago,
+    some with a moved occurrence), the rest are single items. Items have categories, attendees and time zones.
+    """
+    rand = random.Random(seed)
+    today = datetime.datetime.combine(datetime.date.today(), datetime.time(), tzinfo=_UTC)
+    items: List[FakeAppointmentItem] = []
+
+    n_occurrences = 0
+    while n_occurrences < n_events * recurring_fraction:
+        series = _recurring_item(rand, f"S{len(items)}", today, days_ahead)
+        items.append(series)
+        n_occurrences += sum(
+            today.date() <= d < today.date() + datetime.timedelta(days=days_ahead)
+            for d in series.recurrence_pattern.occurrence_dates  # type: ignore
+        )
+
+    for i in range(max(0, n_events - n_occurrences)):
+        start = today + datetime.timedelta(days=rand.randrange(days_ahead - 1), minutes=15 * rand.randrange(32, 72))
+        items.append(_appointment_item(rand, f"E{i}", start))
+
+    calendar = FakeFolder("Calendar", items)
+    return FakeNamespace(calendar, categories=CATEGORIES)
+
+
+def generate_entries(n_entries: int, days_ahead: int = 7, seed: int = 0) -> List[OutlookCalendarEntry]:
+    """Generates entries like the ones read from outlook (minute aligned, with a first category color)."""
+    rand = random.Random(seed)
+    local_tz = datetime.timezone(datetime.timedelta(hours=3))
+    begin = datetime.datetime.combine(datetime.date.today(), datetime.time(8), tzinfo=local_tz)
+    entries = []
+    for i in range(n_entries):
+        start = begin + datetime.timedelta(days=rand.randrange(days_ahead), minutes=30 * rand.randrange(20))
+        conversation_id = "%032X" % rand.getrandbits(128)
+        entries.append(
+            OutlookCalendarEntry(
+                rand.choice(SUBJECTS),
+                start,
+                start + datetime.timedelta(minutes=30 * rand.randint(1, 4)),
+                location=rand.choice(LOCATIONS),
+                busystatus=rand.choice([BUSY, FREE, TENTATIVE]),
+                categories_colors=rand.choice([[], [RED], [NO_COLOR]]),
+                conversation_id=conversation_id + (f"REG{i}" if i % 3 == 0 else ""),
+            )
+        )
+    return entries
+
+
+def _appointment_item(rand: random.Random, entry_id: str, start: datetime.datetime) -> FakeAppointmentItem:
+    time_zone = rand.choice(TIME_ZONES)
+    return FakeAppointmentItem(
+        rand.choice(SUBJECTS),
+        start,
+        start + datetime.timedelta(minutes=15 * rand.randint(1, 8)),
+        EntryID=entry_id,
+        ConversationID="%032X" % rand.getrandbits(128),
+        Location=rand.choice(LOCATIONS),
+        Organizer=rand.choice(ATTENDEES),
+        BusyStatus=rand.choice(list(BUSYSTATUS_ENUM)),
+        Categories=", ".join(cat.Name for cat in rand.sample(CATEGORIES, rand.choice([0, 0, 1, 2]))),
+        RequiredAttendees="; ".join(rand.sample(ATTENDEES, rand.randint(0, 8))),
+        OptionalAttendees="; ".join(rand.sample(ATTENDEES, rand.randint(0, 3))),
+        StartTimeZone=time_zone,
+        EndTimeZone=time_zone,
+    )
+
+
+def _recurring_item(
+    rand: random.Random, entry_id: str, today: datetime.datetime, days_ahead: int
+) -> FakeAppointmentItem:
+    """A daily or weekly series, one of its occurrences in range is sometimes moved by an hour (an exception)."""
+    pattern_start = today - datetime.timedelta(days=rand.randrange(365), hours=-rand.randrange(8, 17))
+    item = _appointment_item(rand, entry_id, pattern_start)
+    dates_end = today + datetime.timedelta(days=days_ahead)
+    if rand.random() < 0.5:
+        recurrence_type, day_of_week_mask = OL_RECURS_DAILY, 0
+        dates = _dates_between(pattern_start.date(), dates_end.date(), _ALL_DAYS_MASK)
+    else:
+        recurrence_type, day_of_week_mask = OL_RECURS_WEEKLY, 1 << rand.randrange(7)
+        dates = _dates_between(pattern_start.date(), dates_end.date(), day_of_week_mask)
+
+    exceptions = []
+    dates_in_range = sorted(d for d in dates if today.date() <= d < today.date() + datetime.timedelta(days_ahead))
+    if len(dates_in_range) != 0 and rand.random() < 0.3:
+        moved_date = rand.choice(dates_in_range)
+        dates.remove(moved_date)
+        moved_start = datetime.datetime.combine(moved_date, item.Start.timetz()) + datetime.timedelta(hours=1)
+        moved_item = _appointment_item(rand, f"{entry_id}X", moved_start)
+        exceptions.append(FakeException(moved_item, datetime.datetime.combine(moved_date, item.Start.timetz())))
+
+    item.recurrence_pattern = FakeRecurrencePattern(
+        RecurrenceType=recurrence_type,
+        PatternStartDate=pattern_start,
+        PatternEndDate=datetime.datetime(4501, 1, 1),
+        NoEndDate=True,
+        occurrence_dates=dates,  # only the ones up to the end of the read range
+        DayOfWeekMask=day_of_week_mask,
+        Exceptions=exceptions,
+    )
+    return item
+
+
+def _dates_between(first: datetime.date, last: datetime.date, day_of_week_mask: int) -> Set[datetime.date]:
+    """Dates in [$first, $last] whose day of week is in the olDaysOfWeek $day_of_week_mask."""
+    days = (first + datetime.timedelta(days=i) for i in range((last - first).days + 1))
+    return {d for d in days if day_of_week_mask & (1 << ((d.weekday() + 1) % 7))}
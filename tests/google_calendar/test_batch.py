@@ -0,0 +1,66 @@
+from typing import Any, List, Tuple
+
+from tests.fakes.google_calendar import FakeGoogleCalendar
+from utils.google_calendar.batch import execute_in_batches
+from utils.google_calendar.rate_limit import AdaptiveRateLimiter, RateLimitedGoogleCalendar, RetryPolicy
+
+
+def _calendar_with_events(n_events: int, **fake_kwargs: Any) -> FakeGoogleCalendar:
+    fake_gc = FakeGoogleCalendar(**fake_kwargs)
+    for i in range(n_events):
+        fake_gc.events[f"event{i}"] = {"id": f"event{i}", "status": "confirmed", "etag": f'"{i}"'}
+    return fake_gc
+
+
+def _get_requests(gc: Any, event_ids: List[str]) -> List[Tuple[str, Any]]:
+    return [(e_id, gc.service.events().get(calendarId=gc.calendar, eventId=e_id)) for e_id in event_ids]
+
+
+def test_requests_are_sent_in_batches_of_at_most_50() -> None:
+    fake_gc = _calendar_with_events(120)
+
+    result = execute_in_batches(fake_gc, _get_requests(fake_gc, [f"event{i}" for i in range(120)]))
+    assert len(result.responses) == 120
+    assert fake_gc.round_trips == 3  # 50 + 50 + 20
+
+    fake_gc.round_trips = 0
+    execute_in_batches(fake_gc, _get_requests(fake_gc, [f"event{i}" for i in range(120)]), batch_size=10)
+    assert fake_gc.round_trips == 12
+
+
+def test_failing_calls_do_not_fail_their_batch() -> None:
+    fake_gc = _calendar_with_events(3)
+    fake_gc._delete("event1")  # a second delete returns 410
+
+    event_ids = ["event0", "missing", "event2"]
+    result = execute_in_batches(
+        fake_gc,
+        _get_requests(fake_gc, event_ids)
+        + [("event1", fake_gc.service.events().delete(calendarId=fake_gc.calendar, eventId="event1"))],
+    )
+    assert set(result.responses) == {"event0", "event2"}
+    assert {f.event_id: f.status_code for f in result.failures("get")} == {"missing": 404, "event1": 410}
+    assert [f.event_id for f in result.failures("get", ignored_statuses=(410,))] == ["missing"]
+    assert fake_gc.round_trips == 1
+
+
+def test_throttled_calls_are_sent_again_in_new_batches() -> None:
+    fake_gc = _calendar_with_events(200, throttle_rate=0.3, throttle_status=429)
+    limiter = AdaptiveRateLimiter(rate_per_s=1000, max_rate_per_s=1000, max_concurrency=8)
+    gc = RateLimitedGoogleCalendar(fake_gc, limiter, RetryPolicy(max_retries=20, base_delay_s=0))
+
+    result = execute_in_batches(gc, _get_requests(gc, [f"event{i}" for i in range(200)]))
+    assert len(result.errors) == 0
+    assert sorted(result.responses) == sorted(f"event{i}" for i in range(200))
+    assert fake_gc.throttled_calls > 0
+    assert fake_gc.round_trips > 4  # the first 4 batches, then batches of the throttled calls only
+    assert limiter.rate_per_s < 1000
+
+
+def test_throttled_calls_are_errors_without_a_rate_limiter() -> None:
+    fake_gc = _calendar_with_events(100, throttle_rate=0.3, throttle_status=403)
+
+    result = execute_in_batches(fake_gc, _get_requests(fake_gc, [f"event{i}" for i in range(100)]))
+    assert len(result.errors) == fake_gc.throttled_calls > 0
+    assert len(result.responses) + len(result.errors) == 100
+    assert fake_gc.round_trips == 2
@@ -0,0 +1,90 @@
+import datetime
+from typing import Callable, List
+
+import pytest
+
+from tests.fakes.google_calendar import FakeGoogleCalendar
+from utils.google_calendar.events import (
+    sync_outlook_events_with_gc,
+    sync_outlook_events_with_gc_batched,
+    sync_outlook_events_with_gc_streaming,
+    SyncStats,
+)
+from utils.google_calendar.rate_limit import AdaptiveRateLimiter, RateLimitedGoogleCalendar, RetryPolicy
+from utils.outlook_reader.constants import BUSY
+from utils.outlook_reader.outlook_event import OutlookCalendarEntry
+
+SYNC_FUNCS = [sync_outlook_events_with_gc, sync_outlook_events_with_gc_batched, sync_outlook_events_with_gc_streaming]
+
+
+def _rate_limited(fake_gc: FakeGoogleCalendar) -> RateLimitedGoogleCalendar:
+    limiter = AdaptiveRateLimiter(rate_per_s=1000, max_rate_per_s=1000, max_concurrency=8)
+    return RateLimitedGoogleCalendar(fake_gc, limiter, RetryPolicy(max_retries=5, base_delay_s=0))
+
+
+def _entries(n_entries: int, conversation: str = "conversation") -> List[OutlookCalendarEntry]:
+    begin = datetime.datetime(2022, 3, 6, 9, 0, tzinfo=datetime.timezone.utc)
+    return [
+        OutlookCalendarEntry(
+            f"Meeting {i}",
+            begin + datetime.timedelta(hours=i),
+            begin + datetime.timedelta(hours=i, minutes=30),
+            busystatus=BUSY,
+            conversation_id=f"{conversation}{i}",
+        )
+        for i in range(n_entries)
+    ]
+
+
+@pytest.mark.parametrize("sync_func", SYNC_FUNCS)
+def test_insert_retried_after_it_landed_is_patched(sync_func: Callable[..., SyncStats]) -> None:
+    fake_gc = FakeGoogleCalendar(calendar=f"retried-insert-{sync_func.__name__}")
+    fake_gc.lost_insert_responses = 2
+
+    stats = sync_func(_rate_limited(fake_gc), _entries(3))
+    assert (stats.created, stats.failures) == (3, [])
+    assert sorted(e["summary"] for e in fake_gc.events.values()) == ["Meeting 0", "Meeting 1", "Meeting 2"]
+
+
+@pytest.mark.parametrize("sync_func", SYNC_FUNCS)
+def test_event_made_all_day_is_patched_back(sync_func: Callable[..., SyncStats]) -> None:
+    fake_gc = FakeGoogleCalendar(calendar=f"all-day-{sync_func.__name__}")
+    entries = _entries(2)
+    gc = _rate_limited(fake_gc)
+    sync_func(gc, entries)
+
+    all_day_event = next(e for e in fake_gc.events.values() if e["summary"] == "Meeting 0")
+    all_day_event.update(start={"date": "2022-03-06"}, end={"date": "2022-03-07"})
+    stats = sync_func(gc, entries)
+    assert (stats.skipped, stats.patched, stats.failures) == (1, 1, [])
+    assert "date" not in all_day_event["start"] and "dateTime" in all_day_event["start"]
+
+
+@pytest.mark.parametrize("sync_func", SYNC_FUNCS)
+def test_primary_calendars_of_two_accounts_are_synced_separately(sync_func: Callable[..., SyncStats]) -> None:
+    fake_gc_a = FakeGoogleCalendar(account=f"a-{sync_func.__name__}@example.com")
+    fake_gc_b = FakeGoogleCalendar(account=f"b-{sync_func.__name__}@example.com")
+    entries_a, entries_b = _entries(3, "conversation-a"), _entries(3, "conversation-b")
+    sync_func(_rate_limited(fake_gc_a), entries_a)
+    sync_func(_rate_limited(fake_gc_b), entries_b)
+
+    stats = sync_func(_rate_limited(fake_gc_a), [entries_a[0], entries_a[2]])
+    assert (stats.skipped, stats.deleted, stats.failures) == (2, 1, [])
+    assert sum(e["status"] == "cancelled" for e in fake_gc_a.events.values()) == 1
+    assert all(e["status"] != "cancelled" for e in fake_gc_b.events.values())
+    stats = sync_func(_rate_limited(fake_gc_b), entries_b)
+    assert (stats.skipped, stats.created, stats.failures) == (3, 0, [])
+
+
+@pytest.mark.parametrize("sync_func", SYNC_FUNCS)
+def test_events_already_deleted_are_not_counted_as_deleted(sync_func: Callable[..., SyncStats]) -> None:
+    fake_gc = FakeGoogleCalendar(calendar=f"already-deleted-{sync_func.__name__}")
+    entries = _entries(3)
+    gc = _rate_limited(fake_gc)
+    sync_func(gc, entries)
+    sync_func(gc, entries)  # the mirror is refreshed before the upserts, now it holds the created events
+
+    # deleted by someone else after the mirror was refreshed, the delete of the sync gets 410 Gone
+    next(e for e in fake_gc.events.values() if e["summary"] == "Meeting 1")["status"] = "cancelled"
+    stats = sync_func(gc, [entries[0], entries[2]])
+    assert (stats.skipped, stats.deleted, stats.failures) == (2, 0, [])
@@ -0,0 +1,78 @@
+import pytest
+from googleapiclient.errors import HttpError
+
+from tests.fakes.google_calendar import FakeGoogleCalendar
+from utils.google_calendar.rate_limit import AdaptiveRateLimiter, RateLimitedGoogleCalendar, RetryPolicy
+
+NO_BACKOFF = RetryPolicy(max_retries=20, base_delay_s=0)
+
+
+def _limiter() -> AdaptiveRateLimiter:
+    return AdaptiveRateLimiter(rate_per_s=1000, max_rate_per_s=1000, min_rate_per_s=1, max_concurrency=8)
+
+
+@pytest.mark.parametrize("throttle_status", [403, 429])
+def test_throttled_calls_are_retried_until_they_succeed(throttle_status: int) -> None:
+    fake_gc = FakeGoogleCalendar(throttle_rate=0.5, throttle_status=throttle_status)
+    gc = RateLimitedGoogleCalendar(fake_gc, _limiter(), NO_BACKOFF)
+
+    for _ in range(10):
+        assert "1" in gc.list_event_colors()
+    assert fake_gc.throttled_calls > 0
+    assert fake_gc.round_trips == 10 + fake_gc.throttled_calls
+
+
+def test_gives_up_after_max_retries() -> None:
+    fake_gc = FakeGoogleCalendar(throttle_rate=1.0, throttle_status=429)
+    gc = RateLimitedGoogleCalendar(fake_gc, _limiter(), RetryPolicy(max_retries=3, base_delay_s=0))
+
+    with pytest.raises(HttpError) as exc_info:
+        gc.list_event_colors()
+    assert exc_info.value.resp.status == 429
+    assert fake_gc.throttled_calls == 4  # the first attempt and 3 retries
+
+
+def test_other_errors_are_not_retried() -> None:
+    fake_gc = FakeGoogleCalendar()
+    gc = RateLimitedGoogleCalendar(fake_gc, _limiter(), NO_BACKOFF)
+
+    with pytest.raises(HttpError):
+        gc.service.events().get(calendarId=fake_gc.calendar, eventId="missing").execute()  # 404
+    assert fake_gc.round_trips == 1
+
+
+def test_other_errors_leave_the_rate_and_concurrency_as_they_are() -> None:
+    limiter = AdaptiveRateLimiter(rate_per_s=10, max_rate_per_s=20, max_concurrency=8)
+    limiter.report_throttling()
+    gc = RateLimitedGoogleCalendar(FakeGoogleCalendar(), limiter, NO_BACKOFF)
+
+    for _ in range(3):
+        with pytest.raises(HttpError):
+            gc.service.events().get(calendarId=gc.calendar, eventId="missing").execute()  # 404
+    assert (limiter.rate_per_s, limiter.concurrency) == (5, 4)
+
+
+def test_throttling_cuts_the_rate_and_concurrency_and_success_ramps_them_up() -> None:
+    limiter = _limiter()
+    gc = RateLimitedGoogleCalendar(FakeGoogleCalendar(throttle_rate=1.0), limiter, RetryPolicy(3, base_delay_s=0))
+    with pytest.raises(HttpError):
+        gc.list_event_colors()
+    assert limiter.rate_per_s == 1000 / 2 ** 4  # multiplicative decrease on each of the 4 throttled attempts
+    assert limiter.concurrency == 1
+
+    gc.gc.throttle_rate = 0.0
+    gc.list_event_colors()
+    assert limiter.rate_per_s == pytest.approx(1000 / 2 ** 4 + 1 / (1000 / 2 ** 4))  # additive increase
+    assert limiter.concurrency == 2
+
+
+def test_rate_stays_within_its_bounds() -> None:
+    limiter = AdaptiveRateLimiter(rate_per_s=2, max_rate_per_s=2.2, min_rate_per_s=0.5, max_concurrency=2)
+    for _ in range(5):
+        limiter.report_throttling()
+    assert (limiter.rate_per_s, limiter.concurrency) == (0.5, 1)
+
+    for _ in range(5):
+        limiter.acquire()
+        limiter.release()
+    assert (limiter.rate_per_s, limiter.concurrency) == (2.2, 2)
@@ -0,0 +1,70 @@
+import datetime
+import hashlib
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List
+
+import pytest
+
+from tests.fakes.google_calendar import FakeGoogleCalendar
+from tests.fakes.outlook import FakeAppointmentItem, FakeItemsEventSource
+from tests.fakes.synthetic import generate_fake_namespace
+from utils.google_calendar.mirror import reset_mirror
+from utils.google_calendar.watch import watch_outlook_calendar
+
+CONVERSATION_ID = "watched-conversation"
+ITEM_HASH = hashlib.md5(CONVERSATION_ID.encode()).hexdigest()  # hash_event_id_for_gc() of the item's entry
+
+
+def _wait_until(predicate: Callable[[], bool], timeout_s: float = 10) -> None:
+    deadline = time.monotonic() + timeout_s
+    while not predicate():
+        assert time.monotonic() < deadline, "the watch didn't push the change in time"
+        time.sleep(0.05)
+
+
+def _gc_events_of_item(gc: FakeGoogleCalendar) -> List[Dict[str, Any]]:
+    return [event for event_id, event in gc.events.items() if event_id.startswith(ITEM_HASH)]
+
+
+def test_outlook_changes_are_created_patched_and_deleted_in_gc(caplog: pytest.LogCaptureFixture) -> None:
+    caplog.set_level(logging.INFO)
+    calendar = generate_fake_namespace(20).GetDefaultFolder(9)
+    source = FakeItemsEventSource(calendar)
+    gc = FakeGoogleCalendar("test-watch")
+    reset_mirror(gc.calendar)
+    stop_event = threading.Event()
+    watch_thread = threading.Thread(
+        target=watch_outlook_calendar,
+        args=(calendar, gc),
+        kwargs=dict(debounce_s=0.2, dispatch_with_events=source.dispatch_with_events, stop_event=stop_event),
+    )
+    watch_thread.start()
+    try:
+        _wait_until(lambda: any(r.message.startswith("Full sync:") for r in caplog.records))
+        n_synced_events = len(gc.events)
+
+        start = datetime.datetime.now(datetime.timezone.utc).replace(microsecond=0) + datetime.timedelta(days=1)
+        item = FakeAppointmentItem("CREATED", start, start + datetime.timedelta(hours=1), "item", CONVERSATION_ID)
+        source.add_item(item)
+        source.change_item(item.EntryID, Subject="RENAMED")  # same burst, pushed once
+        _wait_until(lambda: len(_gc_events_of_item(gc)) == 1)
+        [created_event] = _gc_events_of_item(gc)
+        assert created_event["summary"] == "RENAMED"
+        assert len(gc.events) == n_synced_events + 1
+        _wait_until(lambda: any(r.message.startswith("Pushed") for r in caplog.records))  # logged after the push
+        assert [r.message for r in caplog.records if r.message.startswith("Pushed")] == [
+            "Pushed 2 item events: 1 created, 0 patched, 0 deleted, 0 unchanged, 0 failed"
+        ]
+
+        source.change_item(item.EntryID, Subject="PATCHED")
+        _wait_until(lambda: _gc_events_of_item(gc)[0]["summary"] == "PATCHED")
+        assert [event["id"] for event in _gc_events_of_item(gc)] == [created_event["id"]]
+
+        source.remove_item(item.EntryID)
+        _wait_until(lambda: _gc_events_of_item(gc)[0].get("status") == "cancelled")
+        assert sum(event.get("status") != "cancelled" for event in gc.events.values()) == n_synced_events
+    finally:
+        stop_event.set()
+        watch_thread.join()
@@ -0,0 +1,37 @@
+from tests.fakes.outlook import FakeFolder, FakeNamespace
+from utils.db import get_session
+from utils.outlook_reader.folder_index import FolderIndex, OutlookFolderIndex
+
+
+def _namespace() -> FakeNamespace:
+    own_calendar = FakeFolder("Calendar")
+    first_store = FakeFolder("Team", folders=[FakeFolder("Calendar")])
+    second_store = FakeFolder("Team", folders=[FakeFolder("Calendar"), FakeFolder("Archive", default_item_type=0)])
+    return FakeNamespace(
+        own_calendar, folders=[FakeFolder("Mailbox", folders=[own_calendar]), first_store, second_store]
+    )
+
+
+def test_stores_with_the_same_root_folder_name_are_kept_apart() -> None:
+    namespace = _namespace()
+    first_store, second_store = namespace.Folders[1:]
+    index = FolderIndex(namespace)
+
+    assert index.find_folder(["Team", "Calendar"]) is first_store.folders[0]  # the namespace's order, like find_folder
+    assert index.find_folder(["Team", "Archive"]) is second_store.folders[1]
+    assert index.calendar_folders() == [("Mailbox",), ("Mailbox", "Calendar"), ("Team",), ("Team", "Calendar")]
+    with get_session() as sess:
+        indexed_store_ids = {row.store_id for row in sess.query(OutlookFolderIndex).filter_by(path="Team")}
+    assert indexed_store_ids == {first_store.StoreID, second_store.StoreID}
+
+
+def test_moved_folder_is_found_after_reindexing() -> None:
+    namespace = _namespace()
+    index = FolderIndex(namespace)
+    first_store = namespace.Folders[1]
+    assert index.find_folder(["Team", "Calendar"]) is first_store.folders[0]
+
+    moved = first_store.folders.pop(0)
+    first_store.folders.append(FakeFolder("Calendar", moved.items))
+    first_store.folders[-1].StoreID = first_store.StoreID
+    assert index.find_folder(["Team", "Calendar"]) is first_store.folders[-1]
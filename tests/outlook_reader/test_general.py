@@ -0,0 +1,52 @@
+import datetime
+
+from tests.fakes.outlook import FakeAppointmentItem, FakeCategory, FakeFolder, FakeNamespace, SlowComProxy
+from utils.outlook_reader.constants import BLUE, ORANGE, RED
+from utils.outlook_reader.general import OutlookSession
+from utils.outlook_reader.incremental import IncrementalCalendarReader
+
+
+def _namespace() -> FakeNamespace:
+    start = datetime.datetime.combine(datetime.date.today(), datetime.time(10), tzinfo=datetime.timezone.utc)
+    item = FakeAppointmentItem(
+        "Planning", start, start + datetime.timedelta(hours=1), "entry-1", "0A1B", Categories="Work"
+    )
+    return FakeNamespace(FakeFolder("Calendar", [item]), [FakeCategory("Work", 1), FakeCategory("Home", 2)])
+
+
+def test_fresh_categories_are_checked_with_a_single_com_call() -> None:
+    namespace = SlowComProxy(_namespace())
+    session = OutlookSession(namespace)
+    assert session.refresh_categories_if_changed()
+    assert session.get_category_color("Work") == RED
+
+    namespace.calls.clear()
+    assert not session.refresh_categories_if_changed()
+    assert dict(namespace.calls) == {"Categories": 1}  # not a read per category
+
+
+def test_recolored_category_is_noticed_once_the_categories_are_old() -> None:
+    namespace = _namespace()
+    session = OutlookSession(namespace)
+    session.refresh_categories_if_changed()
+    namespace.Categories[0].Color = 8
+
+    assert not session.refresh_categories_if_changed()  # the same count, still fresh
+    assert session.get_category_color("Work") == RED
+
+    session.categories_max_age_s = 0
+    assert session.refresh_categories_if_changed()
+    assert session.get_category_color("Work") == BLUE
+    assert not session.refresh_categories_if_changed()  # re-read, but nothing changed
+
+
+def test_recolored_category_re_reads_its_entries() -> None:
+    namespace = _namespace()
+    calendar = namespace.GetDefaultFolder(9)
+    reader = IncrementalCalendarReader(calendar, 7, OutlookSession(namespace, categories_max_age_s=0))
+    assert [ent.categories_colors for ent in reader.read().entries] == [[RED]]
+
+    namespace.Categories[0].Color = 2
+    delta = reader.read()
+    assert delta.changed == {("entry-1", None)}
+    assert [ent.categories_colors for ent in delta.updated_entries] == [[ORANGE]]
@@ -0,0 +1,74 @@
+import datetime
+from typing import Tuple
+
+from tests.fakes.outlook import FakeAppointmentItem, FakeException, FakeFolder, FakeNamespace, FakeRecurrencePattern
+from tests.fakes.synthetic import CATEGORIES, generate_fake_namespace
+from utils.outlook_reader.calendar import read_local_outlook_calendar
+from utils.outlook_reader.general import OutlookSession
+from utils.outlook_reader.incremental import IncrementalCalendarReader
+from utils.outlook_reader.outlook_event import OutlookCalendarEntry
+from utils.outlook_reader.recurrence import OL_RECURS_DAILY
+
+
+def _entry_key(entry: OutlookCalendarEntry) -> Tuple[datetime.datetime, str]:
+    return entry.start_date, entry.conversation_id
+
+
+def test_reads_a_calendar_of_a_non_default_store() -> None:
+    # both synthetic calendars use the same EntryIDs, only the store tells their items apart
+    own_calendar = generate_fake_namespace(100, seed=0).calendar
+    shared_calendar = FakeFolder("Shared", generate_fake_namespace(100, seed=1).calendar.items)
+    namespace = FakeNamespace(
+        own_calendar,
+        CATEGORIES,
+        folders=[FakeFolder("Mailbox", folders=[own_calendar]), FakeFolder("Team", folders=[shared_calendar])],
+    )
+    session = OutlookSession(namespace)
+
+    delta = IncrementalCalendarReader(shared_calendar, 7, session).read()
+    expected_entries = read_local_outlook_calendar(shared_calendar, 7, session)
+    assert len(delta.added) == len(expected_entries) >= 100
+    assert sorted(delta.entries, key=_entry_key) == sorted(expected_entries, key=_entry_key)
+
+
+def test_only_changed_items_are_read_again() -> None:
+    namespace = generate_fake_namespace(100)
+    calendar = namespace.GetDefaultFolder(9)
+    reader = IncrementalCalendarReader(calendar, 7)
+    first_entries = reader.read().entries
+
+    single_item = next(item for item in calendar.items if not item.IsRecurring)
+    single_item.Subject = "MOVED"
+    single_item.Start += datetime.timedelta(hours=1)
+    single_item.End += datetime.timedelta(hours=1)
+    delta = reader.read(touched_ids=[single_item.EntryID])
+    assert delta.changed == {(single_item.EntryID, None)}
+    assert not delta.added and not delta.removed
+    assert [ent.subject for ent in delta.updated_entries] == ["MOVED"]
+    assert len(delta.entries) == len(first_entries)
+
+
+def test_exception_moved_to_the_date_of_another_occurrence() -> None:
+    today = datetime.datetime.combine(datetime.date.today(), datetime.time(9), tzinfo=datetime.timezone.utc)
+    series = FakeAppointmentItem("Standup", today, today + datetime.timedelta(minutes=15), "series", "0A1B")
+    dates = {today.date() + datetime.timedelta(days=d) for d in range(3)}
+    # the occurrence of the 3rd day is moved to the afternoon of the 2nd one
+    moved_start = today + datetime.timedelta(days=1, hours=6)
+    moved = FakeAppointmentItem("Standup", moved_start, moved_start + datetime.timedelta(minutes=15), "series", "0A1B")
+    series.recurrence_pattern = FakeRecurrencePattern(
+        OL_RECURS_DAILY,
+        PatternStartDate=today,
+        PatternEndDate=today + datetime.timedelta(days=2),
+        occurrence_dates=dates - {today.date() + datetime.timedelta(days=2)},
+        Occurrences=3,
+        Exceptions=[FakeException(moved, today + datetime.timedelta(days=2))],
+    )
+    namespace = FakeNamespace(FakeFolder("Calendar", [series]), CATEGORIES)
+
+    delta = IncrementalCalendarReader(namespace.calendar, 7).read()
+    assert [ent.start_date for ent in delta.entries] == [
+        today,
+        today + datetime.timedelta(days=1),
+        today + datetime.timedelta(days=1, hours=6),
+    ]
+    assert len(delta.added) == 3
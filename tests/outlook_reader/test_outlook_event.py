@@ -0,0 +1,73 @@
+import datetime
+from typing import List
+
+import numpy as np
+
+from utils.outlook_reader.constants import BUSY, ELSEWHERE, FREE, NO_COLOR, RED
+from utils.outlook_reader.event_batch import EventBatch
+from utils.outlook_reader.outlook_event import CompactCalendarEntry, OutlookCalendarEntry
+
+IST = datetime.timezone(datetime.timedelta(hours=3))
+NEWFOUNDLAND = datetime.timezone(datetime.timedelta(hours=-2, minutes=-30))
+
+
+def _entries() -> List[OutlookCalendarEntry]:
+    start = datetime.datetime(2022, 3, 6, 9, 15, tzinfo=IST)
+    return [
+        OutlookCalendarEntry(
+            "DESIGN REVIEW",
+            start,
+            start + datetime.timedelta(minutes=45),
+            location="ROOM 4",
+            organizer="Person 1",
+            busystatus=BUSY,
+            attendees=["Person 2", "Person 3"],
+            categories=["Category 1", "Category 2"],
+            categories_colors=[RED, NO_COLOR],
+            conversation_id="0123456789ABCDEF0123456789ABCDEF",
+        ),
+        OutlookCalendarEntry("פגישת צוות", start.astimezone(NEWFOUNDLAND), start.astimezone(datetime.timezone.utc)),
+        OutlookCalendarEntry(
+            "",
+            start + datetime.timedelta(days=1),
+            start + datetime.timedelta(days=2),
+            busystatus=ELSEWHERE,
+            categories=["Category 3"],
+            categories_colors=[NO_COLOR],
+        ),
+        OutlookCalendarEntry("Lunch & learn", start, start, busystatus=FREE, attendees=["Person 2"]),
+    ]
+
+
+def test_compact_entry_round_trip() -> None:
+    for entry in _entries():
+        compact = CompactCalendarEntry.from_entry(entry)
+        assert compact.to_entry() == entry
+        assert (compact.attendees, compact.categories) == (tuple(entry.attendees), tuple(entry.categories))
+        assert CompactCalendarEntry.from_entry(compact.to_entry()) == compact
+
+
+def test_event_batch_round_trip() -> None:
+    entries = _entries()
+    batch = EventBatch.from_entries(entries)
+    assert len(batch) == len(entries)
+    round_tripped = batch.to_entries()
+    assert round_tripped == entries
+    assert [ent.start_date.utcoffset() for ent in round_tripped] == [ent.start_date.utcoffset() for ent in entries]
+    assert EventBatch.from_entries([CompactCalendarEntry.from_entry(ent) for ent in entries]).to_entries() == entries
+
+
+def test_event_batch_round_trip_of_a_selection() -> None:
+    entries = _entries()
+    batch = EventBatch.from_entries(entries)
+    assert batch.sorted_by_start().to_entries() == sorted(entries, key=lambda ent: ent.start_date)
+    assert batch.take(batch.with_color(NO_COLOR)).to_entries() == [entries[2]]
+    assert batch.take(np.zeros(len(batch), dtype=bool)).to_entries() == []
+
+
+def test_empty_event_batch_round_trip() -> None:
+    batch = EventBatch.from_entries([])
+    assert len(batch) == 0
+    assert batch.to_entries() == []
+    assert batch.sorted_by_start().to_entries() == []
+    assert not batch.with_busystatus(BUSY).any()
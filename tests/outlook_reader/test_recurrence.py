@@ -0,0 +1,130 @@
+import datetime
+from typing import Any, List, Optional
+
+from tests.fakes.outlook import FakeRecurrencePattern
+from utils.outlook_reader.recurrence import (
+    iter_occurrence_dates,
+    OL_RECURS_DAILY,
+    OL_RECURS_MONTH_NTH,
+    OL_RECURS_MONTHLY,
+    OL_RECURS_WEEKLY,
+    OL_RECURS_YEARLY,
+)
+
+_MONDAY, _TUESDAY, _WEDNESDAY, _FRIDAY = 2, 4, 8, 32  # olDaysOfWeek
+_LAST = 5
+
+
+def _pattern(
+    recurrence_type: int, start: datetime.date, end: Optional[datetime.date] = None, **fields: Any
+) -> FakeRecurrencePattern:
+    """A pattern from $start, it has no end unless $end or Occurrences are given."""
+    fields.setdefault("NoEndDate", end is None and "Occurrences" not in fields)
+    return FakeRecurrencePattern(
+        RecurrenceType=recurrence_type,
+        PatternStartDate=datetime.datetime.combine(start, datetime.time()),
+        PatternEndDate=datetime.datetime.combine(end or datetime.date(4500, 1, 1), datetime.time()),
+        occurrence_dates=set(),
+        **fields,
+    )
+
+
+def _dates(rp: FakeRecurrencePattern, begin: datetime.date, end: datetime.date) -> List[datetime.date]:
+    return list(iter_occurrence_dates(rp, begin, end))
+
+
+def test_daily() -> None:
+    rp = _pattern(OL_RECURS_DAILY, datetime.date(2022, 3, 7), Interval=2)
+    assert _dates(rp, datetime.date(2022, 3, 1), datetime.date(2022, 3, 14)) == [
+        datetime.date(2022, 3, 7),
+        datetime.date(2022, 3, 9),
+        datetime.date(2022, 3, 11),
+        datetime.date(2022, 3, 13),
+    ]
+
+
+def test_weekly_every_other_week() -> None:
+    # weeks start on sunday, the week of the start date (a wednesday) counts even though its monday already passed
+    rp = _pattern(OL_RECURS_WEEKLY, datetime.date(2022, 3, 9), Interval=2, DayOfWeekMask=_MONDAY | _WEDNESDAY)
+    assert _dates(rp, datetime.date(2022, 3, 1), datetime.date(2022, 4, 10)) == [
+        datetime.date(2022, 3, 9),
+        datetime.date(2022, 3, 21),
+        datetime.date(2022, 3, 23),
+        datetime.date(2022, 4, 4),
+        datetime.date(2022, 4, 6),
+    ]
+
+
+def test_monthly_on_a_day_some_months_do_not_have() -> None:
+    rp = _pattern(OL_RECURS_MONTHLY, datetime.date(2022, 1, 31), DayOfMonth=31)
+    assert _dates(rp, datetime.date(2022, 1, 1), datetime.date(2022, 5, 1)) == [
+        datetime.date(2022, 1, 31),
+        datetime.date(2022, 2, 28),
+        datetime.date(2022, 3, 31),
+        datetime.date(2022, 4, 30),
+    ]
+
+
+def test_monthly_every_third_month_counted_from_the_start_month() -> None:
+    # the 10th of the start month already passed, the first occurrence is in the next period
+    rp = _pattern(OL_RECURS_MONTHLY, datetime.date(2022, 1, 20), Interval=3, DayOfMonth=10)
+    assert _dates(rp, datetime.date(2022, 1, 1), datetime.date(2022, 12, 31)) == [
+        datetime.date(2022, 4, 10),
+        datetime.date(2022, 7, 10),
+        datetime.date(2022, 10, 10),
+    ]
+
+
+def test_month_nth() -> None:
+    second_tuesday = _pattern(OL_RECURS_MONTH_NTH, datetime.date(2022, 1, 1), DayOfWeekMask=_TUESDAY, Instance=2)
+    assert _dates(second_tuesday, datetime.date(2022, 1, 1), datetime.date(2022, 4, 1)) == [
+        datetime.date(2022, 1, 11),
+        datetime.date(2022, 2, 8),
+        datetime.date(2022, 3, 8),
+    ]
+
+
+def test_month_nth_last() -> None:
+    last_friday = _pattern(OL_RECURS_MONTH_NTH, datetime.date(2022, 1, 1), DayOfWeekMask=_FRIDAY, Instance=_LAST)
+    assert _dates(last_friday, datetime.date(2022, 1, 1), datetime.date(2022, 5, 1)) == [
+        datetime.date(2022, 1, 28),
+        datetime.date(2022, 2, 25),
+        datetime.date(2022, 3, 25),
+        datetime.date(2022, 4, 29),
+    ]
+
+
+def test_yearly_on_february_29() -> None:
+    rp = _pattern(OL_RECURS_YEARLY, datetime.date(2024, 2, 29), Interval=12, MonthOfYear=2, DayOfMonth=29)
+    assert _dates(rp, datetime.date(2024, 1, 1), datetime.date(2029, 1, 1)) == [
+        datetime.date(2024, 2, 29),
+        datetime.date(2025, 2, 28),  # like Outlook, on the last day of the month in other years
+        datetime.date(2026, 2, 28),
+        datetime.date(2027, 2, 28),
+        datetime.date(2028, 2, 29),
+    ]
+
+
+def test_ends_after_its_occurrences() -> None:
+    rp = _pattern(OL_RECURS_DAILY, datetime.date(2022, 3, 1), Occurrences=5)
+    # the occurrences before the range count as well
+    assert _dates(rp, datetime.date(2022, 3, 3), datetime.date(2022, 4, 1)) == [
+        datetime.date(2022, 3, 3),
+        datetime.date(2022, 3, 4),
+        datetime.date(2022, 3, 5),
+    ]
+
+
+def test_ends_on_its_end_date() -> None:
+    rp = _pattern(OL_RECURS_DAILY, datetime.date(2022, 3, 1), datetime.date(2022, 3, 4), Occurrences=1000)
+    assert _dates(rp, datetime.date(2022, 3, 1), datetime.date(2022, 4, 1)) == [
+        datetime.date(2022, 3, 1),
+        datetime.date(2022, 3, 2),
+        datetime.date(2022, 3, 3),
+        datetime.date(2022, 3, 4),
+    ]
+
+
+def test_no_end_date_ignores_the_end_date_and_occurrences() -> None:
+    rp = _pattern(OL_RECURS_DAILY, datetime.date(2022, 3, 1), datetime.date(2022, 3, 2), Occurrences=1, NoEndDate=True)
+    assert len(_dates(rp, datetime.date(2022, 3, 1), datetime.date(2022, 3, 11))) == 10
@@ -0,0 +1,83 @@
+import gc
+import threading
+import weakref
+from collections import Counter
+from typing import Any, Dict, List, Sequence
+
+import pytest
+
+from tests.fakes.outlook import FakeFolder, FakeNamespace
+from tests.fakes.synthetic import CATEGORIES, generate_fake_namespace
+from utils.outlook_reader.shared_calendars import read_outlook_calendars_concurrently
+
+N_CALENDARS = 6
+
+
+def _namespace() -> FakeNamespace:
+    shared = [FakeFolder(f"shared{i}", generate_fake_namespace(20, seed=i).calendar.items) for i in range(N_CALENDARS)]
+    return FakeNamespace(FakeFolder("Calendar"), CATEGORIES, folders=[FakeFolder("Shared Calendars", folders=shared)])
+
+
+def test_reads_every_calendar_and_reports_failures_by_source() -> None:
+    folder_paths = [["Shared Calendars", f"shared{i}"] for i in range(N_CALENDARS)] + [["Shared Calendars", "nope"]]
+
+    results = {res.source: res for res in read_outlook_calendars_concurrently(folder_paths, 7, 3, _namespace)}
+    assert set(results) == {"/".join(path) for path in folder_paths}
+    assert isinstance(results["Shared Calendars/nope"].error, ValueError)
+    for i in range(N_CALENDARS):
+        assert results[f"Shared Calendars/shared{i}"].error is None
+        assert len(results[f"Shared Calendars/shared{i}"].entries) >= 20
+
+
+class _ComApartments:
+    """Stands in for pythoncom's CoInitialize/CoUninitialize, checks the namespaces are released before uninitializing."""
+
+    def __init__(self, monkeypatch: pytest.MonkeyPatch):
+        self.initialized: "Counter[int]" = Counter()  # thread id -> nested CoInitialize calls
+        self.released: List[bool] = []
+        self._namespaces: Dict[int, "weakref.ref[FakeNamespace]"] = {}
+        self._lock = threading.Lock()
+        monkeypatch.setattr("pythoncom.CoInitialize", self._co_initialize)
+        monkeypatch.setattr("pythoncom.CoUninitialize", self._co_uninitialize)
+
+    def namespace_factory(self) -> FakeNamespace:
+        """Doesn't initialize COM, unlike generate_outlook_namespace()."""
+        namespace = _namespace()
+        self._namespaces[threading.get_ident()] = weakref.ref(namespace)
+        return namespace
+
+    def _co_initialize(self) -> None:
+        with self._lock:
+            self.initialized[threading.get_ident()] += 1
+
+    def _co_uninitialize(self) -> None:
+        with self._lock:
+            assert self.initialized[threading.get_ident()] > 0, "COM wasn't initialized in this thread"
+            self.initialized[threading.get_ident()] -= 1
+            gc.collect()  # the fake folders and their namespace reference each other
+        self.released.append(self._namespaces[threading.get_ident()]() is None)
+
+
+def test_com_objects_are_released_before_uninitializing(monkeypatch: pytest.MonkeyPatch) -> None:
+    apartments = _ComApartments(monkeypatch)
+    folder_paths = [["Shared Calendars", "shared0"], ["Shared Calendars", "nope"]]
+    results = list(read_outlook_calendars_concurrently(folder_paths, 7, 2, apartments.namespace_factory))
+    assert len(results) == 2
+    assert apartments.released == [True, True]
+    assert sum(apartments.initialized.values()) == 0
+
+
+def test_chained_errors_do_not_hold_com_objects(monkeypatch: pytest.MonkeyPatch) -> None:
+    def _failing_find_folder(folders: Any, folder_path: Sequence[str]) -> Any:
+        try:
+            raise KeyError(folder_path)  # its traceback holds the caller's frame, with the namespace
+        except KeyError:
+            raise ValueError("folder lookup failed")
+
+    monkeypatch.setattr("utils.outlook_reader.shared_calendars.find_folder", _failing_find_folder)
+    apartments = _ComApartments(monkeypatch)
+    (result,) = read_outlook_calendars_concurrently(
+        [["Shared Calendars", "shared0"]], 7, 1, apartments.namespace_factory
+    )
+    assert isinstance(result.error, ValueError) and str(result.error) == "folder lookup failed"
+    assert apartments.released == [True]
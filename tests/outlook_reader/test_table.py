@@ -0,0 +1,64 @@
+import datetime
+from typing import List, Optional, Tuple
+
+import pytest
+
+from tests.fakes.outlook import FakeAppointmentItem, FakeNamespace, FakeRecurrencePattern
+from tests.fakes.synthetic import generate_fake_namespace
+from utils.outlook_reader.calendar import read_local_outlook_calendar
+from utils.outlook_reader.outlook_event import OutlookCalendarEntry
+from utils.outlook_reader.recurrence import OL_RECURS_DAILY
+from utils.outlook_reader.table import read_local_outlook_calendar_table
+
+
+def _future_series(entry_id: str, days_from_now: int) -> FakeAppointmentItem:
+    start = datetime.datetime.combine(
+        datetime.date.today() + datetime.timedelta(days=days_from_now), datetime.time(10), datetime.timezone.utc
+    )
+    return FakeAppointmentItem(
+        "LATER",
+        start,
+        start + datetime.timedelta(hours=1),
+        EntryID=entry_id,
+        ConversationID=entry_id,
+        recurrence_pattern=FakeRecurrencePattern(
+            OL_RECURS_DAILY, start, datetime.datetime(4501, 1, 1), {start.date()}, NoEndDate=True
+        ),
+    )
+
+
+def _entry_key(entry: OutlookCalendarEntry) -> Tuple[datetime.datetime, str]:
+    return entry.start_date, entry.conversation_id
+
+
+@pytest.fixture
+def namespace() -> FakeNamespace:
+    namespace = generate_fake_namespace(200, days_ahead=7)
+    namespace.calendar.items.append(_future_series("LATER", days_from_now=30))
+    return namespace
+
+
+def test_table_reader_matches_the_item_reader(namespace: FakeNamespace) -> None:
+    calendar = namespace.GetDefaultFolder(9)
+    table_entries = read_local_outlook_calendar_table(calendar, 7)
+    item_entries = read_local_outlook_calendar(calendar, 7)
+    assert len(table_entries) > 200
+    # entries with the same start time come in any order
+    assert sorted(table_entries, key=_entry_key) == sorted(item_entries, key=_entry_key)
+
+
+def test_recurring_items_starting_after_the_range_are_not_fetched(
+    namespace: FakeNamespace, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    fetched_ids: List[str] = []
+    get_item_from_id = namespace.GetItemFromID
+
+    def _get_item_from_id(entry_id: str, store_id: Optional[str] = None) -> FakeAppointmentItem:
+        fetched_ids.append(entry_id)
+        return get_item_from_id(entry_id, store_id)
+
+    monkeypatch.setattr(namespace, "GetItemFromID", _get_item_from_id)
+
+    read_local_outlook_calendar_table(namespace.GetDefaultFolder(9), 7)
+    assert len(fetched_ids) == sum(item.IsRecurring for item in namespace.calendar.items) - 1
+    assert "LATER" not in fetched_ids
@@ -0,0 +1,61 @@
+import dataclasses
+import time
+from typing import Callable, List, Tuple
+
+from tests.fakes.outlook import FakeAppointmentItem, FakeItemsEventSource
+from tests.fakes.synthetic import generate_fake_namespace
+from utils.outlook_reader.watch import (
+    CalendarWatch,
+    ITEM_ADD,
+    ITEM_CHANGE,
+    ITEM_REMOVE,
+    wait_for_changes,
+    watch_calendar_items,
+)
+
+
+def _watched_calendar() -> Tuple[List[FakeAppointmentItem], FakeItemsEventSource, CalendarWatch]:
+    calendar = generate_fake_namespace(20).GetDefaultFolder(9)
+    source = FakeItemsEventSource(calendar)
+    return (
+        [item for item in calendar.items if not item.IsRecurring],
+        source,
+        watch_calendar_items(calendar, source.dispatch_with_events),
+    )
+
+
+def test_burst_of_item_events_is_debounced_into_one_list() -> None:
+    items, source, watch = _watched_calendar()
+    new_item = dataclasses.replace(items[2], EntryID="new-item", ConversationID="new-conversation")
+    burst: List[Callable[[], None]] = [
+        lambda: source.change_item(items[0].EntryID, Subject="CHANGED"),
+        lambda: source.remove_item(items[1].EntryID),
+        lambda: source.add_item(new_item),
+    ]
+
+    def _pump() -> None:  # an event arrives on each of the first pumps
+        if len(burst) != 0:
+            burst.pop(0)()
+
+    changes = wait_for_changes(watch.notifications, debounce_s=0.2, max_delay_s=10, timeout_s=1, pump=_pump)
+    assert [(n.kind, n.entry_id) for n in changes] == [
+        (ITEM_CHANGE, items[0].EntryID),
+        (ITEM_REMOVE, None),
+        (ITEM_ADD, "new-item"),
+    ]
+    assert wait_for_changes(watch.notifications, debounce_s=0.2, max_delay_s=10, timeout_s=0.1, pump=_pump) == []
+
+
+def test_continuous_item_events_are_returned_after_max_delay() -> None:
+    items, source, watch = _watched_calendar()
+
+    start_t = time.monotonic()
+    changes = wait_for_changes(
+        watch.notifications,
+        debounce_s=0.2,
+        max_delay_s=0.5,
+        timeout_s=1,
+        pump=lambda: source.change_item(items[0].EntryID, Subject="CHANGED"),  # never quiet for $debounce_s
+    )
+    assert 0.5 <= time.monotonic() - start_t < 2
+    assert len(changes) >= 2 and all(n.kind == ITEM_CHANGE for n in changes)
@@ -0,0 +1,67 @@
+import datetime
+from typing import List
+
+import cv2
+import numpy as np
+
+from utils.outlook_reader.constants import BUSY, RED
+from utils.outlook_reader.outlook_event import OutlookCalendarEntry
+from utils.qr.generate import create_qr_pngs, DEFAULT_MAX_CHUNK_LEN
+from utils.qr.read import read_qr_codes_from_frames, reassemble_qr_chunks
+from websites.export_codec import decode_entries, encode_entries
+
+
+def _week_of_entries() -> List[OutlookCalendarEntry]:
+    """8 meetings a day over a work week, each with its own conversation id."""
+    tz = datetime.timezone(datetime.timedelta(hours=3))
+    begin = datetime.datetime(2022, 3, 6, 8, 0, tzinfo=tz)
+    entries = []
+    for day in range(5):
+        for hour in range(8):
+            start = begin + datetime.timedelta(days=day, hours=hour)
+            entries.append(
+                OutlookCalendarEntry(
+                    f"Meeting {hour}",
+                    start,
+                    start + datetime.timedelta(minutes=45),
+                    busystatus=BUSY,
+                    categories_colors=[RED],
+                    conversation_id="%032X" % (day * 8 + hour + 0xABCDEF0123456789),
+                )
+            )
+    return entries
+
+
+def _png_to_frame(png: bytes) -> np.ndarray:
+    frame = cv2.imdecode(np.frombuffer(png, np.uint8), cv2.IMREAD_GRAYSCALE)
+    assert frame is not None, "create_qr_pngs() should return valid PNGs"
+    return frame
+
+
+def _read_codes(pngs: List[bytes]) -> List[str]:
+    return [code for res in read_qr_codes_from_frames(map(_png_to_frame, pngs)) for code in res.codes]
+
+
+def test_small_payload_is_a_single_code() -> None:
+    assert len(create_qr_pngs(["https://importer"], "A" * DEFAULT_MAX_CHUNK_LEN)) == 1
+
+
+def test_payload_is_chunked_by_default() -> None:
+    payload = "A" * (DEFAULT_MAX_CHUNK_LEN * 2 + 1)
+    assert len(create_qr_pngs([], payload)) == 3
+
+
+def test_chunked_with_max_chunk_len() -> None:
+    assert len(create_qr_pngs(["https://importer"], "A" * 1000, max_chunk_len=250)) == 4
+    assert len(create_qr_pngs(["https://importer"], "A" * 250, max_chunk_len=250)) == 1
+
+
+def test_week_long_export_is_read_back_from_several_codes() -> None:
+    entries = _week_of_entries()
+    payload = encode_entries(entries)
+    pngs = create_qr_pngs([], payload)
+    assert len(pngs) > 1
+
+    codes = _read_codes(pngs)
+    assert len(codes) == len(pngs)
+    assert decode_entries(reassemble_qr_chunks(reversed(codes))) == entries
@@ -0,0 +1,121 @@
+import datetime
+import hashlib
+from typing import List
+
+import pytest
+
+from utils.outlook_reader.constants import BUSY, FREE, NO_COLOR, OUT_OF_OFFICE, RED, TENTATIVE
+from utils.outlook_reader.outlook_event import OutlookCalendarEntry
+from websites.export_codec import ALPHABET, b45decode, b45encode, decode_entries, encode_entries
+
+TZ = datetime.timezone(datetime.timedelta(hours=3))
+
+
+def _entry(subject: str, start: datetime.datetime, end: datetime.datetime, **fields: object) -> OutlookCalendarEntry:
+    fields.setdefault("conversation_id", hashlib.md5(subject.encode()).hexdigest().upper())
+    return OutlookCalendarEntry(subject, start, end, **fields)  # type: ignore
+
+
+def _round_trip(entries: List[OutlookCalendarEntry]) -> List[OutlookCalendarEntry]:
+    encoded = encode_entries(entries)
+    assert set(encoded) <= set(ALPHABET)
+    return decode_entries(encoded)
+
+
+def test_empty_list() -> None:
+    assert _round_trip([]) == []
+
+
+def test_all_the_encoded_fields() -> None:
+    start = datetime.datetime(2022, 3, 6, 9, 30, tzinfo=TZ)
+    entries = [
+        _entry(
+            "Weekly sync",
+            start,
+            start + datetime.timedelta(minutes=45),
+            location="Room 1",
+            busystatus=status,
+            categories_colors=colors,
+            conversation_id=conversation_id,
+        )
+        for status, colors, conversation_id in [
+            (BUSY, [RED], "0A1B2C3D"),
+            (FREE, [], "0A1B2C3DREG1"),  # an occurrence of the same series
+            (TENTATIVE, [NO_COLOR], "not hex"),
+            (OUT_OF_OFFICE, [RED], ""),
+            ("", [], "0A1B2C3DEXP12"),
+        ]
+    ]
+    assert _round_trip(entries) == entries
+
+
+def test_non_ascii_subjects() -> None:
+    start = datetime.datetime(2022, 3, 6, 9, 0, tzinfo=TZ)
+    entries = [
+        _entry(subject, start, start + datetime.timedelta(hours=1), location="חדר 2")
+        for subject in ("פגישת צוות", "Café ☕", "会议", "")
+    ]
+    assert _round_trip(entries) == entries
+
+
+def test_multi_day_and_midnight_crossing_events() -> None:
+    start = datetime.datetime(2022, 3, 6, 23, 30, tzinfo=TZ)
+    other_tz = datetime.timezone(datetime.timedelta(hours=-4, minutes=-30))
+    entries = [
+        _entry("Overnight", start, start + datetime.timedelta(hours=2)),
+        _entry("Conference", start.replace(hour=0, minute=0), start + datetime.timedelta(days=3)),
+        _entry("Flight", start, (start + datetime.timedelta(hours=10)).astimezone(other_tz)),  # ends in another tz
+    ]
+    decoded = _round_trip(entries)
+    assert decoded == entries
+    assert [ent.end_date.utcoffset() for ent in decoded] == [ent.end_date.utcoffset() for ent in entries]
+
+
+def test_large_varints() -> None:
+    start = datetime.datetime(1971, 1, 1, tzinfo=datetime.timezone.utc)
+    entries = [_entry(f"Meeting {i}", start, start + datetime.timedelta(minutes=30)) for i in range(300)]
+    entries += [
+        _entry(
+            "Far future", datetime.datetime(2999, 12, 31, 23, 59, tzinfo=TZ), datetime.datetime(3001, 1, 1, tzinfo=TZ)
+        ),
+        _entry("Year long", start, start + datetime.timedelta(days=366)),
+    ]
+    assert _round_trip(entries) == entries
+
+
+def test_entries_that_cannot_be_encoded() -> None:
+    start = datetime.datetime(2022, 3, 6, 9, 0, 30, tzinfo=TZ)
+    with pytest.raises(ValueError):
+        encode_entries([_entry("With seconds", start, start)])
+    with pytest.raises(ValueError):
+        encode_entries([_entry("Unknown status", start.replace(second=0), start.replace(second=0), busystatus="?")])
+
+
+def test_truncated_payload() -> None:
+    start = datetime.datetime(2022, 3, 6, 9, 0, tzinfo=TZ)
+    encoded = encode_entries([_entry(f"Meeting {i}", start, start, categories_colors=[RED]) for i in range(5)])
+    for length in range(len(encoded)):
+        with pytest.raises(ValueError):
+            decode_entries(encoded[:length])
+
+
+@pytest.mark.parametrize(
+    "garbage",
+    [
+        "hello",  # characters outside ALPHABET
+        "::::::",  # values above 0xFFFF
+        b45encode(bytes([1, 0, 0, 0, 1, 5, 5, 5, 5, 5, 5, 5, 5, 5, 5])),  # string indices out of range
+        b45encode(bytes([1, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 9])),  # busy status out of range
+        b45encode(bytes([1, 0xFF] * 8 + [0x7F])),  # base time out of range
+        b45encode(bytes([2])),  # another codec version
+        b45encode(bytes([1, 0, 0, 0, 0, 0])),  # trailing data
+    ],
+)
+def test_garbage_payload(garbage: str) -> None:
+    with pytest.raises(ValueError):
+        decode_entries(garbage)
+
+
+def test_b45_round_trip() -> None:
+    for data in (b"", b"\x00", b"\xff\xff", bytes(range(256))):
+        assert b45decode(b45encode(data)) == data
@@ -0,0 +1,62 @@
+import contextlib
+from typing import Any, Iterator
+
+import pytest
+
+from utils.db import get_session
+from websites import export_storage
+from websites.export_storage import (
+    clear_export_name_cache,
+    get_export_name,
+    get_export_names,
+    upsert_export_name,
+    upsert_export_names,
+)
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache() -> Iterator[None]:
+    clear_export_name_cache()
+    yield
+    clear_export_name_cache()
+
+
+def test_bulk_lookup() -> None:
+    upsert_export_names({"bulk-1": "Standup", "bulk-2": "Review"})
+    clear_export_name_cache()
+
+    assert get_export_names(["bulk-1", "bulk-missing", "bulk-2", "bulk-1"]) == {
+        "bulk-1": "Standup",
+        "bulk-2": "Review",
+        "bulk-missing": "",
+    }
+    assert get_export_name("bulk-2") == "Review"
+
+
+def test_lookup_of_more_ids_than_sqlite_variables() -> None:
+    conversation_ids = [f"many-{i}" for i in range(2500)]
+    upsert_export_names({conv_id: conv_id.upper() for conv_id in conversation_ids[::3]})
+    clear_export_name_cache()
+
+    names = get_export_names(conversation_ids)
+    assert names == {conv_id: conv_id.upper() if i % 3 == 0 else "" for i, conv_id in enumerate(conversation_ids)}
+
+
+def test_cached_names_are_updated_by_upserts() -> None:
+    assert get_export_name("cached") == ""  # caches the missing name
+    upsert_export_name("cached", "Planning")
+    assert get_export_name("cached") == "Planning"
+
+
+def test_name_upserted_during_a_lookup_is_not_overwritten(monkeypatch: pytest.MonkeyPatch) -> None:
+    @contextlib.contextmanager
+    def _session_with_concurrent_upsert() -> Iterator[Any]:
+        with get_session() as sess:
+            yield sess
+        # another thread upserts a name after the lookup read the DB, before it caches what it read
+        monkeypatch.setattr(export_storage, "get_session", get_session)
+        upsert_export_name("racy", "Fresh")
+
+    monkeypatch.setattr(export_storage, "get_session", _session_with_concurrent_upsert)
+    assert get_export_names(["racy"]) == {"racy": "Fresh"}
+    assert get_export_name("racy") == "Fresh"
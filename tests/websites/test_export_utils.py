@@ -0,0 +1,56 @@
+import datetime
+
+import pytest
+
+from utils.outlook_reader.constants import BUSY, RED
+from utils.outlook_reader.outlook_event import OutlookCalendarEntry
+
+st = pytest.importorskip("streamlit")
+
+from websites import export_utils  # noqa: E402
+
+UNIQUE_IDENTIFIER = "EXPORTER1"
+
+
+@pytest.fixture(autouse=True)
+def _secrets(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(st, "secrets", {"unique_identifier": UNIQUE_IDENTIFIER})
+
+
+def _entry(subject: str, conversation_id: str) -> OutlookCalendarEntry:
+    start = datetime.datetime(2022, 3, 6, 9, 0, tzinfo=datetime.timezone(datetime.timedelta(hours=2)))
+    return OutlookCalendarEntry(
+        subject,
+        start,
+        start + datetime.timedelta(minutes=30),
+        location="ROOM 1",
+        busystatus=BUSY,
+        categories_colors=[RED],
+        conversation_id=conversation_id,
+    )
+
+
+def test_codec_payload_round_trip() -> None:
+    entries = [_entry("", "0A1B"), _entry("", "2C3D")]
+    exported_str = export_utils.export_entry_list_as_str(entries)
+    assert exported_str.startswith(UNIQUE_IDENTIFIER + export_utils.CODEC_MARKER)
+    assert export_utils.read_exported_str_to_entry_list(exported_str) == entries
+
+
+def test_legacy_payload_without_the_codec_marker_is_read() -> None:
+    entries = [_entry("", "0A1B"), _entry("", "2C3D")]
+    legacy_str = export_utils.export_entry_list_as_legacy_str(entries)
+    assert not legacy_str[len(UNIQUE_IDENTIFIER) :].startswith(export_utils.CODEC_MARKER)
+
+    read_entries = export_utils.read_exported_str_to_entry_list(legacy_str)
+    assert [(ent.start_date, ent.end_date, ent.conversation_id) for ent in read_entries] == [
+        (ent.start_date, ent.end_date, ent.conversation_id) for ent in entries
+    ]
+
+
+def test_qr_pngs_of_an_exported_str() -> None:
+    entries = [_entry("", f"{i:04X}") for i in range(40)]
+    exported_str = export_utils.export_entry_list_as_str(entries)
+    qr_pngs = export_utils.exported_str_as_qr_pngs(exported_str, "https://importer?")
+    assert len(qr_pngs) > 1
+    assert qr_pngs == export_utils.export_entry_list_as_qr_pngs(entries, "https://importer?")
@@ -1,6 +1,26 @@
 import os
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import QueuePool
 
 PROJECT_ROOT = os.path.dirname(os.path.dirname(__file__))
-DB_ENGINE = create_engine("sqlite:///" + os.path.join(PROJECT_ROOT, "database.db"))
+DB_PATH = os.environ.get("OUTLOOK_EXPORTER_DB", os.path.join(PROJECT_ROOT, "database.db"))  # benchmarks use a temp db
+DB_ENGINE = create_engine(
+    "sqlite:///" + DB_PATH,
+    # connections are shared between the threads of streamlit sessions through the pool
+    connect_args={"check_same_thread": False, "timeout": 30},
+    poolclass=QueuePool,  # older sqlalchemy versions default to NullPool (a new connection per session) for files
+    pool_size=5,
+    max_overflow=10,
+    pool_pre_ping=True,
+)
+
+
+@event.listens_for(DB_ENGINE, "connect")
+def _set_sqlite_pragmas(dbapi_connection, _connection_record):  # type: ignore
+    """WAL lets readers (e.g. other streamlit sessions) run while a write is in progress."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")  # safe with WAL, commits don't wait for an fsync
+    cursor.execute("PRAGMA busy_timeout=30000")
+    cursor.close()
@@ -0,0 +1,25 @@
+from contextlib import contextmanager
+from typing import Iterator
+
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import Session, sessionmaker
+
+from utils.config import DB_ENGINE
+
+Base = declarative_base()
+
+_Session = sessionmaker(bind=DB_ENGINE)
+
+
+@contextmanager
+def get_session() -> Iterator[Session]:
+    """Returns a session object with commit/rollback functionality as a context."""
+    session = _Session()
+    try:
+        yield session
+        session.commit()
+    except Exception:  # noqa
+        session.rollback()
+        raise
+    finally:
+        session.close()
@@ -0,0 +1,99 @@
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import googleapiclient.errors
+from gcsa.google_calendar import GoogleCalendar
+from googleapiclient.http import HttpRequest
+
+from utils.google_calendar.rate_limit import is_retryable_error, RateLimitedGoogleCalendar
+from utils.profiling import API_BATCH_ITEM, count, profiled
+
+# https://developers.google.com/calendar/api/guides/batch (the API accepts up to 50 calls per batch)
+MAX_BATCH_SIZE = 50
+
+
+@dataclass
+class BatchItemFailure:
+    operation: str  # delete, get, insert
+    event_id: str
+    error: Exception
+
+    @property
+    def status_code(self) -> Optional[int]:
+        return _error_status(self.error)
+
+
+@dataclass
+class BatchResult:
+    responses: Dict[str, Any] = field(default_factory=dict)
+    errors: Dict[str, Exception] = field(default_factory=dict)
+
+    def failures(self, operation: str, ignored_statuses: Tuple[int, ...] = ()) -> List[BatchItemFailure]:
+        """Returns the per-item failures of this result, skipping errors with an $ignored_statuses status."""
+        return [
+            BatchItemFailure(operation, request_id, err)
+            for request_id, err in self.errors.items()
+            if _error_status(err) not in ignored_statuses
+        ]
+
+
+def _error_status(error: Exception) -> Optional[int]:
+    if isinstance(error, googleapiclient.errors.HttpError):
+        return int(error.resp.status)
+    return None
+
+
+@profiled
+def execute_in_batches(
+    gc: GoogleCalendar, requests: Iterable[Tuple[str, HttpRequest]], batch_size: int = MAX_BATCH_SIZE
+) -> BatchResult:
+    """Executes the given requests grouped into batch HTTP requests of at most $batch_size calls each.
+
+    A failing call does not fail the batch, its error is kept in the result under its request id.
+    With a RateLimitedGoogleCalendar every batch goes through its rate limiter, and calls that were throttled inside
+    a batch are sent again (in new batches) after a backoff.
+    Args:
+        gc: google calendar object
+        requests: (request_id, request) pairs, request_id should be unique (the event id is used by convention)
+        batch_size: max number of calls per batch HTTP request
+
+    Returns:
+        BatchResult with the successful responses and the errors, keyed by request_id.
+    """
+    assert 0 < batch_size <= MAX_BATCH_SIZE, f"batch_size should be in (0, {MAX_BATCH_SIZE}]"
+    result = BatchResult()
+
+    def _callback(request_id: str, response: Any, exception: Optional[Exception]) -> None:
+        if exception is not None:
+            result.errors[request_id] = exception
+        else:
+            result.responses[request_id] = response
+
+    # requests of a RateLimitedGoogleCalendar's service are wrapped, batches need the underlying HttpRequest
+    pending = [(request_id, getattr(request, "http_request", request)) for request_id, request in requests]
+    attempt = 0
+    while len(pending) != 0:
+        count(API_BATCH_ITEM, len(pending))
+        for batch_start in range(0, len(pending), batch_size):
+            batch = gc.service.new_batch_http_request(callback=_callback)
+            for request_id, request in pending[batch_start : batch_start + batch_size]:
+                batch.add(request, request_id=request_id)
+            if isinstance(gc, RateLimitedGoogleCalendar):
+                gc.call(batch.execute)
+            else:
+                batch.execute()
+
+        if not isinstance(gc, RateLimitedGoogleCalendar) or attempt == gc.retry_policy.max_retries:
+            break
+        throttled_ids = {request_id for request_id, err in result.errors.items() if is_retryable_error(err)}
+        if len(throttled_ids) == 0:
+            break
+        gc.limiter.report_throttling()
+        time.sleep(gc.retry_policy.delay(attempt))
+        attempt += 1
+        pending = [(request_id, request) for request_id, request in pending if request_id in throttled_ids]
+        for request_id in throttled_ids:
+            del result.errors[request_id]
+
+    return result
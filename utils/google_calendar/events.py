@@ -1,18 +1,52 @@
 import hashlib
 import logging
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
 import googleapiclient.errors
 from gcsa.event import Event
 from gcsa.google_calendar import GoogleCalendar
+from gcsa.serializers.event_serializer import EventSerializer
+from googleapiclient.http import HttpRequest
 
-from utils.google_calendar.general import _find_closest_color_id_in_gc
+from utils.google_calendar.batch import _error_status, BatchItemFailure, execute_in_batches, MAX_BATCH_SIZE
+from utils.google_calendar.general import _find_closest_color_id_in_gc, resolve_calendar_id
+from utils.google_calendar.ledger import (
+    delete_ledger_entries,
+    get_ledger_entries,
+    get_ledger_entry,
+    LedgerEntry,
+    upsert_ledger_entries,
+)
+from utils.google_calendar.mirror import iter_mirrored_event_ids, refresh_mirror
+from utils.google_calendar.rate_limit import rate_limited
 from utils.outlook_reader.constants import BUSY, ELSEWHERE, OUT_OF_OFFICE, TENTATIVE
 from utils.outlook_reader.outlook_event import OutlookCalendarEntry
+from utils.profiling import profiled
 
 
-def sync_outlook_events_with_gc(gc: GoogleCalendar, outlook_events: List[OutlookCalendarEntry]) -> None:
+@dataclass
+class SyncStats:
+    skipped: int = 0  # the gc event already matched the outlook entry
+    patched: int = 0
+    created: int = 0
+    deleted: int = 0
+    failures: List[BatchItemFailure] = field(default_factory=list)
+
+    def count(self, action: str) -> None:
+        setattr(self, action, getattr(self, action) + 1)
+
+
+SKIPPED, PATCHED, CREATED = "skipped", "patched", "created"
+
+STREAM_QUEUE_SIZE = 500  # entries read ahead of the upload in sync_outlook_events_with_gc_streaming()
+
+
+@profiled
+def sync_outlook_events_with_gc(gc: GoogleCalendar, outlook_events: List[OutlookCalendarEntry]) -> SyncStats:
     """Sync outlook events taken from a given range with google calendar.
 
     If an event which is present in the gc in this range but not in the outlook events IS WAS DELETED.
@@ -21,36 +55,398 @@ def sync_outlook_events_with_gc(gc: GoogleCalendar, outlook_events: List[Outlook
     Args:
         gc: google calendar object
         outlook_events: list of outlook events
+
+    Returns:
+        Counts of the skipped, patched, created and deleted gc events.
     """
-    timeframe_min = min(ent.start_date for ent in outlook_events).astimezone(timezone.utc)
-    timeframe_max = max(ent.end_date for ent in outlook_events).astimezone(timezone.utc)
+    gc = rate_limited(gc)
+    stats = SyncStats()
+    gc_event_ids_to_delete = _gc_events_deleted_in_outlook(gc, outlook_events)
+    for gc_event_id in gc_event_ids_to_delete:
+        if _delete_gc_event_by_id(gc, gc_event_id):
+            stats.deleted += 1
+    _delete_from_ledger(gc, gc_event_ids_to_delete)
 
-    outlook_ids_to_sync = [hash_event_id_for_gc(ent) for ent in outlook_events]
-    assert len(outlook_ids_to_sync) == len(set(outlook_ids_to_sync)), "ids should be unique"
+    # add Outlook entries to google calendar
+    for outlook_entry in outlook_events:
+        logging.debug(f"Upserting {outlook_entry}")
+        _, action = _upsert_gc_event(
+            gc, event_id=hash_event_id_for_gc(outlook_entry), **_gc_event_fields_from_outlook_entry(gc, outlook_entry)
+        )
+        stats.count(action)
+    return stats
 
-    events_already_in_gc = list(gc.get_events(timeframe_min, timeframe_max, timezone="UTC"))
-    ids_already_in_gc = [gc_e.event_id for gc_e in events_already_in_gc]
-    assert len(ids_already_in_gc) == len(set(ids_already_in_gc)), "ids should be unique"
 
-    # We assume the calendar in the same timeframe is EXACTLY the same ($outlook_id == $gc_id\d+)
-    # meaning if an event in gc exists without a matching outlook event it should be DELETED
-    gc_events_deleted_in_outlook = [
-        gc_e for gc_e in events_already_in_gc if not any((o_id in gc_e.event_id) for o_id in outlook_ids_to_sync)
-    ]
+@profiled
+def sync_outlook_events_with_gc_batched(
+    gc: GoogleCalendar, outlook_events: List[OutlookCalendarEntry], del_if_exists: bool = True
+) -> SyncStats:
+    """Same as sync_outlook_events_with_gc() but groups the API calls into batch HTTP requests.
 
-    for gc_e_to_delete in gc_events_deleted_in_outlook:
-        gc.delete_event(gc_e_to_delete)
+    Deletes, id lookups, patches and inserts are sent in batches of up to 50 calls. Entries with a fresh sync ledger
+    entry are looked up by their recorded id, the rest probe their event_id counter in rounds (one batched lookup
+    per round for all the entries which didn't reach a free event_id yet).
+    Args:
+        gc: google calendar object
+        outlook_events: list of outlook events
+        del_if_exists: Whether to delete older events created with "the same id"
 
-    # add Outlook entries to google calendar
-    for outlook_entry in outlook_events:
-        print(outlook_entry)
-        upsert_gc_event_from_outlook_entry(gc, outlook_entry)
+    Returns:
+        Counts of the skipped, patched, created and deleted gc events, and the per-item failures of the sync.
+    """
+    gc = rate_limited(gc)
+    stats = SyncStats()
+    _delete_gc_events_batched(gc, _gc_events_deleted_in_outlook(gc, outlook_events), stats)
+    _upsert_gc_events_batched(gc, outlook_events, stats, del_if_exists)
+
+    for failure in stats.failures:
+        logging.warning(f'Failed to {failure.operation} event "{failure.event_id}": {failure.error}')
+    return stats
+
+
+@profiled
+def sync_outlook_events_with_gc_streaming(
+    gc: GoogleCalendar,
+    outlook_events: Iterable[OutlookCalendarEntry],
+    del_if_exists: bool = True,
+    queue_size: int = STREAM_QUEUE_SIZE,
+) -> SyncStats:
+    """Same as sync_outlook_events_with_gc_batched() but uploads the entries while $outlook_events is still read.
+
+    $outlook_events (e.g. iter_local_outlook_calendar()) is consumed in the calling thread, which COM objects are
+    bound to, a worker thread upserts the entries in batches as they arrive through a queue of up to $queue_size
+    entries. The gc events that no entry matched are deleted once $outlook_events is exhausted.
+    Args:
+        gc: google calendar object
+        outlook_events: outlook events, read lazily
+        del_if_exists: Whether to delete older events created with "the same id"
+        queue_size: max number of entries read but not uploaded yet, the reading blocks when it's reached
+
+    Returns:
+        Counts of the skipped, patched, created and deleted gc events, and the per-item failures of the sync.
+    """
+    gc = rate_limited(gc)
+    stats = SyncStats()
+    entries_queue: "queue.Queue[Optional[OutlookCalendarEntry]]" = queue.Queue(maxsize=queue_size)
+    outlook_ids_to_sync: Set[str] = set()
+    timeframe_min: Optional[datetime] = None
+    timeframe_max: Optional[datetime] = None
+
+    with ThreadPoolExecutor(max_workers=1) as upload_pool:
+        upload_future = upload_pool.submit(_upsert_gc_events_from_queue, gc, entries_queue, stats, del_if_exists)
+        try:
+            for entry in outlook_events:
+                entry_id = hash_event_id_for_gc(entry)
+                assert entry_id not in outlook_ids_to_sync, "ids should be unique"
+                outlook_ids_to_sync.add(entry_id)
+                timeframe_min = entry.start_date if timeframe_min is None else min(timeframe_min, entry.start_date)
+                timeframe_max = entry.end_date if timeframe_max is None else max(timeframe_max, entry.end_date)
+                entries_queue.put(entry)
+        finally:
+            entries_queue.put(None)  # end of the entries, also stops the upload when the read failed
+        upload_future.result()
+
+    if timeframe_min is not None and timeframe_max is not None:
+        _delete_gc_events_batched(gc, _gc_events_not_in(gc, outlook_ids_to_sync, timeframe_min, timeframe_max), stats)
+
+    for failure in stats.failures:
+        logging.warning(f'Failed to {failure.operation} event "{failure.event_id}": {failure.error}')
+    return stats
+
+
+@profiled
+def apply_outlook_changes_to_gc(
+    gc: GoogleCalendar,
+    updated_events: List[OutlookCalendarEntry],
+    removed_events: List[OutlookCalendarEntry],
+    del_if_exists: bool = True,
+) -> SyncStats:
+    """Pushes only the changed outlook entries to gc, unlike the syncs above which reconcile a whole timeframe.
+
+    $updated_events (added or changed) are upserted, the gc events of $removed_events are deleted unless an updated
+    entry has the same id (e.g. a meeting that moved).
+    Args:
+        gc: google calendar object
+        updated_events: outlook events that were added or changed (e.g. CalendarDelta.updated_entries)
+        removed_events: outlook events as they were before being removed (e.g. CalendarDelta.removed_entries)
+        del_if_exists: Whether to delete older events created with "the same id"
+
+    Returns:
+        Counts of the skipped, patched, created and deleted gc events, and the per-item failures of the sync.
+    """
+    gc = rate_limited(gc)
+    stats = SyncStats()
+    removed_hashes = {hash_event_id_for_gc(ent) for ent in removed_events} - {
+        hash_event_id_for_gc(ent) for ent in updated_events
+    }
+    if len(removed_hashes) != 0:
+        refresh_mirror(gc)
+        ids_to_delete: Dict[str, None] = {}  # ordered set, events overlapping two windows are listed twice
+        for window_event_ids in iter_mirrored_event_ids(
+            resolve_calendar_id(gc),
+            min(ent.start_date for ent in removed_events),
+            max(ent.end_date for ent in removed_events),
+        ):
+            ids_to_delete.update(
+                (e_id, None) for e_id in window_event_ids if _outlook_hash_of_gc_event_id(e_id) in removed_hashes
+            )
+        _delete_gc_events_batched(gc, list(ids_to_delete), stats)
+    if len(updated_events) != 0:
+        _upsert_gc_events_batched(gc, updated_events, stats, del_if_exists)
+
+    for failure in stats.failures:
+        logging.warning(f'Failed to {failure.operation} event "{failure.event_id}": {failure.error}')
+    return stats
+
+
+def _upsert_gc_events_from_queue(
+    gc: GoogleCalendar,
+    entries_queue: "queue.Queue[Optional[OutlookCalendarEntry]]",
+    stats: SyncStats,
+    del_if_exists: bool,
+) -> None:
+    """Upserts the entries put in $entries_queue until a None, each batch has the entries that arrived meanwhile."""
+    done = False
+    try:
+        while not done:
+            chunk = [entries_queue.get()]
+            while len(chunk) < MAX_BATCH_SIZE and not entries_queue.empty():
+                chunk.append(entries_queue.get_nowait())
+            done = chunk[-1] is None
+            outlook_events = [ent for ent in chunk if ent is not None]
+            if len(outlook_events) != 0:
+                _upsert_gc_events_batched(gc, outlook_events, stats, del_if_exists)
+    except Exception:  # noqa
+        while not done:  # unblock the reading thread, the error is raised by the future
+            done = entries_queue.get() is None
+        raise
+
+
+def _delete_gc_events_batched(gc: GoogleCalendar, gc_event_ids: List[str], stats: SyncStats) -> None:
+    events_api = gc.service.events()
+    delete_result = execute_in_batches(
+        gc, [(e_id, events_api.delete(calendarId=gc.calendar, eventId=e_id)) for e_id in gc_event_ids]
+    )
+    stats.failures += delete_result.failures("delete", ignored_statuses=(410,))
+    stats.deleted += len(delete_result.responses)  # not the ones already deleted (410 Gone)
+    already_deleted_ids = [e_id for e_id, err in delete_result.errors.items() if _error_status(err) == 410]
+    _delete_from_ledger(gc, list(delete_result.responses) + already_deleted_ids)
+
+
+@dataclass
+class _UpsertPlan:
+    """The batched calls of _upsert_gc_events_batched(), decided from the live gc events of each outlook entry."""
+
+    patch_requests: List[Tuple[str, HttpRequest]] = field(default_factory=list)
+    insert_requests: List[Tuple[str, HttpRequest]] = field(default_factory=list)
+    insert_patch_bodies: Dict[str, Dict[str, Any]] = field(default_factory=dict)  # sent if an insert conflicts (409)
+    duplicate_ids: List[str] = field(default_factory=list)  # older events with "the same id" as a kept one
+    hashes_of_event_ids: Dict[str, str] = field(default_factory=dict)
+    ledger_updates: Dict[str, LedgerEntry] = field(default_factory=dict)
+
+
+@profiled
+def _upsert_gc_events_batched(
+    gc: GoogleCalendar, outlook_events: List[OutlookCalendarEntry], stats: SyncStats, del_if_exists: bool
+) -> None:
+    """The upsert part of sync_outlook_events_with_gc_batched(), adds its counts and failures to $stats."""
+    events_api = gc.service.events()
+    entries_by_hash = {hash_event_id_for_gc(ent): ent for ent in outlook_events}
+    ledger, live_events, next_counters = _live_gc_events_from_ledger(gc, list(entries_by_hash))
+    pending_hashes = [h for h in entries_by_hash if len(live_events[h]) == 0 or not del_if_exists]
+    free_event_ids = _probe_gc_event_ids_batched(gc, pending_hashes, next_counters, live_events, stats)
+
+    plan = _UpsertPlan()
+    for h, entry in entries_by_hash.items():
+        fields = _gc_event_fields_from_outlook_entry(gc, entry)
+        if del_if_exists and len(live_events[h]) != 0:
+            _plan_gc_event_update(gc, plan, h, live_events[h], fields, ledger.get(h), stats)
+        elif h in free_event_ids:  # otherwise failed to look the entry up
+            plan.hashes_of_event_ids[free_event_ids[h]] = h
+            event = _create_gc_event(free_event_ids[h], **fields)
+            event_body = EventSerializer.to_json(event)
+            plan.insert_requests.append((free_event_ids[h], events_api.insert(calendarId=gc.calendar, body=event_body)))
+            plan.insert_patch_bodies[free_event_ids[h]] = _gc_event_patch_body(event)
+    _execute_upsert_plan(gc, plan, stats)
+
+
+def _live_gc_events_from_ledger(
+    gc: GoogleCalendar, entry_hashes: List[str]
+) -> Tuple[Dict[str, LedgerEntry], Dict[str, List[Dict[str, Any]]], Dict[str, int]]:
+    """Fetches the events recorded in the ledger for $entry_hashes in one batched lookup.
+
+    Returns:
+        The ledger entries, the live events of each hash (its ledger event if still fresh) and the next counters
+        to probe (after the ledger's counter for fresh entries).
+    """
+    events_api = gc.service.events()
+    live_events: Dict[str, List[Dict[str, Any]]] = {h: [] for h in entry_hashes}
+    next_counters = {h: 0 for h in entry_hashes}
+    ledger = get_ledger_entries(resolve_calendar_id(gc), entry_hashes)
+    ledger_result = execute_in_batches(
+        gc, [(e.gc_event_id, events_api.get(calendarId=gc.calendar, eventId=e.gc_event_id)) for e in ledger.values()]
+    )
+    for h, ledger_entry in ledger.items():
+        if _is_ledger_event_fresh(ledger_entry, ledger_result.responses.get(ledger_entry.gc_event_id)):
+            live_events[h].append(ledger_result.responses[ledger_entry.gc_event_id])
+            next_counters[h] = ledger_entry.counter + 1
+    return ledger, live_events, next_counters
+
+
+def _probe_gc_event_ids_batched(
+    gc: GoogleCalendar,
+    pending_hashes: List[str],
+    next_counters: Dict[str, int],
+    live_events: Dict[str, List[Dict[str, Any]]],
+    stats: SyncStats,
+) -> Dict[str, str]:
+    """Walks the $hash$counter ids of $pending_hashes in rounds, one batched lookup per round.
+
+    The existing (not deleted) events on the way are appended to $live_events.
+    Returns:
+        The first free event id of each hash, hashes whose lookup failed are left out.
+    """
+    events_api = gc.service.events()
+    free_event_ids: Dict[str, str] = {}
+    while len(pending_hashes) != 0:
+        # same event_id convention as upsert_gc_event(), add a counter after the event id
+        new_event_ids = {h: h + str(next_counters[h]) for h in pending_hashes}
+        get_result = execute_in_batches(
+            gc, [(e_id, events_api.get(calendarId=gc.calendar, eventId=e_id)) for e_id in new_event_ids.values()]
+        )
+        stats.failures += get_result.failures("get", ignored_statuses=(404,))
+        for h, new_event_id in new_event_ids.items():
+            error = get_result.errors.get(new_event_id)
+            if error is not None and _error_status(error) == 404:
+                free_event_ids[h] = new_event_id  # didn't find an event with that id
+            elif new_event_id in get_result.responses:
+                event_json = get_result.responses[new_event_id]
+                if event_json.get("status") != "cancelled":
+                    live_events[h].append(event_json)
+                next_counters[h] += 1
+
+        pending_hashes = [h for h, new_event_id in new_event_ids.items() if new_event_id in get_result.responses]
+    return free_event_ids
+
+
+def _plan_gc_event_update(
+    gc: GoogleCalendar,
+    plan: _UpsertPlan,
+    entry_hash: str,
+    live_events: List[Dict[str, Any]],
+    fields: Dict[str, Any],
+    ledger_entry: Optional[LedgerEntry],
+    stats: SyncStats,
+) -> None:
+    """Keeps the latest of $live_events (patched if it differs from $fields), the older ones are deleted."""
+    *older_events, current_event = live_events
+    plan.duplicate_ids += [e_json["id"] for e_json in older_events]
+    plan.hashes_of_event_ids[current_event["id"]] = entry_hash
+    if _gc_json_fingerprint(current_event) == gc_event_fingerprint(**fields):
+        stats.skipped += 1
+        if ledger_entry != _ledger_entry_of(entry_hash, current_event):
+            plan.ledger_updates[entry_hash] = _ledger_entry_of(entry_hash, current_event)
+    else:
+        patch_body = _gc_event_patch_body(_create_gc_event(current_event["id"], **fields))
+        plan.patch_requests.append(
+            (
+                current_event["id"],
+                gc.service.events().patch(calendarId=gc.calendar, eventId=current_event["id"], body=patch_body),
+            )
+        )
+
+
+def _execute_upsert_plan(gc: GoogleCalendar, plan: _UpsertPlan, stats: SyncStats) -> None:
+    """Sends the batched calls of $plan, adds their counts and failures to $stats and records them in the ledger."""
+    events_api = gc.service.events()
+    delete_result = execute_in_batches(
+        gc, [(e_id, events_api.delete(calendarId=gc.calendar, eventId=e_id)) for e_id in plan.duplicate_ids]
+    )
+    stats.failures += delete_result.failures("delete", ignored_statuses=(410,))
+    stats.deleted += len(delete_result.responses)
+
+    patch_result = execute_in_batches(gc, plan.patch_requests)
+    stats.failures += patch_result.failures("patch")
+    stats.patched += len(patch_result.responses)
+
+    insert_result = execute_in_batches(gc, plan.insert_requests)
+    stats.failures += insert_result.failures("insert", ignored_statuses=(409,))
+    # the id is taken, e.g. an insert retried after a server error had landed on the first try, patched instead
+    conflict_result = execute_in_batches(
+        gc,
+        [
+            (e_id, events_api.patch(calendarId=gc.calendar, eventId=e_id, body=plan.insert_patch_bodies[e_id]))
+            for e_id, err in insert_result.errors.items()
+            if _error_status(err) == 409
+        ],
+    )
+    stats.failures += conflict_result.failures("insert")
+    stats.created += len(insert_result.responses) + len(conflict_result.responses)
+
+    for e_id, e_json in {**patch_result.responses, **insert_result.responses, **conflict_result.responses}.items():
+        plan.ledger_updates[plan.hashes_of_event_ids[e_id]] = _ledger_entry_of(plan.hashes_of_event_ids[e_id], e_json)
+    upsert_ledger_entries(resolve_calendar_id(gc), plan.ledger_updates)
+
+
+@profiled
+def _gc_events_deleted_in_outlook(gc: GoogleCalendar, outlook_events: List[OutlookCalendarEntry]) -> List[str]:
+    """Returns the ids of the gc events in the timeframe of $outlook_events without a matching outlook event."""
+    outlook_ids_to_sync = {hash_event_id_for_gc(ent) for ent in outlook_events}
+    assert len(outlook_ids_to_sync) == len(outlook_events), "ids should be unique"
+    return _gc_events_not_in(
+        gc,
+        outlook_ids_to_sync,
+        min(ent.start_date for ent in outlook_events),
+        max(ent.end_date for ent in outlook_events),
+    )
+
+
+def _gc_events_not_in(
+    gc: GoogleCalendar, outlook_ids_to_sync: Set[str], timeframe_min: datetime, timeframe_max: datetime
+) -> List[str]:
+    """Returns the ids of the gc events between $timeframe_min and $timeframe_max without a matching outlook id.
+
+    The events are read from the local mirror of the calendar after fetching the changes since the last sync,
+    a window of the timeframe at a time.
+    """
+    refresh_mirror(gc)
+    # We assume the calendar in the same timeframe is EXACTLY the same ($outlook_id == $gc_id\d+)
+    # meaning if an event in gc exists without a matching outlook event it should be DELETED
+    ids_to_delete: Dict[str, None] = {}  # ordered set, events overlapping two windows are listed twice
+    for window_event_ids in iter_mirrored_event_ids(resolve_calendar_id(gc), timeframe_min, timeframe_max):
+        ids_to_delete.update(
+            (e_id, None) for e_id in window_event_ids if _outlook_hash_of_gc_event_id(e_id) not in outlook_ids_to_sync
+        )
+    return list(ids_to_delete)
 
 
 def hash_event_id_for_gc(entry: OutlookCalendarEntry) -> str:
     return hashlib.md5(entry.conversation_id.encode()).hexdigest()
 
 
+_HASH_LEN = len(hashlib.md5().hexdigest())
+
+
+def parse_gc_event_id(event_id: str) -> Optional[Tuple[str, int]]:
+    """Splits an event_id created by upsert_gc_event() into its hash_event_id_for_gc() prefix and counter suffix.
+
+    Args:
+        event_id: google calendar event id
+
+    Returns:
+        (outlook entry hash, counter) tuple, None if $event_id doesn't follow the $hash$counter convention.
+    """
+    entry_hash, counter = event_id[:_HASH_LEN], event_id[_HASH_LEN:]
+    if len(entry_hash) != _HASH_LEN or not counter.isdigit():
+        return None
+    return entry_hash, int(counter)
+
+
+def _outlook_hash_of_gc_event_id(event_id: str) -> Optional[str]:
+    parsed_event_id = parse_gc_event_id(event_id)
+    return parsed_event_id[0] if parsed_event_id is not None else None
+
+
 def upsert_gc_event_from_outlook_entry(
     gc: GoogleCalendar, entry: OutlookCalendarEntry, del_if_exists: bool = True
 ) -> Event:
@@ -63,11 +459,21 @@ def upsert_gc_event_from_outlook_entry(
         del_if_exists: Whether to delete older events created with "the same id"
 
     Returns:
-        The created event's Event object.
+        The upserted event's Event object.
     """
+    gc = rate_limited(gc)
     return upsert_gc_event(
         gc,
         event_id=hash_event_id_for_gc(entry),
+        del_if_exists=del_if_exists,
+        **_gc_event_fields_from_outlook_entry(gc, entry),
+    )
+
+
+@profiled
+def _gc_event_fields_from_outlook_entry(gc: GoogleCalendar, entry: OutlookCalendarEntry) -> Dict[str, Any]:
+    """Returns the gc event fields (as upsert_gc_event() arguments) that are synced for $entry."""
+    return dict(
         summary=entry.subject,
         start_date=entry.start_date,
         end_date=entry.end_date,
@@ -75,7 +481,6 @@ def upsert_gc_event_from_outlook_entry(
         if len(entry.categories_colors) != 0
         else None,
         transparency="opaque" if entry.busystatus in (BUSY, OUT_OF_OFFICE, ELSEWHERE, TENTATIVE) else "transparent",
-        del_if_exists=del_if_exists,
     )
 
 
@@ -92,6 +497,7 @@ def upsert_gc_event(
     """Upserts a event to the calendar with the specified event_id.
 
     If del_if_exists=True also keeps the old one(s).
+    An existing event is patched in place if its fields changed, and left untouched if they didn't.
     Field definition are described in https://developers.google.com/calendar/api/v3/reference/events
     Args:
         gc: google calendar object
@@ -104,31 +510,216 @@ def upsert_gc_event(
         del_if_exists: Whether to delete older events created with "the same id"
 
     Returns:
-        The created event's Event object.
+        The upserted event's Event object.
+    """
+    gc = rate_limited(gc)
+    event, _ = _upsert_gc_event(
+        gc, event_id, summary, start_date, end_date, transparency, color_id=color_id, del_if_exists=del_if_exists
+    )
+    return event
+
+
+@profiled
+def _upsert_gc_event(
+    gc: GoogleCalendar,
+    event_id: str,
+    summary: str,
+    start_date: datetime,
+    end_date: datetime,
+    transparency: str,
+    color_id: Optional[str] = None,
+    del_if_exists: bool = True,
+) -> Tuple[Event, str]:
+    """Same as upsert_gc_event(), also returns the action taken (SKIPPED, PATCHED or CREATED).
+
+    Goes straight to the event recorded in the sync ledger, probing the event_id counter is only needed when the
+    ledger entry is missing or stale.
+    """
+    events_api = gc.service.events()
+    ledger_entry = get_ledger_entry(resolve_calendar_id(gc), event_id)
+    current_event = _get_ledger_event(gc, ledger_entry) if ledger_entry is not None else None
+    free_event_id = None
+    if current_event is None:
+        current_event, free_event_id = _probe_gc_event_ids(gc, event_id, 0, del_if_exists)
+    elif not del_if_exists:  # the old event is kept, a new one is created after it
+        _, free_event_id = _probe_gc_event_ids(gc, event_id, ledger_entry.counter + 1, del_if_exists)  # type: ignore
+
+    if current_event is None or not del_if_exists:
+        assert free_event_id is not None, "a free event_id is found whenever the existing event isn't reused"
+        event = _create_gc_event(free_event_id, summary, start_date, end_date, transparency, color_id)
+        created_event = _insert_gc_event(gc, event)
+        _record_in_ledger(gc, event_id, created_event)
+        return EventSerializer.to_object(created_event), CREATED
+
+    fingerprint = gc_event_fingerprint(summary, start_date, end_date, transparency, color_id)
+    if _gc_json_fingerprint(current_event) == fingerprint:
+        if ledger_entry != _ledger_entry_of(event_id, current_event):
+            _record_in_ledger(gc, event_id, current_event)
+        return EventSerializer.to_object(current_event), SKIPPED
+
+    event = _create_gc_event(current_event["id"], summary, start_date, end_date, transparency, color_id)
+    patched_event = events_api.patch(
+        calendarId=gc.calendar, eventId=current_event["id"], body=_gc_event_patch_body(event)
+    ).execute()
+    _record_in_ledger(gc, event_id, patched_event)
+    return EventSerializer.to_object(patched_event), PATCHED
+
+
+@profiled
+def _probe_gc_event_ids(
+    gc: GoogleCalendar, event_id: str, first_counter: int, del_if_exists: bool
+) -> Tuple[Optional[Dict[str, Any]], str]:
+    """Walks $event_id$counter ids from $first_counter until a free one.
+
+    Returns:
+        The latest existing (not deleted) event on the way, and the first free event id.
     """
-    i = 0
+    events_api = gc.service.events()
+    current_event: Optional[Dict[str, Any]] = None
+    i = first_counter
     while True:
         # event_id is unique even after deletion, my convention is to add a counter after the event id
         # in order to keep track of the id.
         new_event_id = event_id + str(i)
         try:
-            existing_event = gc.get_event(new_event_id)
+            existing_event = events_api.get(calendarId=gc.calendar, eventId=new_event_id).execute()
         except googleapiclient.errors.HttpError as e:
             if e.status_code == 404:  # didn't find an event with that id
-                logging.info(f'Using event_id "{new_event_id}"')
-                event_id = new_event_id
-                break
+                logging.info(f'Next free event_id is "{new_event_id}"')
+                return current_event, new_event_id
             raise
 
-        if del_if_exists:
-            try:
-                gc.delete_event(existing_event)
-            except googleapiclient.errors.HttpError as e:
-                if e.status_code == 410:
-                    logging.info(f'The requested event "{new_event_id}" was already deleted.')
+        if existing_event.get("status") != "cancelled":
+            if current_event is not None and del_if_exists:  # keep only the latest event with "the same id"
+                _delete_gc_event_by_id(gc, current_event["id"])
+            current_event = existing_event
         i += 1
 
-    event = Event(
+
+def _get_ledger_event(gc: GoogleCalendar, ledger_entry: LedgerEntry) -> Optional[Dict[str, Any]]:
+    """Returns the event recorded in $ledger_entry, None if the ledger entry is stale."""
+    event_json: Optional[Dict[str, Any]]
+    try:
+        event_json = gc.service.events().get(calendarId=gc.calendar, eventId=ledger_entry.gc_event_id).execute()
+    except googleapiclient.errors.HttpError as e:
+        if e.status_code != 404:
+            raise
+        event_json = None
+
+    if not _is_ledger_event_fresh(ledger_entry, event_json):
+        logging.info(f'Ledger entry of "{ledger_entry.gc_event_id}" is stale, probing event ids')
+        return None
+    return event_json
+
+
+def _is_ledger_event_fresh(ledger_entry: LedgerEntry, event_json: Optional[Dict[str, Any]]) -> bool:
+    """Whether $event_json (fetched by the ledger's id) is still the event the ledger recorded."""
+    # a different etag means the event was changed by someone else, who might have created a newer event too
+    return (
+        event_json is not None
+        and event_json.get("status") != "cancelled"
+        and event_json.get("etag") == ledger_entry.etag
+    )
+
+
+def _ledger_entry_of(event_id: str, event_json: Dict[str, Any]) -> LedgerEntry:
+    return LedgerEntry(event_json["id"], int(event_json["id"][len(event_id) :]), event_json.get("etag"))
+
+
+def _delete_from_ledger(gc: GoogleCalendar, gc_event_ids: List[str]) -> None:
+    event_hashes = [_outlook_hash_of_gc_event_id(e_id) for e_id in gc_event_ids]
+    delete_ledger_entries(resolve_calendar_id(gc), [h for h in event_hashes if h is not None])
+
+
+def _record_in_ledger(gc: GoogleCalendar, event_id: str, event_json: Dict[str, Any]) -> None:
+    upsert_ledger_entries(resolve_calendar_id(gc), {event_id: _ledger_entry_of(event_id, event_json)})
+
+
+def _delete_gc_event_by_id(gc: GoogleCalendar, event_id: str) -> bool:
+    """Deletes the event with $event_id, returns False if it was already deleted (410 Gone)."""
+    try:
+        gc.service.events().delete(calendarId=gc.calendar, eventId=event_id).execute()
+    except googleapiclient.errors.HttpError as e:
+        if e.status_code != 410:
+            raise
+        logging.info(f'The requested event "{event_id}" was already deleted.')
+        return False
+    return True
+
+
+def gc_event_fingerprint(
+    summary: str, start_date: datetime, end_date: datetime, transparency: str, color_id: Optional[str] = None
+) -> str:
+    """Returns a stable fingerprint of the event fields that are synced to google calendar."""
+    synced_fields = [
+        summary or "",
+        start_date.astimezone(timezone.utc).isoformat(),
+        end_date.astimezone(timezone.utc).isoformat(),
+        transparency,
+        color_id or "",
+    ]
+    return hashlib.md5("\x1f".join(synced_fields).encode()).hexdigest()
+
+
+def _gc_json_fingerprint(event_json: Dict[str, Any]) -> str:
+    """Returns gc_event_fingerprint() of an event resource fetched from the API.
+
+    All-day events (with a "date" instead of a "dateTime") get an empty fingerprint, the synced events are never
+    all-day so such an event (e.g. changed by the user) is patched back.
+    """
+    if "dateTime" not in event_json["start"] or "dateTime" not in event_json["end"]:
+        return ""
+    return gc_event_fingerprint(
+        summary=event_json.get("summary", ""),
+        start_date=_parse_gc_datetime(event_json["start"]["dateTime"]),
+        end_date=_parse_gc_datetime(event_json["end"]["dateTime"]),
+        transparency=event_json.get("transparency", "opaque"),  # the API omits the default value
+        color_id=event_json.get("colorId"),
+    )
+
+
+def _parse_gc_datetime(rfc3339_dt: str) -> datetime:
+    return datetime.fromisoformat(rfc3339_dt.replace("Z", "+00:00"))
+
+
+_PATCHED_FIELDS = ("summary", "start", "end", "transparency", "colorId")
+
+
+def _insert_gc_event(gc: GoogleCalendar, event: Event) -> Dict[str, Any]:
+    """Inserts $event, it's patched instead if its id is taken (409), e.g. by a retried insert whose first try landed."""
+    events_api = gc.service.events()
+    try:
+        created_event: Dict[str, Any] = events_api.insert(
+            calendarId=gc.calendar, body=EventSerializer.to_json(event)
+        ).execute()
+        return created_event
+    except googleapiclient.errors.HttpError as e:
+        if e.status_code != 409:
+            raise
+    patched_event: Dict[str, Any] = events_api.patch(
+        calendarId=gc.calendar, eventId=event.event_id, body=_gc_event_patch_body(event)
+    ).execute()
+    return patched_event
+
+
+def _gc_event_patch_body(event: Event) -> Dict[str, Any]:
+    """Returns a patch request body with the synced fields of $event."""
+    event_json = EventSerializer.to_json(event)
+    patch_body = {k: event_json.get(k) for k in _PATCHED_FIELDS}
+    for time_field in ("start", "end"):  # patches merge nested fields, clears the "date" of an all-day event
+        patch_body[time_field] = {**patch_body[time_field], "date": None}
+    return patch_body
+
+
+def _create_gc_event(
+    event_id: str,
+    summary: str,
+    start_date: datetime,
+    end_date: datetime,
+    transparency: str,
+    color_id: Optional[str] = None,
+) -> Event:
+    return Event(
         id=event_id,  # used to set the event id in the google calendar server
         event_id=event_id,
         summary=summary,
@@ -138,6 +729,3 @@ def upsert_gc_event(
         transparency=transparency,
         minutes_before_popup_reminder=15,
     )
-
-    event = gc.add_event(event)
-    return event
@@ -1,48 +1,166 @@
 import os
-from typing import Dict
+import time
+import weakref
+from typing import Any, Dict, List, Optional, Tuple
 
-from colormath.color_conversions import convert_color
-from colormath.color_diff import delta_e_cie2000
-from colormath.color_objects import LabColor, sRGBColor
+import numpy as np
 from gcsa.google_calendar import GoogleCalendar
 from google.oauth2.credentials import Credentials
 
 from utils.config import PROJECT_ROOT
+from utils.google_calendar.rate_limit import RateLimitedGoogleCalendar
+from utils.outlook_reader.constants import NO_COLOR, OUTLOOK_COLOR_ENUM
 
 GC_SECRET_JSON_PATH = os.path.join(PROJECT_ROOT, "client_secret.apps.googleusercontent.com.json")
 
 
-def create_gc_object(calendar_id: str, credentials: Credentials = None) -> GoogleCalendar:
+def create_gc_object(calendar_id: str, credentials: Credentials = None) -> RateLimitedGoogleCalendar:
+    """Creates a GoogleCalendar whose calls go through the process wide rate limiter and are retried when throttled."""
     if credentials is not None:  # use service-account credentials (assumes $calendar_id was shared with the account)
-        return GoogleCalendar(calendar=calendar_id, credentials=credentials)
+        gc = GoogleCalendar(calendar=calendar_id, credentials=credentials)
     else:  # fallback to Oauth2
-        return GoogleCalendar(
-            calendar=calendar_id, credentials_path=GC_SECRET_JSON_PATH, authentication_flow_port=11138
-        )
+        gc = GoogleCalendar(calendar=calendar_id, credentials_path=GC_SECRET_JSON_PATH, authentication_flow_port=11138)
+    return RateLimitedGoogleCalendar(gc)
+
+
+PRIMARY_CALENDAR = "primary"
+_resolved_calendar_ids: "weakref.WeakKeyDictionary[Any, str]" = weakref.WeakKeyDictionary()
+
+
+def resolve_calendar_id(gc: GoogleCalendar) -> str:
+    """Returns the id of $gc's calendar, the "primary" alias is resolved to the account's own calendar id.
+
+    Local state (the mirror, the sync ledger) is keyed on it, as "primary" is a different calendar for every account.
+    The id of an aliased calendar is fetched once per calendar object.
+    """
+    if gc.calendar != PRIMARY_CALENDAR:
+        return str(gc.calendar)
+    underlying_gc = getattr(gc, "gc", gc)  # the id outlives the RateLimitedGoogleCalendar wrappers of the same gc
+    calendar_id = _resolved_calendar_ids.get(underlying_gc)
+    if calendar_id is None:
+        calendar_id = str(gc.service.calendars().get(calendarId=gc.calendar).execute()["id"])
+        _resolved_calendar_ids[underlying_gc] = calendar_id
+    return calendar_id
+
+
+PALETTE_TTL_S = 60 * 60
+_palette_cache: Dict[str, Tuple[float, Dict[str, str], Dict[str, str]]] = {}  # calendar -> (time, palette, lookup)
 
 
 def get_event_possible_colors(gc: GoogleCalendar) -> Dict[str, str]:
     """Retrieves a dict of possible colors and their ids for the given calendar.
 
+    The palette is fetched once per calendar and cached for PALETTE_TTL_S seconds.
     Args:
         gc: a google calendar object
 
     Returns:
         Dict of color_id (can be passed to add_event()) and hex value of color (#a4bdfc)
     """
-    gc_color_list = gc.list_event_colors()
-    assert "1" in gc_color_list, "I assert that 1 is the default color in GC (appears in other code)"
-    return {k: v["background"] for k, v in gc.list_event_colors().items()}
+    return _get_cached_palette(gc)[1]
+
+
+def get_outlook_color_lookup(gc: GoogleCalendar) -> Dict[str, str]:
+    """Returns a dict of every outlook category color (hex) to its closest color_id in the given calendar."""
+    return _get_cached_palette(gc)[2]
+
+
+def _get_cached_palette(gc: GoogleCalendar) -> Tuple[float, Dict[str, str], Dict[str, str]]:
+    cached = _palette_cache.get(gc.calendar)
+    if cached is None or time.monotonic() - cached[0] > PALETTE_TTL_S:
+        gc_color_list = gc.list_event_colors()
+        assert "1" in gc_color_list, "I assert that 1 is the default color in GC (appears in other code)"
+        palette = {k: v["background"] for k, v in gc_color_list.items()}
+        outlook_colors = [c_hex for c_hex in OUTLOOK_COLOR_ENUM.values() if c_hex != NO_COLOR]
+        cached = (time.monotonic(), palette, _closest_color_ids(outlook_colors, palette))
+        _palette_cache[gc.calendar] = cached
+    return cached
+
+
+def _find_closest_color_id_in_gc(gc: GoogleCalendar, base_color_hex: str) -> Optional[str]:
+    """Returns the closest color_id to $base_color_hex from the $gc calendar, None (default color) for NO_COLOR."""
+    if base_color_hex == NO_COLOR:  # a category without a color, not a hex value
+        return None
+    outlook_color_lookup = get_outlook_color_lookup(gc)
+    if base_color_hex in outlook_color_lookup:
+        return outlook_color_lookup[base_color_hex]
+    return _closest_color_ids([base_color_hex], get_event_possible_colors(gc))[base_color_hex]
+
+
+def _closest_color_ids(base_colors_hex: List[str], palette: Dict[str, str]) -> Dict[str, str]:
+    """Returns the closest (CIEDE2000) color_id in $palette for each color in $base_colors_hex."""
+    if len(base_colors_hex) == 0:
+        return {}
+    color_ids = list(palette.keys())
+    distances = _delta_e_cie2000(_hex_to_lab(base_colors_hex)[:, np.newaxis], _hex_to_lab(list(palette.values())))
+    return {c_hex: color_ids[i] for c_hex, i in zip(base_colors_hex, distances.argmin(axis=1))}
+
+
+# sRGB to XYZ matrix adapted to the D50 white point (Bradford), same as colormath's default LabColor illuminant
+_SRGB_TO_XYZ_D50 = np.array(
+    [
+        [0.4360747, 0.3850649, 0.1430804],
+        [0.2225045, 0.7168786, 0.0606169],
+        [0.0139322, 0.0971045, 0.7141733],
+    ]
+)
+_D50_WHITE = np.array([0.96422, 1.0, 0.82521])
+
+
+def _hex_to_lab(colors_hex: List[str]) -> np.ndarray:
+    """Converts sRGB hex colors (#a4bdfc) to an (n, 3) array of Lab colors."""
+    rgb = np.array([[int(c_hex.lstrip("#")[i : i + 2], 16) for i in (0, 2, 4)] for c_hex in colors_hex]) / 255
+    linear_rgb = np.where(rgb <= 0.04045, rgb / 12.92, ((rgb + 0.055) / 1.055) ** 2.4)
+    xyz = linear_rgb @ _SRGB_TO_XYZ_D50.T / _D50_WHITE
+
+    f = np.where(xyz > (6 / 29) ** 3, np.cbrt(xyz), xyz / (3 * (6 / 29) ** 2) + 4 / 29)
+    return np.stack([116 * f[:, 1] - 16, 500 * (f[:, 0] - f[:, 1]), 200 * (f[:, 1] - f[:, 2])], axis=-1)
+
+
+def _delta_e_cie2000(lab1: np.ndarray, lab2: np.ndarray) -> np.ndarray:
+    """CIEDE2000 color difference between broadcastable arrays of Lab colors (last axis is L, a, b)."""
+    l1, a1, b1 = np.moveaxis(lab1, -1, 0)
+    l2, a2, b2 = np.moveaxis(lab2, -1, 0)
+
+    avg_c = (np.hypot(a1, b1) + np.hypot(a2, b2)) / 2
+    g = 0.5 * (1 - np.sqrt(avg_c ** 7 / (avg_c ** 7 + 25 ** 7)))
+    a1_p, a2_p = (1 + g) * a1, (1 + g) * a2
+    c1_p, c2_p = np.hypot(a1_p, b1), np.hypot(a2_p, b2)
+    h1_p = np.degrees(np.arctan2(b1, a1_p)) % 360
+    h2_p = np.degrees(np.arctan2(b2, a2_p)) % 360
 
+    delta_l_p = l2 - l1
+    delta_c_p = c2_p - c1_p
+    delta_h_p = h2_p - h1_p
+    delta_h_p = np.where(delta_h_p > 180, delta_h_p - 360, np.where(delta_h_p < -180, delta_h_p + 360, delta_h_p))
+    delta_h_p = np.where(c1_p * c2_p == 0, 0, delta_h_p)
+    delta_big_h_p = 2 * np.sqrt(c1_p * c2_p) * np.sin(np.radians(delta_h_p) / 2)
 
-def _find_closest_color_id_in_gc(gc: GoogleCalendar, base_color_hex: str) -> str:
-    """Returns the closest color_id to $base_color_hex from the $gc calendar."""
+    avg_l_p = (l1 + l2) / 2
+    avg_c_p = (c1_p + c2_p) / 2
+    sum_h_p = h1_p + h2_p
+    avg_h_p = np.where(sum_h_p < 360, (sum_h_p + 360) / 2, (sum_h_p - 360) / 2)
+    avg_h_p = np.where(np.abs(h1_p - h2_p) > 180, avg_h_p, sum_h_p / 2)
+    avg_h_p = np.where(c1_p * c2_p == 0, sum_h_p, avg_h_p)
 
-    def conv_to_lab(color_hex: str) -> sRGBColor:
-        return convert_color(sRGBColor.new_from_rgb_hex(color_hex), LabColor)
+    t = (
+        1
+        - 0.17 * np.cos(np.radians(avg_h_p - 30))
+        + 0.24 * np.cos(np.radians(2 * avg_h_p))
+        + 0.32 * np.cos(np.radians(3 * avg_h_p + 6))
+        - 0.20 * np.cos(np.radians(4 * avg_h_p - 63))
+    )
+    delta_theta = 30 * np.exp(-(((avg_h_p - 275) / 25) ** 2))
+    r_c = 2 * np.sqrt(avg_c_p ** 7 / (avg_c_p ** 7 + 25 ** 7))
+    s_l = 1 + 0.015 * (avg_l_p - 50) ** 2 / np.sqrt(20 + (avg_l_p - 50) ** 2)
+    s_c = 1 + 0.045 * avg_c_p
+    s_h = 1 + 0.015 * avg_c_p * t
+    r_t = -np.sin(np.radians(2 * delta_theta)) * r_c
 
-    base_c = conv_to_lab(base_color_hex)
-    return sorted(  # return closest cid
-        ((cid, delta_e_cie2000(base_c, conv_to_lab(c_hex))) for cid, c_hex in get_event_possible_colors(gc).items()),
-        key=lambda x: x[1],  # type: ignore
-    )[0][0]
+    delta_e: np.ndarray = np.sqrt(
+        (delta_l_p / s_l) ** 2
+        + (delta_c_p / s_c) ** 2
+        + (delta_big_h_p / s_h) ** 2
+        + r_t * (delta_c_p / s_c) * (delta_big_h_p / s_h)
+    )
+    return delta_e
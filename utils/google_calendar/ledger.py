@@ -0,0 +1,89 @@
+"""Local record of the gc event that currently holds each synced outlook entry.
+
+Lets an upsert go straight to the right event_id instead of probing $hash0, $hash1, ... until a 404.
+"""
+from typing import Dict, Iterable, NamedTuple, Optional
+
+from sqlalchemy import Column, Integer, String
+from sqlalchemy.dialects.sqlite import insert
+
+from utils.config import DB_ENGINE
+from utils.db import Base, get_session
+
+_MAX_SQL_VARIABLES = 500  # sqlite limits the number of bound parameters in a query
+
+
+class GcSyncLedger(Base):  # type: ignore
+    __tablename__ = "gc_sync_ledger"
+    calendar_id = Column(String, primary_key=True, nullable=False)
+    event_hash = Column(String, primary_key=True, nullable=False)  # hash_event_id_for_gc() of the outlook entry
+    gc_event_id = Column(String, nullable=False)
+    counter = Column(Integer, nullable=False)  # the suffix of gc_event_id after event_hash
+    etag = Column(String)
+
+
+Base.metadata.create_all(DB_ENGINE)
+
+
+class LedgerEntry(NamedTuple):
+    gc_event_id: str
+    counter: int
+    etag: Optional[str]
+
+
+def get_ledger_entries(calendar_id: str, event_hashes: Iterable[str]) -> Dict[str, LedgerEntry]:
+    """Returns the ledger entries of $event_hashes in $calendar_id, hashes without an entry are left out.
+
+    Args:
+        calendar_id: google calendar id
+        event_hashes: hash_event_id_for_gc() values to look up
+    """
+    event_hashes = list(event_hashes)
+    ret: Dict[str, LedgerEntry] = {}
+    with get_session() as sess:
+        for chunk_start in range(0, len(event_hashes), _MAX_SQL_VARIABLES):
+            rows = sess.query(GcSyncLedger).filter(
+                GcSyncLedger.calendar_id == calendar_id,
+                GcSyncLedger.event_hash.in_(event_hashes[chunk_start : chunk_start + _MAX_SQL_VARIABLES]),
+            )
+            ret.update({row.event_hash: LedgerEntry(row.gc_event_id, row.counter, row.etag) for row in rows})
+    return ret
+
+
+def get_ledger_entry(calendar_id: str, event_hash: str) -> Optional[LedgerEntry]:
+    return get_ledger_entries(calendar_id, [event_hash]).get(event_hash)
+
+
+def upsert_ledger_entries(calendar_id: str, entries: Dict[str, LedgerEntry]) -> None:
+    """Update/Insert the ledger entries of $calendar_id in a single transaction.
+
+    Args:
+        calendar_id: google calendar id
+        entries: dict of hash_event_id_for_gc() value to its current gc event
+    """
+    if len(entries) == 0:
+        return
+    insert_stmt = insert(GcSyncLedger)
+    upsert_stmt = insert_stmt.on_conflict_do_update(
+        index_elements=[GcSyncLedger.calendar_id.name, GcSyncLedger.event_hash.name],
+        set_=dict(
+            gc_event_id=insert_stmt.excluded.gc_event_id,
+            counter=insert_stmt.excluded.counter,
+            etag=insert_stmt.excluded.etag,
+        ),
+    )
+    with get_session() as sess:
+        sess.execute(
+            upsert_stmt,
+            [dict(calendar_id=calendar_id, event_hash=h, **entry._asdict()) for h, entry in entries.items()],
+        )
+
+
+def delete_ledger_entries(calendar_id: str, event_hashes: Iterable[str]) -> None:
+    event_hashes = list(event_hashes)
+    with get_session() as sess:
+        for chunk_start in range(0, len(event_hashes), _MAX_SQL_VARIABLES):
+            sess.query(GcSyncLedger).filter(
+                GcSyncLedger.calendar_id == calendar_id,
+                GcSyncLedger.event_hash.in_(event_hashes[chunk_start : chunk_start + _MAX_SQL_VARIABLES]),
+            ).delete(synchronize_session=False)
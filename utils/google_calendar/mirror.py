@@ -0,0 +1,179 @@
+"""Local mirror of the events of each google calendar, kept up to date with the API's incremental sync.
+
+https://developers.google.com/calendar/api/guides/sync
+The first refresh of a calendar lists all its events page by page (each page is written to the db as it arrives),
+later ones only fetch the events changed since the nextSyncToken saved by the previous refresh. An expired token
+(410 Gone) wipes the calendar's mirror and starts over with a full sync.
+"""
+import logging
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+import googleapiclient.errors
+from gcsa.google_calendar import GoogleCalendar
+from sqlalchemy import Column, DateTime, String
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Query
+
+from utils.config import DB_ENGINE
+from utils.db import Base, get_session
+from utils.google_calendar.general import resolve_calendar_id
+from utils.profiling import profiled
+
+LIST_PAGE_SIZE = 250  # the API's default and the events kept in memory at once
+WINDOW = timedelta(days=7)  # iter_mirrored_event_ids() reads ranges a window at a time
+
+_MAX_SQL_VARIABLES = 500  # sqlite limits the number of bound parameters in a query
+
+
+class GcEventMirror(Base):  # type: ignore
+    __tablename__ = "gc_event_mirror"
+    calendar_id = Column(String, primary_key=True, nullable=False)
+    event_id = Column(String, primary_key=True, nullable=False)
+    start = Column(DateTime, index=True)  # UTC, naive
+    end = Column(DateTime)  # UTC, naive
+    etag = Column(String)
+
+
+class GcSyncToken(Base):  # type: ignore
+    __tablename__ = "gc_sync_token"
+    calendar_id = Column(String, primary_key=True, nullable=False)
+    sync_token = Column(String, nullable=False)
+
+
+Base.metadata.create_all(DB_ENGINE)
+
+
+class SyncTokenExpired(Exception):
+    """The saved nextSyncToken was rejected (410 Gone), a full sync is needed."""
+
+
+@profiled
+def refresh_mirror(gc: GoogleCalendar) -> int:
+    """Brings the mirror of $gc's calendar up to date, incrementally if a sync token was saved.
+
+    Returns:
+        The number of changed (or, on a full sync, listed) events.
+    """
+    calendar_id = resolve_calendar_id(gc)
+    sync_token = get_sync_token(calendar_id)
+    if sync_token is not None:
+        try:
+            return _sync_pages(gc, calendar_id, sync_token)
+        except SyncTokenExpired:
+            logging.info(f'Sync token of "{calendar_id}" expired, doing a full sync')
+    reset_mirror(calendar_id)
+    return _sync_pages(gc, calendar_id, None)
+
+
+def reset_mirror(calendar_id: str) -> None:
+    """Forgets the mirror and sync token of $calendar_id, the next refresh_mirror() does a full sync."""
+    with get_session() as sess:
+        sess.query(GcEventMirror).filter(GcEventMirror.calendar_id == calendar_id).delete(synchronize_session=False)
+        sess.query(GcSyncToken).filter(GcSyncToken.calendar_id == calendar_id).delete(synchronize_session=False)
+
+
+def get_sync_token(calendar_id: str) -> Optional[str]:
+    with get_session() as sess:
+        sync_token: Optional[str] = (
+            sess.query(GcSyncToken.sync_token).filter(GcSyncToken.calendar_id == calendar_id).scalar()
+        )
+        return sync_token
+
+
+def iter_mirrored_event_ids(calendar_id: str, time_min: datetime, time_max: datetime) -> Iterator[List[str]]:
+    """Yields the ids of the mirrored events overlapping [$time_min, $time_max), a WINDOW of the range at a time.
+
+    An event overlapping several windows is yielded in each of them.
+    """
+    time_min, time_max = _naive_utc(time_min), _naive_utc(time_max)
+    window_start = time_min
+    while window_start < time_max:
+        window_end = min(window_start + WINDOW, time_max)
+        with get_session() as sess:
+            rows: Query[Any] = sess.query(GcEventMirror.event_id).filter(
+                GcEventMirror.calendar_id == calendar_id,
+                GcEventMirror.start < window_end,  # type: ignore[arg-type] # columns of the untyped Base
+                GcEventMirror.end > window_start,  # type: ignore[arg-type]
+            )
+            yield [row.event_id for row in rows]
+        window_start = window_end
+
+
+def _sync_pages(gc: GoogleCalendar, calendar_id: str, sync_token: Optional[str]) -> int:
+    """Lists the events (changed since $sync_token if given) page by page into $calendar_id's mirror, saves the next
+    token."""
+    events_api = gc.service.events()
+    n_events = 0
+    page_token = None
+    while True:
+        list_kwargs: Dict[str, Any] = dict(
+            calendarId=gc.calendar, singleEvents=True, maxResults=LIST_PAGE_SIZE, pageToken=page_token
+        )
+        if sync_token is not None:
+            list_kwargs.update(syncToken=sync_token)
+        try:
+            page = events_api.list(**list_kwargs).execute()
+        except googleapiclient.errors.HttpError as e:
+            if e.status_code == 410 and sync_token is not None:
+                raise SyncTokenExpired() from e
+            raise
+
+        _apply_page(calendar_id, page.get("items", []))
+        n_events += len(page.get("items", []))
+        page_token = page.get("nextPageToken")
+        if page_token is None:
+            _save_sync_token(calendar_id, page["nextSyncToken"])
+            return n_events
+
+
+def _apply_page(calendar_id: str, events_json: List[Dict[str, Any]]) -> None:
+    """Upserts the listed events into the mirror, cancelled ones are removed from it."""
+    cancelled_ids = [e_json["id"] for e_json in events_json if e_json.get("status") == "cancelled"]
+    rows = [
+        dict(calendar_id=calendar_id, event_id=e_json["id"], etag=e_json.get("etag"), **_event_range(e_json))
+        for e_json in events_json
+        if e_json.get("status") != "cancelled"
+    ]
+    with get_session() as sess:
+        for chunk_start in range(0, len(cancelled_ids), _MAX_SQL_VARIABLES):
+            sess.query(GcEventMirror).filter(
+                GcEventMirror.calendar_id == calendar_id,
+                GcEventMirror.event_id.in_(cancelled_ids[chunk_start : chunk_start + _MAX_SQL_VARIABLES]),
+            ).delete(synchronize_session=False)
+        if len(rows) != 0:
+            insert_stmt = insert(GcEventMirror)
+            sess.execute(
+                insert_stmt.on_conflict_do_update(
+                    index_elements=[GcEventMirror.calendar_id.name, GcEventMirror.event_id.name],
+                    set_=dict(
+                        start=insert_stmt.excluded.start, end=insert_stmt.excluded.end, etag=insert_stmt.excluded.etag
+                    ),
+                ),
+                rows,
+            )
+
+
+def _save_sync_token(calendar_id: str, sync_token: str) -> None:
+    insert_stmt = insert(GcSyncToken).values(calendar_id=calendar_id, sync_token=sync_token)
+    with get_session() as sess:
+        sess.execute(
+            insert_stmt.on_conflict_do_update(
+                index_elements=[GcSyncToken.calendar_id.name], set_=dict(sync_token=insert_stmt.excluded.sync_token)
+            )
+        )
+
+
+def _event_range(event_json: Dict[str, Any]) -> Dict[str, datetime]:
+    return dict(start=_event_time(event_json["start"]), end=_event_time(event_json["end"]))
+
+
+def _event_time(event_time: Dict[str, str]) -> datetime:
+    """Returns the naive UTC time of an event's start/end, all day events ("date") start at midnight UTC."""
+    if "dateTime" in event_time:
+        return _naive_utc(datetime.fromisoformat(event_time["dateTime"].replace("Z", "+00:00")))
+    return datetime.combine(date.fromisoformat(event_time["date"]), time())
+
+
+def _naive_utc(dt: datetime) -> datetime:
+    return dt.astimezone(timezone.utc).replace(tzinfo=None)
@@ -0,0 +1,233 @@
+"""Rate limiting and retries for the Google Calendar API.
+
+https://developers.google.com/calendar/api/guides/errors
+Throttled calls (403 rateLimitExceeded/userRateLimitExceeded, 429) and server errors (5xx) are retried with jittered
+exponential backoff. All the calls go through an AdaptiveRateLimiter, a token bucket whose rate and concurrency are
+cut on throttling and slowly ramp back up on successful calls.
+"""
+import json
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator, Optional, TypeVar
+
+import googleapiclient.errors
+from gcsa.google_calendar import GoogleCalendar
+
+from utils.profiling import API_CALL, count
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_RATE_LIMIT_REASONS = ("rateLimitExceeded", "userRateLimitExceeded")
+
+
+class AdaptiveRateLimiter:
+    """Token bucket with an adaptive rate and a cap on the calls in flight (AIMD, like TCP congestion control).
+
+    Thread safe, a single limiter is shared by all the calendars of the process since the API quota is per project.
+    """
+
+    def __init__(
+        self,
+        rate_per_s: float = 10.0,
+        max_rate_per_s: float = 20.0,
+        min_rate_per_s: float = 0.5,
+        max_concurrency: int = 8,
+    ):
+        self.rate_per_s = rate_per_s
+        self.max_rate_per_s = max_rate_per_s
+        self.min_rate_per_s = min_rate_per_s
+        self.max_concurrency = max_concurrency
+        self.concurrency = max_concurrency
+        self._tokens = 1.0
+        self._last_refill = time.monotonic()
+        self._in_flight = 0
+        self._cond = threading.Condition()
+
+    def acquire(self) -> None:
+        """Blocks until a call can be made, every acquire() should be followed by a release()."""
+        with self._cond:
+            while self._in_flight >= self.concurrency:
+                self._cond.wait()
+            self._in_flight += 1
+            while True:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                self._cond.wait((1 - self._tokens) / self.rate_per_s)
+
+    def release(self, throttled: bool = False, succeeded: bool = True) -> None:
+        """Ends a call, $throttled halves the rate and the concurrency, a call that $succeeded grows them a bit.
+
+        Calls that failed otherwise (e.g. 404 or 400) leave them as they are.
+        """
+        with self._cond:
+            self._in_flight -= 1
+            if throttled or succeeded:
+                self._adapt(throttled)
+            self._cond.notify_all()
+
+    def report_throttling(self) -> None:
+        """Slows down after a throttled call that didn't fail its own acquire() (e.g. a call inside a batch)."""
+        with self._cond:
+            self._adapt(throttled=True)
+
+    def _adapt(self, throttled: bool) -> None:
+        if throttled:
+            self.rate_per_s = max(self.min_rate_per_s, self.rate_per_s / 2)
+            self.concurrency = max(1, self.concurrency // 2)
+        else:
+            self.rate_per_s = min(self.max_rate_per_s, self.rate_per_s + 1 / self.rate_per_s)
+            self.concurrency = min(self.max_concurrency, self.concurrency + 1)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        burst = max(1.0, self.rate_per_s)  # at most a second worth of calls at once
+        self._tokens = min(burst, self._tokens + (now - self._last_refill) * self.rate_per_s)
+        self._last_refill = now
+
+
+@dataclass
+class RetryPolicy:
+    max_retries: int = 6
+    base_delay_s: float = 0.5
+    max_delay_s: float = 32.0
+
+    def delay(self, attempt: int) -> float:
+        """Full jitter backoff, a random delay up to base_delay_s * 2 ** $attempt."""
+        return random.uniform(0, min(self.max_delay_s, self.base_delay_s * 2 ** attempt))
+
+
+def is_retryable_error(error: Exception) -> bool:
+    """Whether $error is a throttling or server error, which should be retried after a backoff."""
+    if not isinstance(error, googleapiclient.errors.HttpError):
+        return False
+    status = int(error.resp.status)
+    return status == 429 or status >= 500 or (status == 403 and _error_reason(error) in _RATE_LIMIT_REASONS)
+
+
+def _error_reason(error: googleapiclient.errors.HttpError) -> Optional[str]:
+    try:
+        return str(json.loads(error.content)["error"]["errors"][0]["reason"])
+    except (ValueError, KeyError, IndexError, TypeError):
+        return None
+
+
+_default_limiter = AdaptiveRateLimiter()
+
+
+def call_with_retry(
+    func: Callable[[], T], limiter: Optional[AdaptiveRateLimiter] = None, retry_policy: Optional[RetryPolicy] = None
+) -> T:
+    """Calls $func through $limiter, retrying it on throttling and server errors.
+
+    Raises:
+        The last error of $func if it isn't retryable or still fails after retry_policy.max_retries retries
+    """
+    limiter = _default_limiter if limiter is None else limiter
+    retry_policy = RetryPolicy() if retry_policy is None else retry_policy
+    for attempt in range(retry_policy.max_retries + 1):
+        limiter.acquire()
+        try:
+            ret = func()
+        except Exception as e:  # noqa
+            retryable = is_retryable_error(e)
+            limiter.release(throttled=retryable, succeeded=False)
+            if not retryable or attempt == retry_policy.max_retries:
+                raise
+            delay = retry_policy.delay(attempt)
+            logger.info("retrying a throttled google calendar call in %.2fs (%s)", delay, e)
+            time.sleep(delay)
+        else:
+            limiter.release()
+            return ret
+    raise AssertionError("unreachable")
+
+
+class _RetryingRequest:
+    """Wraps a googleapiclient HttpRequest, execute() goes through the rate limiter and is retried."""
+
+    def __init__(self, http_request: Any, calendar: "RateLimitedGoogleCalendar"):
+        self.http_request = http_request  # execute_in_batches() adds the wrapped request to batches
+        self._calendar = calendar
+
+    def execute(self, **kwargs: Any) -> Any:
+        return self._calendar.call(lambda: self.http_request.execute(**kwargs))
+
+
+class _RetryingResource:
+    def __init__(self, resource: Any, calendar: "RateLimitedGoogleCalendar"):
+        self._resource = resource
+        self._calendar = calendar
+
+    def __getattr__(self, name: str) -> Any:
+        method = getattr(self._resource, name)
+
+        def _request(*args: Any, **kwargs: Any) -> _RetryingRequest:
+            return _RetryingRequest(method(*args, **kwargs), self._calendar)
+
+        return _request
+
+
+class _RetryingService:
+    def __init__(self, service: Any, calendar: "RateLimitedGoogleCalendar"):
+        self._service = service
+        self._calendar = calendar
+
+    def events(self) -> _RetryingResource:
+        return _RetryingResource(self._service.events(), self._calendar)
+
+    def calendars(self) -> _RetryingResource:
+        return _RetryingResource(self._service.calendars(), self._calendar)
+
+    def __getattr__(self, name: str) -> Any:  # e.g. new_batch_http_request, execute_in_batches() limits batches
+        return getattr(self._service, name)
+
+
+class RateLimitedGoogleCalendar:
+    """GoogleCalendar proxy whose calls (including raw service().events() requests) are rate limited and retried.
+
+    gcsa methods are called through call_with_retry(), get_events() reads all the pages inside the retried call.
+    """
+
+    def __init__(
+        self,
+        gc: GoogleCalendar,
+        limiter: Optional[AdaptiveRateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+    ):
+        self.gc = gc
+        self.limiter = _default_limiter if limiter is None else limiter
+        self.retry_policy = RetryPolicy() if retry_policy is None else retry_policy
+        self.service = _RetryingService(gc.service, self)
+
+    def call(self, func: Callable[[], T]) -> T:
+        count(API_CALL)
+        return call_with_retry(func, self.limiter, self.retry_policy)
+
+    def get_events(self, *args: Any, **kwargs: Any) -> Any:
+        return iter(self.call(lambda: list(self.gc.get_events(*args, **kwargs))))
+
+    def __iter__(self) -> Iterator[Any]:  # like GoogleCalendar, dunder methods aren't looked up by __getattr__
+        events: Iterator[Any] = self.get_events()
+        return events
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self.gc, name)
+        if not callable(attr):
+            return attr
+
+        def _call(*args: Any, **kwargs: Any) -> Any:
+            return self.call(lambda: attr(*args, **kwargs))
+
+        return _call
+
+
+def rate_limited(gc: GoogleCalendar) -> RateLimitedGoogleCalendar:
+    """Returns $gc wrapped with the default rate limiter and retry policy, unless it's already wrapped."""
+    return gc if isinstance(gc, RateLimitedGoogleCalendar) else RateLimitedGoogleCalendar(gc)
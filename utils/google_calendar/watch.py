@@ -0,0 +1,93 @@
+"""Long running sync of an outlook calendar to google calendar, driven by the item events of the calendar folder.
+
+Each debounced burst of item events re-reads the calendar incrementally and pushes only the entries that changed,
+a periodic full sync of the read range catches anything the events missed (e.g. changes made while Outlook was
+offline, or events dropped by COM).
+"""
+import logging
+import threading
+import time
+from typing import Any, Callable, Optional
+
+import win32com.client
+from gcsa.google_calendar import GoogleCalendar
+
+from utils.google_calendar.events import apply_outlook_changes_to_gc, sync_outlook_events_with_gc_batched, SyncStats
+from utils.google_calendar.rate_limit import rate_limited
+from utils.outlook_reader.general import OutlookSession
+from utils.outlook_reader.incremental import IncrementalCalendarReader
+from utils.outlook_reader.watch import wait_for_changes, watch_calendar_items
+
+_STOP_CHECK_INTERVAL_S = 1.0  # max time $stop_event is left unnoticed while waiting for changes
+
+
+def watch_outlook_calendar(
+    calendar: win32com.client.CDispatch,
+    gc: GoogleCalendar,
+    days_ahead: int = 7,
+    debounce_s: float = 2.0,
+    max_delay_s: float = 10.0,
+    reconcile_interval_s: float = 3600.0,
+    dispatch_with_events: Optional[Callable[[Any, type], Any]] = None,
+    stop_event: Optional[threading.Event] = None,
+) -> None:
+    """Keeps $gc in sync with the next $days_ahead days of $calendar until $stop_event is set.
+
+    Should be called in the thread that $calendar belongs to, its COM events are pumped there.
+    Args:
+        calendar: The Calendar folder to watch.
+        gc: google calendar object
+        days_ahead: number of days ahead to sync
+        debounce_s: quiet time after an item event before the changes are pushed
+        max_delay_s: max time changes are held back by a continuous stream of item events
+        reconcile_interval_s: time between full syncs of the range, also done on start and after a failed push
+        dispatch_with_events: win32com.client.DispatchWithEvents if None, or a fake (tests/fakes/outlook.py)
+        stop_event: stops the watch when set, runs forever if None
+    """
+    gc = rate_limited(gc)
+    stop_event = threading.Event() if stop_event is None else stop_event
+    session = OutlookSession(calendar.Session)
+    watch = watch_calendar_items(calendar, dispatch_with_events)  # subscribed before the first read, no gap
+    reader = IncrementalCalendarReader(calendar, days_ahead, session)
+    next_reconcile_t = time.monotonic()
+
+    while not stop_event.is_set():
+        if time.monotonic() >= next_reconcile_t:
+            try:
+                reader = IncrementalCalendarReader(calendar, days_ahead, session)  # forgets the previous reads
+                _log_stats("Full sync", _reconcile(gc, reader))
+            except Exception:  # noqa
+                logging.exception("Full sync failed, retrying on the next interval")
+            next_reconcile_t = time.monotonic() + reconcile_interval_s
+
+        timeout_s = min(_STOP_CHECK_INTERVAL_S, max(0.0, next_reconcile_t - time.monotonic()))
+        changes = wait_for_changes(watch.notifications, debounce_s, max_delay_s, timeout_s)
+        if len(changes) == 0:
+            continue
+        try:
+            delta = reader.read(touched_ids={n.entry_id for n in changes if n.entry_id is not None})
+            stats = apply_outlook_changes_to_gc(gc, delta.updated_entries, delta.removed_entries)
+            _log_stats(f"Pushed {len(changes)} item events", stats)
+            if len(stats.failures) != 0:
+                next_reconcile_t = time.monotonic()  # the failed items are retried by a full sync
+        except Exception:  # noqa
+            logging.exception("Failed to push outlook changes, doing a full sync")
+            next_reconcile_t = time.monotonic()
+
+
+def _reconcile(gc: GoogleCalendar, reader: IncrementalCalendarReader) -> Optional[SyncStats]:
+    """Reads the whole range with $reader and syncs it with gc, None if it has no entries (nothing to compare)."""
+    delta = reader.read()
+    if len(delta.entries) == 0:
+        return None
+    return sync_outlook_events_with_gc_batched(gc, delta.entries)
+
+
+def _log_stats(action: str, stats: Optional[SyncStats]) -> None:
+    if stats is None:
+        logging.info(f"{action}: no outlook entries in range")
+        return
+    logging.info(
+        f"{action}: {stats.created} created, {stats.patched} patched, {stats.deleted} deleted, "
+        f"{stats.skipped} unchanged, {len(stats.failures)} failed"
+    )
@@ -1,22 +1,22 @@
 import datetime
-from typing import List
+from typing import Iterator, List, Optional
 
 import win32com.client
 from pywintypes import com_error, TimeType
 
-from utils.outlook_reader.constants import BUSYSTATUS_ENUM, OUTLOOK_COLOR_ENUM
-from utils.outlook_reader.general import generate_outlook_namespace
+from utils.outlook_reader.constants import BUSYSTATUS_ENUM
+from utils.outlook_reader.general import generate_outlook_namespace, OutlookSession
 from utils.outlook_reader.outlook_event import OutlookCalendarEntry
+from utils.outlook_reader.recurrence import iter_occurrence_dates
+from utils.profiling import instrument_com, profiled
 
 
 def get_category_color(cat_name: str, namespace: win32com.client.CDispatch = None) -> str:
-    """Extract the category color (in hex) for $cat_name from the current user."""
-    namespace = generate_outlook_namespace() if namespace is None else namespace
-    for cat in namespace.Categories:
-        if cat.Name == cat_name:
-            return OUTLOOK_COLOR_ENUM[cat.Color]
-    else:
-        raise ValueError(f"{cat_name} is not a valid outlook category name")
+    """Extract the category color (in hex) for $cat_name from the current user.
+
+    Reads all the categories over COM, use OutlookSession.get_category_color() when looking up many categories.
+    """
+    return OutlookSession(namespace).get_category_color(cat_name)
 
 
 def get_current_user_outlook_calendar() -> win32com.client.CDispatch:
@@ -25,48 +25,71 @@ def get_current_user_outlook_calendar() -> win32com.client.CDispatch:
     return namespace.GetDefaultFolder(9)
 
 
+@profiled
 def _expand_recurring_items(
     items: win32com.client.CDispatch, begin: datetime.date, end: datetime.date
 ) -> List[win32com.client.CDispatch]:
     """Expand items list according to recurring items."""
-    ret_list = []
+    return list(_iter_expanded_recurring_items(items, begin, end))
+
+
+def _iter_expanded_recurring_items(
+    items: win32com.client.CDispatch, begin: datetime.date, end: datetime.date
+) -> Iterator[win32com.client.CDispatch]:
+    """Same as _expand_recurring_items(), yields the items while reading them."""
     for appointment_item in items:
         if appointment_item.IsRecurring:
             rp = appointment_item.GetRecurrencePattern()
-            curr_delta = 0
-            while rp.PatternStartDate.date() + datetime.timedelta(days=curr_delta) < end:
+            pattern_start_date = rp.PatternStartDate.date()
+            for occ_date in iter_occurrence_dates(rp, begin, end):
+                curr_delta = (occ_date - pattern_start_date).days
                 try:
                     occ_app_item = rp.GetOccurrence(appointment_item.Start + datetime.timedelta(days=curr_delta))
+                except com_error:  # the occurrence was moved or deleted, moved ones are read from the exceptions
+                    continue
 
-                    occ_app_item.__dict__["ConversationID"] = appointment_item.ConversationID + f"REG{curr_delta}"
-                    ret_list.append(occ_app_item)
-                except com_error:
-                    pass
-                finally:
-                    curr_delta += 1
+                occ_app_item.__dict__["ConversationID"] = appointment_item.ConversationID + f"REG{curr_delta}"
+                yield occ_app_item
 
             # Exceptions in range
             for i, exp_appointment_item in enumerate([exp.AppointmentItem for exp in rp.Exceptions]):
                 if exp_appointment_item.Start.date() >= begin and exp_appointment_item.End.date() <= end:
                     exp_appointment_item.__dict__["ConversationID"] = appointment_item.ConversationID + f"EXP{i}"
-                    ret_list.append(exp_appointment_item)
+                    yield exp_appointment_item
 
         else:  # normal event
-            ret_list.append(appointment_item)
+            yield appointment_item
 
-    return ret_list
 
-
-def read_local_outlook_calendar(calendar: win32com.client.CDispatch, days_ahead: int = 7) -> List[OutlookCalendarEntry]:
+@profiled
+def read_local_outlook_calendar(
+    calendar: win32com.client.CDispatch, days_ahead: int = 7, session: Optional[OutlookSession] = None
+) -> List[OutlookCalendarEntry]:
     """Read local outlook calendar events during the next $days_ahead days.
 
     Args:
         calendar: The Calendar folder to use.
         days_ahead: The number of days ahead to read from the calendar
+        session: Outlook session to reuse between reads (keeps the category colors), uses calendar's if None
 
     Returns:
         List of CalendarEntries with read information
     """
+    return list(iter_local_outlook_calendar(calendar, days_ahead, session))
+
+
+def iter_local_outlook_calendar(
+    calendar: win32com.client.CDispatch, days_ahead: int = 7, session: Optional[OutlookSession] = None
+) -> Iterator[OutlookCalendarEntry]:
+    """Same as read_local_outlook_calendar() but yields each entry as soon as it's read.
+
+    The entries of single items come by their start time, recurring items are expanded where they're met.
+    Like any COM access, the generator should be consumed in the thread that created $calendar.
+    """
+    calendar = instrument_com(calendar)
+    session = OutlookSession(calendar.Session) if session is None else session
+    session.refresh_categories_if_changed()
+
     # Get the AppointmentItem objects
     # http://msdn.microsoft.com/en-us/library/office/aa210899(v=office.11).aspx
     items = calendar.Items
@@ -74,51 +97,71 @@ def read_local_outlook_calendar(calendar: win32com.client.CDispatch, days_ahead:
     # Restrict to items in the next $days_ahead days
     begin = datetime.date.today()
     end = begin + datetime.timedelta(days=days_ahead)
-    restriction = "[Start] >= '" + begin.strftime("%d/%m/%Y") + "' AND [End] <= '" + end.strftime("%d/%m/%Y") + "'"
     items.IncludeRecurrences = True
-    restricted_items = items.Restrict(restriction)
+    restricted_items = items.Restrict(_date_restriction(begin, end))
     restricted_items.Sort("[Start]")
 
-    def format_attendees_to_list(att_list: str) -> List[str]:
-        return att_list.split("; ") if att_list != "" else []  # TODO: clean attendees names
-
-    def format_categories_to_list(cat_list: str) -> List[str]:
-        return cat_list.split(", ") if cat_list != "" else []
-
-    def convert_pywintypes_datetime_to_datetime(
-        pywin_dt: TimeType, o_timezone: win32com.client.CDispatch
-    ) -> datetime.datetime:
-        timezone = datetime.timezone(datetime.timedelta(minutes=-(o_timezone.Bias + o_timezone.DaylightBias)))
-        return datetime.datetime.fromisoformat(pywin_dt.isoformat()[:-9]).astimezone(timezone)  # remove +03:00 from iso
-
     # Read items - Note that Outlook might prevent access to individual
     # item attributes, such as "Organizer", while access to other attributes of
     # the same item is granted.
-    calendar_entries = []
-    for appointment_item in _expand_recurring_items(restricted_items, begin, end):
-        start_date = convert_pywintypes_datetime_to_datetime(appointment_item.Start, appointment_item.StartTimeZone)
-        end_date = convert_pywintypes_datetime_to_datetime(appointment_item.End, appointment_item.EndTimeZone)
-        subject = appointment_item.Subject
-        opt_attendees = format_attendees_to_list(appointment_item.OptionalAttendees)
-        required_attendees = format_attendees_to_list(appointment_item.RequiredAttendees)
-        busystatus = BUSYSTATUS_ENUM[appointment_item.BusyStatus]
-        location = appointment_item.Location
-        organizer = appointment_item.Organizer
-        categories = format_categories_to_list(appointment_item.Categories)
-        conversation_id = appointment_item.ConversationID  # maybe an ID resilient to reschedules
-
-        entry = OutlookCalendarEntry(
-            subject,
-            start_date,
-            end_date,
-            location,
-            organizer,
-            busystatus,
-            required_attendees + opt_attendees,
-            categories,
-            [get_category_color(cat_name) for cat_name in categories],
-            conversation_id,
-        )
-        calendar_entries.append(entry)
-
-    return calendar_entries
+    for appointment_item in _iter_expanded_recurring_items(restricted_items, begin, end):
+        yield _outlook_entry_from_item(appointment_item, session)
+
+
+def _date_restriction(begin: datetime.date, end: datetime.date) -> str:
+    """Returns an Items.Restrict() / Folder.GetTable() filter for items between $begin and $end."""
+    return "[Start] >= '" + begin.strftime("%d/%m/%Y") + "' AND [End] <= '" + end.strftime("%d/%m/%Y") + "'"
+
+
+def _recurring_restriction(end: datetime.date) -> str:
+    """Returns a filter for the recurring items (series masters) whose first occurrence starts before $end.
+
+    Series which ended before the range are still matched, Jet filters can't read the pattern's end date.
+    """
+    return "[IsRecurring] = True AND [Start] < '" + end.strftime("%d/%m/%Y") + "'"
+
+
+def _format_attendees_to_list(att_list: str) -> List[str]:
+    return att_list.split("; ") if att_list != "" else []  # TODO: clean attendees names
+
+
+def _format_categories_to_list(cat_list: str) -> List[str]:
+    return cat_list.split(", ") if cat_list != "" else []
+
+
+@profiled
+def _convert_pywintypes_datetime_to_datetime(
+    pywin_dt: TimeType, o_timezone: win32com.client.CDispatch
+) -> datetime.datetime:
+    timezone = datetime.timezone(datetime.timedelta(minutes=-(o_timezone.Bias + o_timezone.DaylightBias)))
+    return datetime.datetime.fromisoformat(pywin_dt.isoformat()[:-9]).astimezone(timezone)  # remove +03:00 from iso
+
+
+@profiled
+def _outlook_entry_from_item(
+    appointment_item: win32com.client.CDispatch, session: OutlookSession
+) -> OutlookCalendarEntry:
+    """Build an OutlookCalendarEntry from an AppointmentItem."""
+    start_date = _convert_pywintypes_datetime_to_datetime(appointment_item.Start, appointment_item.StartTimeZone)
+    end_date = _convert_pywintypes_datetime_to_datetime(appointment_item.End, appointment_item.EndTimeZone)
+    subject = appointment_item.Subject
+    opt_attendees = _format_attendees_to_list(appointment_item.OptionalAttendees)
+    required_attendees = _format_attendees_to_list(appointment_item.RequiredAttendees)
+    busystatus = BUSYSTATUS_ENUM[appointment_item.BusyStatus]
+    location = appointment_item.Location
+    organizer = appointment_item.Organizer
+    categories = _format_categories_to_list(appointment_item.Categories)
+    conversation_id = appointment_item.ConversationID  # maybe an ID resilient to reschedules
+
+    return OutlookCalendarEntry(
+        subject,
+        start_date,
+        end_date,
+        location,
+        organizer,
+        busystatus,
+        required_attendees + opt_attendees,
+        categories,
+        [session.get_category_color(cat_name) for cat_name in categories],
+        conversation_id,
+    )
@@ -0,0 +1,154 @@
+"""Columnar representation of many calendar entries, for fast sorts and filters over large reads."""
+import datetime
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Sequence, Tuple, Union
+
+import numpy as np
+
+from utils.outlook_reader.outlook_event import (
+    _entry_from_values,
+    _FIELD_NAMES,
+    _interned,
+    CompactCalendarEntry,
+    OutlookCalendarEntry,
+)
+
+NO_CODE = -1  # categorical code of an entry without a value (e.g. no category color)
+
+_OBJECT_COLUMNS = (
+    "subject",
+    "location",
+    "organizer",
+    "attendees",
+    "categories",
+    "categories_colors",
+    "conversation_id",
+)
+_LIST_COLUMNS = ("attendees", "categories", "categories_colors")
+
+Entry = Union[OutlookCalendarEntry, CompactCalendarEntry]
+
+
+@dataclass
+class EventBatch:
+    """Calendar entries stored by column, all the arrays have an item per entry.
+
+    Start and end times are datetime64[s] in UTC (seconds resolution) with the UTC offset of each entry kept aside,
+    busy statuses and first category colors are categorical codes into $busystatuses and $colors. The other fields
+    are object arrays, their lists are kept as tuples of interned strings (like CompactCalendarEntry).
+    """
+
+    start: np.ndarray  # datetime64[s], UTC
+    end: np.ndarray  # datetime64[s], UTC
+    start_utc_offset_s: np.ndarray  # int32
+    end_utc_offset_s: np.ndarray  # int32
+    busystatus_codes: np.ndarray  # int8 index into $busystatuses
+    color_codes: np.ndarray  # int8 index into $colors of the first category color, NO_CODE if there's none
+    busystatuses: Tuple[str, ...]
+    colors: Tuple[str, ...]
+    columns: Dict[str, np.ndarray]  # object arrays of _OBJECT_COLUMNS
+
+    @classmethod
+    def from_entries(cls, entries: Sequence[Entry]) -> "EventBatch":
+        """Builds a batch from $entries (with timezone aware start and end dates)."""
+        busystatuses, busystatus_codes = _categorize(ent.busystatus for ent in entries)
+        colors, color_codes = _categorize(
+            ent.categories_colors[0] if len(ent.categories_colors) != 0 else None for ent in entries
+        )
+        return cls(
+            start=np.array([int(ent.start_date.timestamp()) for ent in entries], dtype="datetime64[s]"),
+            end=np.array([int(ent.end_date.timestamp()) for ent in entries], dtype="datetime64[s]"),
+            start_utc_offset_s=np.array([_utc_offset_s(ent.start_date) for ent in entries], dtype=np.int32),
+            end_utc_offset_s=np.array([_utc_offset_s(ent.end_date) for ent in entries], dtype=np.int32),
+            busystatus_codes=busystatus_codes,
+            color_codes=color_codes,
+            busystatuses=busystatuses,
+            colors=colors,
+            columns={
+                name: _object_array(
+                    [_interned(getattr(ent, name)) if name in _LIST_COLUMNS else getattr(ent, name) for ent in entries]
+                )
+                for name in _OBJECT_COLUMNS
+            },
+        )
+
+    def to_entries(self) -> List[OutlookCalendarEntry]:
+        """Returns the entries of the batch, equal to the ones it was built from."""
+        time_zones: Dict[int, datetime.timezone] = {}
+
+        def _datetimes(times: np.ndarray, utc_offsets_s: np.ndarray) -> List[datetime.datetime]:
+            return [
+                datetime.datetime.fromtimestamp(ts, time_zones.setdefault(off, _timezone(off)))
+                for ts, off in zip(times.astype(np.int64).tolist(), utc_offsets_s.tolist())
+            ]
+
+        columns = {name: self.columns[name].tolist() for name in _OBJECT_COLUMNS}
+        columns["start_date"] = _datetimes(self.start, self.start_utc_offset_s)
+        columns["end_date"] = _datetimes(self.end, self.end_utc_offset_s)
+        columns["busystatus"] = [self.busystatuses[code] for code in self.busystatus_codes.tolist()]
+        return [_entry_from_values(values) for values in zip(*(columns[name] for name in _FIELD_NAMES))]
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+    def take(self, indices: np.ndarray) -> "EventBatch":
+        """Returns a batch of the entries at $indices (positions or a boolean mask), in their order."""
+        return EventBatch(
+            start=self.start[indices],
+            end=self.end[indices],
+            start_utc_offset_s=self.start_utc_offset_s[indices],
+            end_utc_offset_s=self.end_utc_offset_s[indices],
+            busystatus_codes=self.busystatus_codes[indices],
+            color_codes=self.color_codes[indices],
+            busystatuses=self.busystatuses,
+            colors=self.colors,
+            columns={name: column[indices] for name, column in self.columns.items()},
+        )
+
+    def sorted_by_start(self) -> "EventBatch":
+        return self.take(np.argsort(self.start, kind="stable"))
+
+    def between(self, begin: datetime.datetime, end: datetime.datetime) -> np.ndarray:
+        """Mask of the entries that start at/after $begin and end at/before $end."""
+        return (self.start >= _datetime64(begin)) & (self.end <= _datetime64(end))
+
+    def with_busystatus(self, *busystatuses: str) -> np.ndarray:
+        """Mask of the entries whose busy status is one of $busystatuses."""
+        codes = [self.busystatuses.index(status) for status in busystatuses if status in self.busystatuses]
+        return np.isin(self.busystatus_codes, codes)
+
+    def with_color(self, color: str) -> np.ndarray:
+        """Mask of the entries whose first category color is $color."""
+        if color not in self.colors:
+            return np.zeros(len(self), dtype=bool)
+        mask: np.ndarray = self.color_codes == self.colors.index(color)
+        return mask
+
+
+def _categorize(values: Iterable[object]) -> Tuple[Tuple[str, ...], np.ndarray]:
+    """Returns the distinct non-None $values (by first appearance) and the code of each value, NO_CODE for None."""
+    categories: Dict[str, int] = {}
+    codes = [NO_CODE if v is None else categories.setdefault(v, len(categories)) for v in values]  # type: ignore
+    assert len(categories) <= np.iinfo(np.int8).max, "too many categories for int8 codes"
+    return tuple(categories), np.array(codes, dtype=np.int8)
+
+
+def _object_array(values: List[object]) -> np.ndarray:
+    array = np.empty(len(values), dtype=object)  # np.array() would make a 2d array of equal length tuples
+    for i, value in enumerate(values):
+        array[i] = value
+    return array
+
+
+def _utc_offset_s(dt: datetime.datetime) -> int:
+    utc_offset = dt.utcoffset()
+    assert utc_offset is not None, "entries should have timezone aware dates"
+    return int(utc_offset.total_seconds())
+
+
+def _timezone(utc_offset_s: int) -> datetime.timezone:
+    return datetime.timezone(datetime.timedelta(seconds=utc_offset_s))
+
+
+def _datetime64(dt: datetime.datetime) -> np.datetime64:
+    return np.datetime64(int(dt.timestamp()), "s")
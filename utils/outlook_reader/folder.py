@@ -1,4 +1,4 @@
-from typing import Iterable, Optional
+from typing import Iterable, Optional, Sequence
 
 import win32com.client
 
@@ -19,7 +19,7 @@ def show_folder_tree(folders: Iterable[win32com.client.CDispatch], indent: int =
 
 
 def find_folder(
-    folders: Iterable[win32com.client.CDispatch], search_path: str, level: int = 0
+    folders: Iterable[win32com.client.CDispatch], search_path: Sequence[str], level: int = 0
 ) -> Optional[win32com.client.CDispatch]:
     """Find a folder by following a given  folder path.
 
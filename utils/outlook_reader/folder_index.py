@@ -0,0 +1,151 @@
+"""Persistent index of the outlook folder tree, maps folder paths to their EntryID and StoreID.
+
+Walking folder.Folders over COM is slow on large mailboxes (archives, public folders, shared stores), with the index
+a path lookup is a single GetFolderFromID() call.
+"""
+import datetime
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import win32com.client
+from pywintypes import com_error
+from sqlalchemy import Column, DateTime, Integer, String
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Query
+
+from utils.config import DB_ENGINE
+from utils.db import Base, get_session
+
+OL_APPOINTMENT_ITEM = 1  # https://docs.microsoft.com/en-us/office/vba/api/outlook.olitemtype
+
+_PATH_SEP = "\\"  # same separator as Folder.FolderPath
+
+
+class OutlookFolderIndex(Base):  # type: ignore
+    __tablename__ = "outlook_folder_index"
+    store_id = Column(String, primary_key=True, nullable=False)  # root folders of different stores can share a name
+    path = Column(String, primary_key=True, nullable=False)
+    entry_id = Column(String, nullable=False)
+    default_item_type = Column(Integer, nullable=False)
+    indexed_at = Column(DateTime, nullable=False)
+
+
+Base.metadata.create_all(DB_ENGINE)
+
+
+class IndexedFolder(NamedTuple):
+    store_id: str
+    entry_id: str
+
+
+class FolderIndex:
+    """Folder path index of an outlook namespace, each store is walked once and the result is kept in the DB.
+
+    A store is indexed lazily, the first time a path in it is looked up. Its index is rebuilt when it is older than
+    $max_age, when invalidate() is called for it, or when a lookup finds a folder that no longer exists.
+    """
+
+    def __init__(self, namespace: win32com.client.CDispatch, max_age: datetime.timedelta = datetime.timedelta(days=1)):
+        self.namespace = namespace
+        self.max_age = max_age
+
+    def find_folder(self, search_path: Sequence[str]) -> Optional[win32com.client.CDispatch]:
+        """Same as folder.find_folder(namespace.Folders, $search_path), without walking the folder tree.
+
+        Args:
+            search_path: The folder names from the store's root folder, e.g. ["Internet Calendars", "Norfeld@so.com"]
+
+        Returns:
+            Folder if found, else None
+        """
+        for attempt in range(2):
+            indexed_folder = self._get_indexed_folder(search_path, refresh=attempt > 0)
+            if indexed_folder is None:
+                return None
+            try:
+                return self.namespace.GetFolderFromID(indexed_folder.entry_id, indexed_folder.store_id)
+            except com_error:  # the folder was moved or deleted since the store was indexed
+                self.invalidate(indexed_folder.store_id)
+        return None
+
+    def folder_paths(self, default_item_type: Optional[int] = None) -> List[Tuple[str, ...]]:
+        """Returns the paths of the folders in all the stores, only folders of $default_item_type if given."""
+        root_folders = list(self.namespace.Folders)
+        self._index_stores(root_folders)
+        with get_session() as sess:
+            query: Query[Any] = sess.query(OutlookFolderIndex.path).filter(
+                OutlookFolderIndex.store_id.in_([root_folder.StoreID for root_folder in root_folders])
+            )
+            if default_item_type is not None:
+                query = query.filter(OutlookFolderIndex.default_item_type == default_item_type)
+            return sorted({tuple(path.split(_PATH_SEP)) for path, in query})  # a path can be in several stores
+
+    def calendar_folders(self) -> List[Tuple[str, ...]]:
+        return self.folder_paths(OL_APPOINTMENT_ITEM)
+
+    def show_folder_tree(self) -> None:
+        """Displays all available folders in a tree structure, like folder.show_folder_tree()."""
+        for path in self.folder_paths():
+            print(f"{' ' * (2 * (len(path) - 1))}{path[-1]}")
+
+    def invalidate(self, store_id: str) -> None:
+        """Drops the index of the store with $store_id, it's rebuilt on its next lookup."""
+        with get_session() as sess:
+            sess.query(OutlookFolderIndex).filter(OutlookFolderIndex.store_id == store_id).delete()
+
+    def _get_indexed_folder(self, search_path: Sequence[str], refresh: bool) -> Optional[IndexedFolder]:
+        """Looks $search_path up in the stores whose root folder has its first name, in the namespace's order."""
+        root_folders = [folder for folder in self.namespace.Folders if folder.Name == search_path[0]]
+        self._index_stores(root_folders, refresh)
+        store_ids = [root_folder.StoreID for root_folder in root_folders]
+        with get_session() as sess:
+            rows: Query[Any] = sess.query(OutlookFolderIndex.store_id, OutlookFolderIndex.entry_id).filter(
+                OutlookFolderIndex.store_id.in_(store_ids), OutlookFolderIndex.path == _PATH_SEP.join(search_path)
+            )
+            entry_ids: Dict[str, str] = {store_id: entry_id for store_id, entry_id in rows}
+        return next((IndexedFolder(s_id, entry_ids[s_id]) for s_id in store_ids if s_id in entry_ids), None)
+
+    def _index_stores(self, root_folders: Iterable[win32com.client.CDispatch], refresh: bool = False) -> None:
+        """Indexes the stores of $root_folders that aren't indexed (or are too old), all of them if $refresh."""
+        for root_folder in root_folders:
+            store_id = root_folder.StoreID
+            with get_session() as sess:
+                indexed_at = (
+                    sess.query(OutlookFolderIndex.indexed_at)
+                    .filter(OutlookFolderIndex.store_id == store_id)
+                    .order_by(OutlookFolderIndex.indexed_at)
+                    .first()
+                )
+            if refresh or indexed_at is None or datetime.datetime.now() - indexed_at[0] > self.max_age:
+                self._index_store(root_folder, store_id)
+
+    def _index_store(self, root_folder: win32com.client.CDispatch, store_id: str) -> None:
+        indexed_at = datetime.datetime.now()
+        rows: List[Dict[str, Any]] = []
+        folders_to_walk: List[Tuple[Tuple[str, ...], win32com.client.CDispatch]] = [((root_folder.Name,), root_folder)]
+        while len(folders_to_walk) != 0:
+            path, folder = folders_to_walk.pop()
+            rows.append(
+                dict(
+                    store_id=store_id,
+                    path=_PATH_SEP.join(path),
+                    entry_id=folder.EntryID,
+                    default_item_type=folder.DefaultItemType,
+                    indexed_at=indexed_at,
+                )
+            )
+            folders_to_walk += [(path + (sub_folder.Name,), sub_folder) for sub_folder in folder.Folders]
+
+        insert_stmt = insert(OutlookFolderIndex)
+        with get_session() as sess:
+            sess.query(OutlookFolderIndex).filter(OutlookFolderIndex.store_id == store_id).delete()
+            sess.execute(
+                insert_stmt.on_conflict_do_update(  # sibling folders with the same name, the last one is kept
+                    index_elements=[OutlookFolderIndex.store_id.name, OutlookFolderIndex.path.name],
+                    set_=dict(
+                        entry_id=insert_stmt.excluded.entry_id,
+                        default_item_type=insert_stmt.excluded.default_item_type,
+                        indexed_at=insert_stmt.excluded.indexed_at,
+                    ),
+                ),
+                rows,
+            )
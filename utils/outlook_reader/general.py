@@ -1,9 +1,62 @@
+import time
+from typing import Dict
+
 import pythoncom
 import win32com.client
 
+from utils.outlook_reader.constants import OUTLOOK_COLOR_ENUM
+from utils.profiling import instrument_com, profiled
+
+CATEGORIES_MAX_AGE_S = 60.0  # a recolored category keeps the same count, it's noticed when the colors are re-read
+
 
 def generate_outlook_namespace() -> win32com.client.CDispatch:
     """Generate outlook session for currently logged in user."""
     pythoncom.CoInitialize()  # in-case this function runs in a new process/thread
     outlook = win32com.client.Dispatch("Outlook.Application")
     return outlook.Session  # identical to GetNameSpace("MAPI") (starting with Outlook 98)
+
+
+class OutlookSession:
+    """Outlook namespace wrapper that keeps state which is expensive to read over COM between calendar reads.
+
+    The category colors are read in a single pass over namespace.Categories and only re-read when the number of
+    categories changes, they are older than $categories_max_age_s or an unknown (e.g. renamed) category name is
+    looked up.
+    """
+
+    def __init__(self, namespace: win32com.client.CDispatch = None, categories_max_age_s: float = CATEGORIES_MAX_AGE_S):
+        self.namespace = instrument_com(generate_outlook_namespace() if namespace is None else namespace)
+        self.categories_max_age_s = categories_max_age_s
+        self._category_color_ids: Dict[str, int] = {}
+        self._categories_count = -1
+        self._categories_read_at = float("-inf")  # time.monotonic() of the last read
+
+    @profiled
+    def refresh_categories(self) -> None:
+        categories = self.namespace.Categories
+        self._category_color_ids = {cat.Name: cat.Color for cat in categories}
+        self._categories_count = categories.Count
+        self._categories_read_at = time.monotonic()
+
+    def refresh_categories_if_changed(self) -> bool:
+        """Re-reads the categories if their count changed or they are too old, a single COM call when neither.
+
+        Returns:
+            Whether the categories (their names or colors) changed.
+        """
+        is_fresh = time.monotonic() - self._categories_read_at < self.categories_max_age_s
+        if is_fresh and self.namespace.Categories.Count == self._categories_count:
+            return False
+        old_category_color_ids = self._category_color_ids
+        self.refresh_categories()
+        return self._category_color_ids != old_category_color_ids
+
+    @profiled
+    def get_category_color(self, cat_name: str) -> str:
+        """Extract the category color (in hex) for $cat_name."""
+        if cat_name not in self._category_color_ids:
+            self.refresh_categories()
+        if cat_name not in self._category_color_ids:
+            raise ValueError(f"{cat_name} is not a valid outlook category name")
+        return OUTLOOK_COLOR_ENUM[self._category_color_ids[cat_name]]
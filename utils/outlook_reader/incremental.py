@@ -0,0 +1,123 @@
+"""Change-aware calendar reader, only items modified since the previous read are read again over COM."""
+import datetime
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import win32com.client
+
+from utils.outlook_reader.calendar import (
+    _date_restriction,
+    _expand_recurring_items,
+    _outlook_entry_from_item,
+    _recurring_restriction,
+)
+from utils.outlook_reader.general import OutlookSession
+from utils.outlook_reader.outlook_event import OutlookCalendarEntry
+from utils.outlook_reader.table import read_table_rows
+from utils.profiling import profiled
+
+# (EntryID, occurrence start for recurring items), an exception can be moved to the date of another occurrence
+EntryKey = Tuple[str, Optional[datetime.datetime]]
+
+# LastModificationTime filters have a minute resolution, re-read items modified close to the previous read
+_MODIFICATION_MARGIN = datetime.timedelta(minutes=2)
+
+
+@dataclass
+class CalendarDelta:
+    entries: List[OutlookCalendarEntry]  # all the entries in range, sorted by their start time
+    added: Set[EntryKey] = field(default_factory=set)
+    changed: Set[EntryKey] = field(default_factory=set)
+    removed: Set[EntryKey] = field(default_factory=set)
+    updated_entries: List[OutlookCalendarEntry] = field(default_factory=list)  # the added and changed entries
+    removed_entries: List[OutlookCalendarEntry] = field(default_factory=list)  # as they were in the previous read
+
+
+class IncrementalCalendarReader:
+    """Reads a calendar like read_local_outlook_calendar(), keeping the built entries between reads.
+
+    Each read lists the EntryIDs in range through the Table API and rebuilds only the items that are new in range or
+    whose LastModificationTime is newer than the previous read. Recurring items are re-expanded when the read range
+    moves (a new day started) since occurrences move in and out of the range.
+    """
+
+    def __init__(
+        self, calendar: win32com.client.CDispatch, days_ahead: int = 7, session: Optional[OutlookSession] = None
+    ):
+        self.calendar = calendar
+        self.days_ahead = days_ahead
+        self.session = OutlookSession(calendar.Session) if session is None else session
+        self._entries_by_item: Dict[str, Dict[EntryKey, OutlookCalendarEntry]] = {}
+        self._last_read: Optional[datetime.datetime] = None
+        self._last_begin: Optional[datetime.date] = None
+
+    @profiled
+    def read(self, touched_ids: Iterable[str] = ()) -> CalendarDelta:
+        """Reads the calendar and returns its entries with the keys that were added, changed and removed.
+
+        Args:
+            touched_ids: EntryIDs known to have changed (e.g. from ItemChange events), re-read even if their
+                LastModificationTime didn't move past the previous read
+        """
+        read_start = datetime.datetime.now()
+        begin = datetime.date.today()
+        end = begin + datetime.timedelta(days=self.days_ahead)
+        categories_changed = self.session.refresh_categories_if_changed()
+
+        single_restriction = _date_restriction(begin, end) + " AND [IsRecurring] = False"
+        single_ids = {row["EntryID"] for row in read_table_rows(self.calendar, single_restriction, ["EntryID"])}
+        recurring_rows = read_table_rows(self.calendar, _recurring_restriction(end), ["EntryID"])
+        recurring_ids = {row["EntryID"] for row in recurring_rows}
+        ids_in_range = single_ids | recurring_ids
+
+        if self._last_read is None or categories_changed:
+            ids_to_read = ids_in_range
+        else:
+            ids_to_read = ids_in_range - set(self._entries_by_item)
+            ids_to_read |= self._modified_ids_since(self._last_read - _MODIFICATION_MARGIN) & ids_in_range
+            ids_to_read |= set(touched_ids) & ids_in_range
+            if begin != self._last_begin:
+                ids_to_read |= recurring_ids
+
+        entries_by_item = {e_id: ents for e_id, ents in self._entries_by_item.items() if e_id in ids_in_range}
+        for e_id in ids_to_read:
+            entries_by_item[e_id] = self._read_item_entries(e_id, begin, end)
+
+        delta = self._diff(self._entries_by_item, entries_by_item)
+        self._entries_by_item, self._last_read, self._last_begin = entries_by_item, read_start, begin
+        return delta
+
+    def _modified_ids_since(self, since: datetime.datetime) -> Set[str]:
+        restriction = "[LastModificationTime] > '" + since.strftime("%d/%m/%Y %H:%M") + "'"
+        return {row["EntryID"] for row in read_table_rows(self.calendar, restriction, ["EntryID"])}
+
+    def _read_item_entries(
+        self, entry_id: str, begin: datetime.date, end: datetime.date
+    ) -> Dict[EntryKey, OutlookCalendarEntry]:
+        """Builds the entries of a single item, one per occurrence in range for recurring items."""
+        appointment_item = self.session.namespace.GetItemFromID(entry_id, self.calendar.StoreID)
+        if not appointment_item.IsRecurring:
+            return {(entry_id, None): _outlook_entry_from_item(appointment_item, self.session)}
+
+        entries = [
+            _outlook_entry_from_item(occ_app_item, self.session)
+            for occ_app_item in _expand_recurring_items([appointment_item], begin, end)
+        ]
+        return {(entry_id, ent.start_date): ent for ent in entries}
+
+    @staticmethod
+    def _diff(
+        old_entries_by_item: Dict[str, Dict[EntryKey, OutlookCalendarEntry]],
+        new_entries_by_item: Dict[str, Dict[EntryKey, OutlookCalendarEntry]],
+    ) -> CalendarDelta:
+        old_entries = {k: ent for entries in old_entries_by_item.values() for k, ent in entries.items()}
+        new_entries = {k: ent for entries in new_entries_by_item.values() for k, ent in entries.items()}
+        delta = CalendarDelta(
+            entries=sorted(new_entries.values(), key=lambda ent: ent.start_date),
+            added=set(new_entries) - set(old_entries),
+            changed={k for k in set(new_entries) & set(old_entries) if new_entries[k] != old_entries[k]},
+            removed=set(old_entries) - set(new_entries),
+        )
+        delta.updated_entries = [new_entries[k] for k in delta.added | delta.changed]
+        delta.removed_entries = [old_entries[k] for k in delta.removed]
+        return delta
@@ -1,6 +1,7 @@
 import datetime
-from dataclasses import dataclass, field
-from typing import List
+import sys
+from dataclasses import dataclass, field, fields
+from typing import Any, Iterable, List, Tuple
 
 
 @dataclass
@@ -28,11 +29,7 @@ class OutlookCalendarEntry:
         )
 
     def export_as_str(self) -> str:
-        params = self.__dict__.copy()
-        params["start_date"] = params["start_date"].isoformat()
-        params["end_date"] = params["end_date"].isoformat()
-
-        repr_s = str([v for (k, v) in sorted(params.items(), key=lambda itm: itm[0])])
+        repr_s = str([_export_value(getattr(self, name)) for name in _SORTED_FIELD_NAMES])
         assert OutlookCalendarEntry.import_from_char(repr_s) == self, "import and export should be equal"
         return repr_s
 
@@ -46,3 +43,73 @@ class OutlookCalendarEntry:
         params["start_date"] = datetime.datetime.fromisoformat(params["start_date"])
         params["end_date"] = datetime.datetime.fromisoformat(params["end_date"])
         return OutlookCalendarEntry(**params)
+
+
+_FIELD_NAMES = tuple(f.name for f in fields(OutlookCalendarEntry))
+_SORTED_FIELD_NAMES = tuple(sorted(_FIELD_NAMES))
+
+
+def _export_value(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, datetime.datetime) else value
+
+
+def _interned(strings: Iterable[str]) -> Tuple[str, ...]:
+    return tuple(sys.intern(s) for s in strings)
+
+
+def _entry_from_values(values: Iterable[Any]) -> OutlookCalendarEntry:
+    """Entry of the field values in _FIELD_NAMES order, tuples (of compact entries and batches) become lists."""
+    args: List[Any] = [list(v) if isinstance(v, tuple) else v for v in values]
+    return OutlookCalendarEntry(*args)
+
+
+class CompactCalendarEntry:
+    """Memory-lean OutlookCalendarEntry for large reads (e.g. a year of shared calendars).
+
+    No per-instance __dict__, the attendees, categories and colors are tuples of interned strings shared by all the
+    entries, and so are the short repeated fields. Has the same attributes as OutlookCalendarEntry, so it can be
+    passed wherever entries are only read.
+    """
+
+    __slots__ = _FIELD_NAMES
+
+    def __init__(
+        self,
+        subject: str,
+        start_date: datetime.datetime,
+        end_date: datetime.datetime,
+        location: str = "",
+        organizer: str = "",
+        busystatus: str = "",
+        attendees: Iterable[str] = (),
+        categories: Iterable[str] = (),
+        categories_colors: Iterable[str] = (),
+        conversation_id: str = "",
+    ):
+        self.subject = subject
+        self.start_date = start_date
+        self.end_date = end_date
+        self.location = sys.intern(location)
+        self.organizer = sys.intern(organizer)
+        self.busystatus = sys.intern(busystatus)
+        self.attendees = _interned(attendees)
+        self.categories = _interned(categories)
+        self.categories_colors = _interned(categories_colors)
+        self.conversation_id = conversation_id
+
+    @classmethod
+    def from_entry(cls, entry: OutlookCalendarEntry) -> "CompactCalendarEntry":
+        return cls(*(getattr(entry, name) for name in _FIELD_NAMES))
+
+    def to_entry(self) -> OutlookCalendarEntry:
+        return _entry_from_values(getattr(self, name) for name in _FIELD_NAMES)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, CompactCalendarEntry):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in _FIELD_NAMES)
+
+    def __repr__(self) -> str:
+        return f"CompactCalendarEntry({', '.join(f'{name}={getattr(self, name)!r}' for name in _FIELD_NAMES)})"
+
+    __str__ = OutlookCalendarEntry.__str__
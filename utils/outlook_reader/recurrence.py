@@ -0,0 +1,111 @@
+"""Computes the occurrence dates of an Outlook RecurrencePattern locally, without probing it over COM.
+
+https://docs.microsoft.com/en-us/office/vba/api/outlook.recurrencepattern
+"""
+import calendar
+import datetime
+import itertools
+from typing import Any, Callable, Dict, Iterator, List
+
+# https://docs.microsoft.com/en-us/office/vba/api/outlook.olrecurrencetype
+OL_RECURS_DAILY = 0
+OL_RECURS_WEEKLY = 1
+OL_RECURS_MONTHLY = 2
+OL_RECURS_MONTH_NTH = 3
+OL_RECURS_YEARLY = 5
+OL_RECURS_YEAR_NTH = 6
+
+# https://docs.microsoft.com/en-us/office/vba/api/outlook.oldaysofweek (olSunday=1, olMonday=2, ... olSaturday=64)
+_WEEKDAY_TO_MASK = {6: 1, 0: 2, 1: 4, 2: 8, 3: 16, 4: 32, 5: 64}  # datetime.weekday() -> olDaysOfWeek
+
+_LAST_INSTANCE = 5  # RecurrencePattern.Instance of 5 means the last matching day in the month
+
+
+def iter_occurrence_dates(rp: Any, begin: datetime.date, end: datetime.date) -> Iterator[datetime.date]:
+    """Yields the dates in [$begin, $end) on which the recurring pattern $rp occurs.
+
+    Args:
+        rp: RecurrencePattern COM object (or anything with the same fields)
+        begin: first date to yield
+        end: end of the range (not included)
+    """
+    pattern_end = None if rp.NoEndDate else rp.PatternEndDate.date()
+    max_occurrences = None if rp.NoEndDate else rp.Occurrences
+    for i, occ_date in enumerate(_iter_pattern_dates(rp)):
+        if occ_date >= end or (pattern_end is not None and occ_date > pattern_end):
+            return
+        if max_occurrences is not None and i >= max_occurrences:
+            return
+        if occ_date >= begin:
+            yield occ_date
+
+
+def _iter_pattern_dates(rp: Any) -> Iterator[datetime.date]:
+    """Yields all the dates of the pattern starting from its PatternStartDate, without an end."""
+    if rp.RecurrenceType not in _PATTERN_DATES:
+        raise ValueError(f"Unknown recurrence type {rp.RecurrenceType}")
+    if rp.RecurrenceType in (OL_RECURS_WEEKLY, OL_RECURS_MONTH_NTH, OL_RECURS_YEAR_NTH) and rp.DayOfWeekMask == 0:
+        return  # no day matches the pattern
+    yield from _PATTERN_DATES[rp.RecurrenceType](rp, rp.PatternStartDate.date(), max(rp.Interval, 1))
+
+
+def _iter_daily_dates(_rp: Any, start: datetime.date, interval: int) -> Iterator[datetime.date]:
+    return (start + datetime.timedelta(days=d) for d in itertools.count(0, interval))
+
+
+def _iter_weekly_dates(rp: Any, start: datetime.date, interval: int) -> Iterator[datetime.date]:
+    week_start = start - datetime.timedelta(days=(start.weekday() + 1) % 7)  # weeks start on sunday
+    for w in itertools.count(0, interval):
+        for d in range(7):
+            day = week_start + datetime.timedelta(weeks=w, days=d)
+            if day >= start and _WEEKDAY_TO_MASK[day.weekday()] & rp.DayOfWeekMask:
+                yield day
+
+
+def _iter_monthly_dates(rp: Any, start: datetime.date, interval: int) -> Iterator[datetime.date]:
+    return _iter_month_dates(rp, start, start.month, interval)
+
+
+def _iter_yearly_dates(rp: Any, start: datetime.date, interval: int) -> Iterator[datetime.date]:
+    # yearly patterns report their Interval in months (12) in newer Outlook versions
+    return _iter_month_dates(rp, start, rp.MonthOfYear, 12 * (interval // 12 if interval >= 12 else interval))
+
+
+def _iter_month_dates(rp: Any, start: datetime.date, first_month: int, months_interval: int) -> Iterator[datetime.date]:
+    """Yields a date every $months_interval months from $first_month, the day in the month is set by $rp."""
+    first_month_index = start.year * 12 + first_month - 1
+    if first_month_index < start.year * 12 + start.month - 1:
+        first_month_index += months_interval  # the first occurrence is in the next period
+    for month_index in itertools.count(first_month_index, months_interval):
+        year, month = divmod(month_index, 12)
+        if rp.RecurrenceType in (OL_RECURS_MONTHLY, OL_RECURS_YEARLY):
+            day = _day_of_month(year, month + 1, rp.DayOfMonth)
+        else:
+            day = _nth_weekday_of_month(year, month + 1, rp.DayOfWeekMask, rp.Instance)
+        if day >= start:
+            yield day
+
+
+_PATTERN_DATES: Dict[int, Callable[[Any, datetime.date, int], Iterator[datetime.date]]] = {
+    OL_RECURS_DAILY: _iter_daily_dates,
+    OL_RECURS_WEEKLY: _iter_weekly_dates,
+    OL_RECURS_MONTHLY: _iter_monthly_dates,
+    OL_RECURS_MONTH_NTH: _iter_monthly_dates,
+    OL_RECURS_YEARLY: _iter_yearly_dates,
+    OL_RECURS_YEAR_NTH: _iter_yearly_dates,
+}
+
+
+def _day_of_month(year: int, month: int, day_of_month: int) -> datetime.date:
+    """Returns the $day_of_month day in the month, or its last day if the month is shorter (like Outlook does)."""
+    return datetime.date(year, month, min(day_of_month, calendar.monthrange(year, month)[1]))
+
+
+def _nth_weekday_of_month(year: int, month: int, day_of_week_mask: int, instance: int) -> datetime.date:
+    """Returns the $instance-th day in the month that matches $day_of_week_mask (5 is the last one)."""
+    matching_days: List[datetime.date] = [
+        datetime.date(year, month, d)
+        for d in range(1, calendar.monthrange(year, month)[1] + 1)
+        if _WEEKDAY_TO_MASK[datetime.date(year, month, d).weekday()] & day_of_week_mask
+    ]
+    return matching_days[-1] if instance >= _LAST_INSTANCE else matching_days[instance - 1]
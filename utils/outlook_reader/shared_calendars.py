@@ -0,0 +1,78 @@
+"""Concurrent reading of several (shared, delegated or internet) calendars."""
+from concurrent.futures import as_completed, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Iterator, List, Optional, Sequence
+
+import pythoncom
+import win32com.client
+
+from utils.outlook_reader.calendar import read_local_outlook_calendar
+from utils.outlook_reader.folder import find_folder
+from utils.outlook_reader.general import generate_outlook_namespace, OutlookSession
+from utils.outlook_reader.outlook_event import OutlookCalendarEntry
+
+DEFAULT_MAX_WORKERS = 8
+
+
+@dataclass
+class SourcedCalendarEntries:
+    source: str  # the calendar's folder path, joined with "/"
+    entries: List[OutlookCalendarEntry] = field(default_factory=list)
+    error: Optional[Exception] = None  # set if the calendar couldn't be read
+
+
+def read_outlook_calendars_concurrently(
+    folder_paths: Sequence[Sequence[str]],
+    days_ahead: int = 7,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    namespace_factory: Callable[[], win32com.client.CDispatch] = generate_outlook_namespace,
+) -> Iterator[SourcedCalendarEntries]:
+    """Reads the calendars in $folder_paths on a worker pool, yields each calendar's entries as soon as it's read.
+
+    COM objects can't be shared between threads, every worker initializes its own COM apartment and namespace.
+    Args:
+        folder_paths: folder paths as passed to find_folder(), e.g. ["Internet Calendars", "Norfeld@so.com"]
+        days_ahead: The number of days ahead to read from the calendars
+        max_workers: max number of calendars read at the same time
+        namespace_factory: creates an outlook namespace in the calling thread
+
+    Returns:
+        Iterator of the entries of each calendar (in completion order), tagged with their folder path.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(_read_calendar, path, days_ahead, namespace_factory) for path in folder_paths]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def _read_calendar(
+    folder_path: Sequence[str], days_ahead: int, namespace_factory: Callable[[], win32com.client.CDispatch]
+) -> SourcedCalendarEntries:
+    source = "/".join(folder_path)
+    pythoncom.CoInitialize()  # namespace_factory may initialize it again, COM counts the nested calls
+    try:
+        return SourcedCalendarEntries(source, _read_calendar_entries(folder_path, days_ahead, namespace_factory))
+    except Exception as e:  # noqa # reported with the calendar's source instead of failing the other reads
+        return SourcedCalendarEntries(source, error=_without_frames(e))
+    finally:
+        pythoncom.CoUninitialize()
+
+
+def _without_frames(error: Exception) -> Exception:
+    """Drops the traceback and the chained exceptions of $error.
+
+    Their frames hold the COM objects, which must be released before the apartment is torn down.
+    """
+    error.__cause__ = error.__context__ = None
+    return error.with_traceback(None)
+
+
+def _read_calendar_entries(
+    folder_path: Sequence[str], days_ahead: int, namespace_factory: Callable[[], win32com.client.CDispatch]
+) -> List[OutlookCalendarEntry]:
+    """Reads the calendar at $folder_path, its COM objects are released when this returns (they're locals)."""
+    namespace = namespace_factory()
+    calendar = find_folder(namespace.Folders, folder_path)
+    if calendar is None:
+        raise ValueError(f"{'/'.join(folder_path)} is not a valid outlook folder path")
+    return read_local_outlook_calendar(calendar, days_ahead, OutlookSession(namespace))
@@ -0,0 +1,109 @@
+"""Notifications of changes to a calendar folder, from the ItemAdd/ItemChange/ItemRemove events of its Items.
+
+https://docs.microsoft.com/en-us/office/vba/api/outlook.items#events
+COM events are delivered by the message loop of the thread that subscribed, wait_for_changes() pumps it while
+waiting. Bursts of notifications (e.g. a meeting series being edited) are debounced into a single list.
+"""
+import queue
+import time
+from typing import Any, Callable, List, NamedTuple, Optional
+
+import pythoncom
+import win32com.client
+from pywintypes import com_error
+
+ITEM_ADD, ITEM_CHANGE, ITEM_REMOVE = "add", "change", "remove"
+
+_PUMP_INTERVAL_S = 0.05
+
+
+class ItemNotification(NamedTuple):
+    kind: str  # ITEM_ADD, ITEM_CHANGE or ITEM_REMOVE
+    entry_id: Optional[str]  # None for ITEM_REMOVE, Outlook doesn't tell which item was removed
+
+
+class ItemsEventHandler:
+    """Event sink of an Items collection, queues a notification for every event.
+
+    Subclassed by watch_calendar_items() with the queue as a class attribute, since DispatchWithEvents creates the
+    instance and attributes can't be set on COM objects.
+    """
+
+    notifications: "queue.Queue[ItemNotification]"
+
+    def OnItemAdd(self, item: Any) -> None:  # noqa: N802
+        self.notifications.put(ItemNotification(ITEM_ADD, _entry_id(item)))
+
+    def OnItemChange(self, item: Any) -> None:  # noqa: N802
+        self.notifications.put(ItemNotification(ITEM_CHANGE, _entry_id(item)))
+
+    def OnItemRemove(self) -> None:  # noqa: N802
+        self.notifications.put(ItemNotification(ITEM_REMOVE, None))
+
+
+class CalendarWatch(NamedTuple):
+    events: Any  # the subscribed Items object, the events stop if it's garbage collected
+    notifications: "queue.Queue[ItemNotification]"
+
+
+def watch_calendar_items(
+    calendar: win32com.client.CDispatch, dispatch_with_events: Optional[Callable[[Any, type], Any]] = None
+) -> CalendarWatch:
+    """Subscribes to the item events of $calendar, should be called in the thread that reads it.
+
+    Args:
+        calendar: The Calendar folder to watch.
+        dispatch_with_events: win32com.client.DispatchWithEvents if None, or a fake (tests/fakes/outlook.py)
+    """
+    dispatch_with_events = win32com.client.DispatchWithEvents if dispatch_with_events is None else dispatch_with_events
+    notifications: "queue.Queue[ItemNotification]" = queue.Queue()
+    handler_cls = type("_CalendarItemsEventHandler", (ItemsEventHandler,), {"notifications": notifications})
+    return CalendarWatch(dispatch_with_events(calendar.Items, handler_cls), notifications)
+
+
+def wait_for_changes(
+    notifications: "queue.Queue[ItemNotification]",
+    debounce_s: float,
+    max_delay_s: float,
+    timeout_s: float,
+    pump: Callable[[], Any] = pythoncom.PumpWaitingMessages,
+) -> List[ItemNotification]:
+    """Waits up to $timeout_s for a notification, then collects notifications until none came for $debounce_s.
+
+    Args:
+        notifications: queue of CalendarWatch
+        debounce_s: quiet time that ends a burst of notifications
+        max_delay_s: max time to collect a burst for, a continuous stream of changes is still handled
+        timeout_s: max time to wait for the first notification
+        pump: processes the COM messages of the thread (which delivers the events)
+
+    Returns:
+        The collected notifications, empty if none came in $timeout_s.
+    """
+    changes: List[ItemNotification] = []
+    deadline = time.monotonic() + timeout_s
+    first_t = last_t = None
+    while True:
+        pump()
+        while not notifications.empty():
+            changes.append(notifications.get_nowait())
+            last_t = time.monotonic()
+            first_t = last_t if first_t is None else first_t
+
+        now = time.monotonic()
+        if first_t is None or last_t is None:
+            if now >= deadline:
+                return changes
+        elif now - last_t >= debounce_s or now - first_t >= max_delay_s:
+            return changes
+        time.sleep(_PUMP_INTERVAL_S)
+
+
+def _entry_id(item: Any) -> Optional[str]:
+    try:
+        if not hasattr(item, "EntryID"):  # events pass the item as a raw PyIDispatch
+            item = win32com.client.Dispatch(item)
+        entry_id: str = item.EntryID
+        return entry_id
+    except com_error:  # e.g. an item that was deleted meanwhile
+        return None
@@ -0,0 +1,190 @@
+"""Opt-in profiling of the outlook reads and google calendar syncs: phase timings, COM accesses and API calls.
+
+Nothing is recorded unless a profiling() context is active, e.g.:
+    with profiling("profile.json"):
+        entries = read_local_outlook_calendar(calendar)
+writes a report of the time spent in each phase (nested phases are joined with "/") with the COM property accesses
+and API calls made in it. Set OUTLOOK_EXPORTER_PROFILE=<report path> to profile the websites and examples.
+"""
+import contextlib
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable, ContextManager, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+PROFILE_ENV_VAR = "OUTLOOK_EXPORTER_PROFILE"
+
+COM_ACCESS = "com_accesses"
+API_CALL = "api_calls"
+API_BATCH_ITEM = "api_batch_items"
+
+_NULL_CONTEXT = contextlib.nullcontext()
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+@dataclass
+class PhaseStats:
+    calls: int = 0
+    seconds: float = 0.0  # including nested phases
+    counts: "Counter[str]" = field(default_factory=Counter)  # not including nested phases
+
+
+class Profiler:
+    """Collects the stats of the phases entered in any thread while it's active."""
+
+    def __init__(self) -> None:
+        self.phases: Dict[str, PhaseStats] = {}
+        self.com_accesses: "Counter[str]" = Counter()  # by property/method name
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._start_t = time.perf_counter()
+
+    def _stack(self) -> List[str]:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        stack: List[str] = self._local.stack
+        return stack
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        stack = self._stack()
+        path = f"{stack[-1]}/{name}" if len(stack) != 0 else name
+        stack.append(path)
+        start_t = time.perf_counter()
+        try:
+            yield
+        finally:
+            stack.pop()
+            with self._lock:
+                stats = self.phases.setdefault(path, PhaseStats())
+                stats.calls += 1
+                stats.seconds += time.perf_counter() - start_t
+
+    def count(self, kind: str, n: int = 1, name: Optional[str] = None) -> None:
+        stack = self._stack()
+        path = stack[-1] if len(stack) != 0 else "<no phase>"
+        with self._lock:
+            self.phases.setdefault(path, PhaseStats()).counts[kind] += n
+            if kind == COM_ACCESS and name is not None:
+                self.com_accesses[name] += n
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "total_seconds": time.perf_counter() - self._start_t,
+                "phases": {
+                    path: dict(calls=stats.calls, seconds=stats.seconds, **stats.counts)
+                    for path, stats in sorted(self.phases.items())
+                },
+                "com_accesses_by_name": dict(self.com_accesses.most_common()),
+            }
+
+
+_active_profiler: Optional[Profiler] = None
+
+
+@contextlib.contextmanager
+def profiling(report_path: Optional[str] = None) -> Iterator[Profiler]:
+    """Activates a Profiler for the duration of the context, writes its JSON report to $report_path if given."""
+    global _active_profiler
+    profiler, prev_profiler = Profiler(), _active_profiler
+    _active_profiler = profiler
+    try:
+        yield profiler
+    finally:
+        _active_profiler = prev_profiler
+        report = json.dumps(profiler.report(), indent=2)
+        logger.info("profile report:\n%s", report)
+        if report_path is not None:
+            with open(report_path, "w") as f:
+                f.write(report)
+
+
+def profiling_from_env() -> ContextManager[Optional[Profiler]]:
+    """profiling() into the path in the OUTLOOK_EXPORTER_PROFILE environment variable, a no-op if it isn't set."""
+    report_path = os.environ.get(PROFILE_ENV_VAR)
+    return _NULL_CONTEXT if report_path is None else profiling(report_path)
+
+
+def phase(name: str) -> ContextManager[None]:
+    """Times the enclosed code as phase $name of the active profiler (nested in the current phase)."""
+    return _NULL_CONTEXT if _active_profiler is None else _active_profiler.phase(name)
+
+
+def profiled(func: F) -> F:
+    """Decorator, every call of $func is a phase named after it."""
+
+    @functools.wraps(func)
+    def _profiled(*args: Any, **kwargs: Any) -> Any:
+        if _active_profiler is None:
+            return func(*args, **kwargs)
+        with _active_profiler.phase(func.__name__):
+            return func(*args, **kwargs)
+
+    return _profiled  # type: ignore
+
+
+def count(kind: str, n: int = 1) -> None:
+    """Counts $n events of $kind (e.g. API_CALL) in the current phase of the active profiler."""
+    if _active_profiler is not None:
+        _active_profiler.count(kind, n)
+
+
+def instrument_com(obj: Any) -> Any:
+    """Returns $obj wrapped so its property accesses and method calls are counted, $obj itself when not profiling."""
+    if _active_profiler is None or isinstance(obj, CountingComProxy):
+        return obj
+    return CountingComProxy(obj, _active_profiler)
+
+
+class CountingComProxy:
+    """Wraps a COM object, every attribute access is counted as a COM_ACCESS in the current phase.
+
+    COM objects returned by the wrapped object (as attributes, from method calls or iteration) are wrapped as well.
+    """
+
+    def __init__(self, obj: Any, profiler: Profiler):
+        object.__setattr__(self, "_obj", obj)
+        object.__setattr__(self, "_profiler", profiler)
+
+    def _wrap(self, value: Any) -> Any:
+        if _is_com_object(value):
+            return CountingComProxy(value, self._profiler)
+        if callable(value) and not isinstance(value, type):
+            return lambda *args, **kwargs: self._wrap(value(*args, **kwargs))
+        return value
+
+    def __getattr__(self, name: str) -> Any:
+        self._profiler.count(COM_ACCESS, name=name)
+        return self._wrap(getattr(self._obj, name))
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        self._profiler.count(COM_ACCESS, name=name)
+        setattr(self._obj, name, value)
+
+    def __iter__(self) -> Iterator[Any]:
+        return (self._wrap(v) for v in self._obj)
+
+    def __len__(self) -> int:
+        return len(self._obj)
+
+
+def register_com_type(com_type: type) -> None:
+    """CountingComProxy wraps the instances of $com_type as well, e.g. stand-ins for COM objects in tests."""
+    global _registered_com_types
+    _registered_com_types += (com_type,)
+
+
+_registered_com_types: Tuple[type, ...] = ()
+
+
+def _is_com_object(value: Any) -> bool:
+    return type(value).__module__.startswith("win32com") or isinstance(value, _registered_com_types)
@@ -0,0 +1,98 @@
+"""Splitting of a payload that is too large for a single QR code into several codes (a structured append).
+
+Every chunk starts with a header "*<seq>/<total>/<checksum>/" made of QR alphanumeric characters, the checksum is
+the CRC32 of the whole payload, it identifies the chunks of the same payload and validates the reassembled one.
+"""
+import re
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+CHUNK_MARKER = "*"
+
+_CHUNK_RE = re.compile(r"\*(\d+)/(\d+)/([0-9A-F]{8})/(.*)", re.DOTALL)
+
+
+class QrChunk(NamedTuple):
+    seq: int  # 0 based
+    total: int
+    checksum: str
+    data: str
+
+
+def payload_checksum(payload: str) -> str:
+    return f"{zlib.crc32(payload.encode('utf-8')):08X}"
+
+
+def split_into_chunks(payload: str, max_chunk_len: int) -> List[str]:
+    """Splits $payload into chunks of at most $max_chunk_len payload characters, each with its header."""
+    checksum = payload_checksum(payload)
+    parts = [payload[i : i + max_chunk_len] for i in range(0, len(payload), max_chunk_len)] or [""]
+    return [f"{CHUNK_MARKER}{i}/{len(parts)}/{checksum}/{part}" for i, part in enumerate(parts)]
+
+
+def is_chunk(s: str) -> bool:
+    return s.startswith(CHUNK_MARKER)
+
+
+def parse_chunk(chunk: str) -> QrChunk:
+    """Parses a chunk created by split_into_chunks().
+
+    Raises:
+        ValueError: if $chunk doesn't have a valid header
+    """
+    match = _CHUNK_RE.fullmatch(chunk)
+    if match is None:
+        raise ValueError(f"{chunk[:30]!r} is not a QR chunk")
+    seq, total, checksum, data = match.groups()
+    if not 0 <= int(seq) < int(total):
+        raise ValueError(f"QR chunk number {seq} is out of range for {total} chunks")
+    return QrChunk(int(seq), int(total), checksum, data)
+
+
+def join_chunks(chunks: Dict[int, QrChunk]) -> str:
+    """Joins the chunks of a single payload (by their seq) and validates the payload's checksum.
+
+    Raises:
+        ValueError: if chunks are missing or the checksum of the joined payload doesn't match
+    """
+    any_chunk = next(iter(chunks.values()))
+    missing = sorted(set(range(any_chunk.total)) - set(chunks))
+    if len(missing) != 0:
+        raise ValueError(f"QR chunks {missing} of {any_chunk.total} are missing")
+    payload = "".join(chunks[i].data for i in range(any_chunk.total))
+    if payload_checksum(payload) != any_chunk.checksum:
+        raise ValueError("checksum of the reassembled QR payload doesn't match, a chunk was read incorrectly")
+    return payload
+
+
+class QrChunkAssembler:
+    """Collects chunks that arrive one by one (e.g. one per scan), possibly of several payloads at once.
+
+    Thread safe, only the $max_pending most recently started payloads are kept.
+    """
+
+    def __init__(self, max_pending: int = 32):
+        self.max_pending = max_pending
+        self._pending: "OrderedDict[str, Dict[int, QrChunk]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, chunk_str: str) -> Optional[str]:
+        """Adds a chunk, returns its payload if it was the last missing chunk of it, else None."""
+        chunk = parse_chunk(chunk_str)
+        with self._lock:
+            chunks = self._pending.setdefault(chunk.checksum, {})
+            chunks[chunk.seq] = chunk
+            if len(chunks) < chunk.total:
+                while len(self._pending) > self.max_pending:
+                    self._pending.popitem(last=False)
+                return None
+            del self._pending[chunk.checksum]
+        return join_chunks(chunks)
+
+    def progress(self, chunk_str: str) -> Tuple[int, int]:
+        """Returns how many of the chunks of $chunk_str's payload were received, and their total."""
+        chunk = parse_chunk(chunk_str)
+        with self._lock:
+            return len(self._pending.get(chunk.checksum, {})), chunk.total
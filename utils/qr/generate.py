@@ -1,13 +1,83 @@
+import hashlib
+import io
+import re
+import threading
+from collections import OrderedDict
 from typing import List
 
 from PIL.Image import Image
-from qrcode import QRCode, constants
-from qrcode.util import QRData
+from qrcode import constants, QRCode
+from qrcode.util import MODE_8BIT_BYTE, MODE_ALPHA_NUM, QRData
+
+from utils.qr.chunks import split_into_chunks
+
+DEFAULT_MAX_CHUNK_LEN = 400  # ~version 10-12 codes (with a short prefix), still scanned fast by phones
+PNG_CACHE_SIZE = 64
+
+_ALPHA_NUM_RE = re.compile(r"[0-9A-Z $%*+\-./:]*")  # characters of the QR alphanumeric mode
+
+_png_cache: "OrderedDict[str, bytes]" = OrderedDict()  # sha256 of the messages -> PNG bytes, in LRU order
+_png_cache_lock = threading.Lock()
 
 
 def create_qr_image(messages: List[str]) -> Image:
-    """Create QR image from a list of messages."""
-    qr = QRCode(version=2, error_correction=constants.ERROR_CORRECT_L)
+    """Create QR image from a list of messages.
+
+    Each message is a segment of its own, in alphanumeric mode if it allows it (e.g. export_codec payloads) and byte
+    mode otherwise (e.g. URLs), the image has the smallest version that fits the messages.
+    """
+    qr = QRCode(version=None, error_correction=constants.ERROR_CORRECT_L)
+    for msg in messages:
+        qr.add_data(QRData(msg, mode=MODE_ALPHA_NUM if _ALPHA_NUM_RE.fullmatch(msg) else MODE_8BIT_BYTE))
+    qr.make(fit=True)
+    image: Image = qr.make_image().get_image()
+    return image
+
+
+def create_qr_png(messages: List[str]) -> bytes:
+    """Same as create_qr_image() but returns the image encoded as PNG, cached by the messages' hash.
+
+    The PNGs of the last PNG_CACHE_SIZE distinct messages are kept, streamlit re-runs don't re-render unchanged codes.
+    """
+    key = _messages_digest(messages)
+    with _png_cache_lock:
+        if key in _png_cache:
+            _png_cache.move_to_end(key)
+            return _png_cache[key]
+
+    png_buffer = io.BytesIO()
+    create_qr_image(messages).save(png_buffer, format="PNG")
+    png = png_buffer.getvalue()
+
+    with _png_cache_lock:
+        _png_cache[key] = png
+        while len(_png_cache) > PNG_CACHE_SIZE:
+            _png_cache.popitem(last=False)
+    return png
+
+
+def create_qr_pngs(prefix_messages: List[str], payload: str, max_chunk_len: int = DEFAULT_MAX_CHUNK_LEN) -> List[bytes]:
+    """Create QR PNGs for $payload, split into several moderately sized codes (see utils.qr.chunks).
+
+    Small codes are scanned faster and more reliably by phones than a single dense one.
+    The images are rendered one after the other, qrcode is pure python and a thread pool doesn't speed it up.
+    Args:
+        prefix_messages: messages at the start of every image (e.g. a URL)
+        payload: The message to split between the images, a single image holds it as is if it fits
+        max_chunk_len: max number of $payload characters in each image
+
+    Returns:
+        List of the QR PNGs, read them back with utils.qr.read.reassemble_qr_chunks() when there are several.
+    """
+    if len(payload) <= max_chunk_len:
+        return [create_qr_png(prefix_messages + [payload])]
+    return [create_qr_png(prefix_messages + [chunk]) for chunk in split_into_chunks(payload, max_chunk_len)]
+
+
+def _messages_digest(messages: List[str]) -> str:
+    digest = hashlib.sha256()
     for msg in messages:
-        qr.add_data(QRData(msg), optimize=500)
-    return qr.make_image().get_image()
+        encoded_msg = msg.encode("utf-8")
+        digest.update(len(encoded_msg).to_bytes(8, "big"))  # keeps ["ab", "c"] and ["a", "bc"] apart
+        digest.update(encoded_msg)
+    return digest.hexdigest()
@@ -1,18 +1,117 @@
-from typing import Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence
 
 import cv2
 import numpy as np
 
+from utils.qr.chunks import join_chunks, parse_chunk, QrChunk
+
+DEFAULT_SCALES = (0.25, 0.5, 1.0)
+_MIN_SCALED_SIDE_PX = 240  # smaller images lose the modules of dense codes
+
 _detector = None
+_thread_local = threading.local()
+
+
+@dataclass
+class QrReadResult:
+    codes: List[str] = field(default_factory=list)  # decoded data of each code found
+    points: List[np.ndarray] = field(default_factory=list)  # 4 corners of each code, in the frame's coordinates
+    scale: Optional[float] = None  # scale of the frame the codes were decoded at, None if none were found
+    seconds: float = 0.0  # time spent on the frame
 
 
 def read_qr_from_ndarray(img: np.ndarray) -> Optional[str]:
     """Read a QR code from a numpy array image, Return None if not found/error."""
     global _detector
     if _detector is None:
-        _detector = cv2.QRCodeDetector()  # initialize the cv2 QRCode detector
+        _detector = _create_detector()  # initialize the cv2 QRCode detector
 
     # detect and decode
     data, vertices_array, _binary_qrcode = _detector.detectAndDecode(img)
 
     return data if vertices_array is not None else None
+
+
+def read_qr_codes_from_ndarray(img: np.ndarray, scales: Sequence[float] = DEFAULT_SCALES) -> QrReadResult:
+    """Read all the QR codes in a numpy array image, trying downscaled copies of it first.
+
+    Detection on a downscaled copy is much faster, the next scale is only tried if a detected code couldn't be
+    decoded at the current one (or nothing was detected). Scales that shrink the image too much are skipped.
+    Args:
+        img: The image (frame) to read
+        scales: The scales to try, in order
+
+    Returns:
+        QrReadResult with the codes of the first scale that decoded all its detected codes (else the one that
+        decoded the most).
+    """
+    start_t = time.perf_counter()
+    detector = _get_thread_detector()
+    result = QrReadResult()
+    for scale in _usable_scales(img, scales):
+        scaled_img = img if scale == 1 else cv2.resize(img, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        ok, decoded_info, points, _straight_qrcodes = detector.detectAndDecodeMulti(scaled_img)
+        if not ok:
+            continue
+        decoded = [(data, code_points / scale) for data, code_points in zip(decoded_info, points) if data != ""]
+        if len(decoded) > len(result.codes):
+            result = QrReadResult([data for data, _ in decoded], [code_points for _, code_points in decoded], scale)
+        if len(decoded) == len(decoded_info):
+            break
+
+    result.seconds = time.perf_counter() - start_t
+    return result
+
+
+def read_qr_codes_from_frames(
+    frames: Iterable[np.ndarray], scales: Sequence[float] = DEFAULT_SCALES, max_workers: Optional[int] = None
+) -> List[QrReadResult]:
+    """Read all the QR codes in each of $frames (e.g. from a webcam or a video) on a thread pool.
+
+    OpenCV releases the GIL while detecting, each thread uses its own detector.
+    Returns:
+        QrReadResult of each frame, in the order of $frames.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(lambda frame: read_qr_codes_from_ndarray(frame, scales), frames))
+
+
+def _create_detector() -> "cv2.GraphicalCodeDetector":  # quoted, the base class is new in OpenCV 4.8
+    """The aruco based detector (OpenCV >= 4.7) when available, the classic one misses many dense codes."""
+    if hasattr(cv2, "QRCodeDetectorAruco"):
+        return cv2.QRCodeDetectorAruco()
+    return cv2.QRCodeDetector()
+
+
+def _get_thread_detector() -> "cv2.GraphicalCodeDetector":
+    """The cv2 QR detectors aren't thread safe, returns the detector of the current thread."""
+    if not hasattr(_thread_local, "detector"):
+        _thread_local.detector = _create_detector()
+    detector: "cv2.GraphicalCodeDetector" = _thread_local.detector
+    return detector
+
+
+def _usable_scales(img: np.ndarray, scales: Sequence[float]) -> List[float]:
+    min_side = min(img.shape[:2])
+    usable = [scale for scale in scales if scale >= 1 or min_side * scale >= _MIN_SCALED_SIDE_PX]
+    return usable if len(usable) != 0 else [1.0]
+
+
+def reassemble_qr_chunks(chunks: Iterable[str]) -> str:
+    """Reassemble the payload split by utils.qr.generate.create_qr_pngs(), chunks can be in any order.
+
+    Raises:
+        ValueError: if chunks are missing, belong to different payloads or the payload's checksum doesn't match
+    """
+    parsed_chunks: Dict[int, QrChunk] = {}
+    for chunk in map(parse_chunk, chunks):
+        if len(parsed_chunks) != 0 and chunk.checksum != next(iter(parsed_chunks.values())).checksum:
+            raise ValueError("QR chunks of different payloads can't be reassembled together")
+        parsed_chunks[chunk.seq] = chunk
+    if len(parsed_chunks) == 0:
+        raise ValueError("no QR chunks to reassemble")
+    return join_chunks(parsed_chunks)
@@ -0,0 +1,274 @@
+"""Compact binary codec for the entries exported through the QR code.
+
+Layout of a version 1 payload (all integers are LEB128 varints, signed ones are zigzag encoded):
+    version | base time (minutes since the epoch, UTC) | string table | conversation id table | entries
+Each entry references its strings by their index in the tables, so repeated subjects, locations and conversation ids
+(e.g. occurrences of the same recurring meeting) are stored once. Times are minute offsets from the base time.
+
+The bytes are written with a base45-like encoding over QR alphanumeric characters that are also safe in a URL query
+string, every 2 bytes become 3 characters.
+"""
+import datetime
+import re
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from utils.outlook_reader.constants import (
+    BLACK,
+    BLUE,
+    BUSYSTATUS_ENUM,
+    GRAY,
+    GREEN,
+    MAROON,
+    NO_COLOR,
+    ORANGE,
+    PURPLE,
+    RED,
+    YELLOW,
+)
+from utils.outlook_reader.outlook_event import OutlookCalendarEntry
+
+CODEC_VERSION = 1
+
+# QR alphanumeric mode characters, without " ", "%" and "+" that have a special meaning in a URL
+ALPHABET = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ$*-./:"
+_BASE = len(ALPHABET)
+_CHAR_VALUES = {c: i for i, c in enumerate(ALPHABET)}
+
+_BUSY_STATUSES = ("",) + tuple(BUSYSTATUS_ENUM.values())
+_COLORS = (NO_COLOR, RED, ORANGE, YELLOW, GREEN, BLUE, PURPLE, MAROON, GRAY, BLACK)
+
+_TZ_UNIT = datetime.timedelta(minutes=15)
+_MINUTE = datetime.timedelta(minutes=1)
+_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+# recurring occurrences and exceptions have a suffix on their series' ConversationID (see _expand_recurring_items)
+_CONVERSATION_SUFFIX_RE = re.compile(r"^(.*?)((?:REG|EXP)\d+)?$", re.DOTALL)
+
+_HAS_COLOR = 1
+_END_TZ_DIFFERS = 2
+_HEX_CONVERSATION_ID = 1
+
+
+def encode_entries(entries: Sequence[OutlookCalendarEntry]) -> str:
+    """Encode the subject, times, location, busy status, first category color and conversation id of $entries.
+
+    Raises:
+        ValueError: if an entry can't be encoded (times with seconds, an unknown busy status, color or conversation id)
+    """
+    strings: Dict[str, int] = {}
+    conversation_ids: Dict[str, int] = {}
+    base_time = min((ent.start_date for ent in entries), default=_EPOCH)
+    base_minutes = _minutes_between(_EPOCH, base_time)
+
+    body = bytearray()
+    _write_uint(body, len(entries))
+    for ent in entries:
+        start_tz = _tz_units(ent.start_date)
+        end_tz = _tz_units(ent.end_date)
+        flags = (_HAS_COLOR if len(ent.categories_colors) != 0 else 0) | (_END_TZ_DIFFERS if end_tz != start_tz else 0)
+        conversation_base, conversation_suffix = _split_conversation_id(ent.conversation_id)
+
+        _write_uint(body, flags)
+        _write_uint(body, strings.setdefault(ent.subject, len(strings)))
+        _write_uint(body, strings.setdefault(ent.location, len(strings)))
+        _write_uint(body, conversation_ids.setdefault(conversation_base, len(conversation_ids)))
+        _write_uint(body, strings.setdefault(conversation_suffix or "", len(strings)))
+        _write_int(body, _minutes_between(base_time, ent.start_date))
+        _write_int(body, _minutes_between(ent.start_date, ent.end_date))
+        _write_int(body, start_tz)
+        if flags & _END_TZ_DIFFERS:
+            _write_int(body, end_tz)
+        _write_uint(body, _enum_index(_BUSY_STATUSES, ent.busystatus, "busy status"))
+        if flags & _HAS_COLOR:
+            _write_uint(body, _enum_index(_COLORS, ent.categories_colors[0], "category color"))
+
+    payload = bytearray([CODEC_VERSION])
+    _write_int(payload, base_minutes)
+    _write_uint(payload, len(strings))
+    for s in strings:
+        _write_bytes(payload, s.encode("utf-8"))
+    _write_uint(payload, len(conversation_ids))
+    for conversation_id in conversation_ids:
+        _write_conversation_id(payload, conversation_id)
+    return b45encode(bytes(payload + body))
+
+
+def decode_entries(encoded: str) -> List[OutlookCalendarEntry]:
+    """Decode entries encoded by encode_entries().
+
+    Raises:
+        ValueError: if $encoded is malformed or from an unsupported codec version
+    """
+    reader = _Reader(b45decode(encoded))
+    try:
+        return _read_entries(reader)
+    except (IndexError, OverflowError) as e:  # out of range indices, times or timezones of a garbled payload
+        raise ValueError(f"malformed encoded entries ({e})") from None
+
+
+def _read_entries(reader: "_Reader") -> List[OutlookCalendarEntry]:
+    version = reader.read_uint()
+    if version != CODEC_VERSION:
+        raise ValueError(f"unsupported export codec version {version}")
+
+    base_time = _EPOCH + reader.read_int() * _MINUTE
+    strings = [reader.read_bytes().decode("utf-8") for _ in range(reader.read_uint())]
+    conversation_ids = [_read_conversation_id(reader) for _ in range(reader.read_uint())]
+
+    entries = []
+    for _ in range(reader.read_uint()):
+        flags = reader.read_uint()
+        subject, location = strings[reader.read_uint()], strings[reader.read_uint()]
+        conversation_id = conversation_ids[reader.read_uint()] + strings[reader.read_uint()]
+        start_utc = base_time + reader.read_int() * _MINUTE
+        end_utc = start_utc + reader.read_int() * _MINUTE
+        start_tz = datetime.timezone(reader.read_int() * _TZ_UNIT)
+        end_tz = datetime.timezone(reader.read_int() * _TZ_UNIT) if flags & _END_TZ_DIFFERS else start_tz
+        busystatus = _BUSY_STATUSES[reader.read_uint()]
+        colors = [_COLORS[reader.read_uint()]] if flags & _HAS_COLOR else []
+        entries.append(
+            OutlookCalendarEntry(
+                subject,
+                start_utc.astimezone(start_tz),
+                end_utc.astimezone(end_tz),
+                location=location,
+                busystatus=busystatus,
+                categories_colors=colors,
+                conversation_id=conversation_id,
+            )
+        )
+
+    if not reader.at_end():
+        raise ValueError("unexpected trailing data in the encoded entries")
+    return entries
+
+
+def b45encode(data: bytes) -> str:
+    """Encode $data with ALPHABET, 2 bytes per 3 characters (and 2 characters for a trailing odd byte)."""
+    chars = []
+    for i in range(0, len(data) - 1, 2):
+        n = data[i] * 256 + data[i + 1]
+        chars += [ALPHABET[n % _BASE], ALPHABET[n // _BASE % _BASE], ALPHABET[n // (_BASE * _BASE)]]
+    if len(data) % 2 == 1:
+        chars += [ALPHABET[data[-1] % _BASE], ALPHABET[data[-1] // _BASE]]
+    return "".join(chars)
+
+
+def b45decode(encoded: str) -> bytes:
+    """Decode a string encoded by b45encode()."""
+    try:
+        values = [_CHAR_VALUES[c] for c in encoded]
+    except KeyError as e:
+        raise ValueError(f"invalid character {e} in the encoded entries") from None
+    if len(values) % 3 == 1:
+        raise ValueError("invalid length of the encoded entries")
+
+    data = bytearray()
+    for i in range(0, len(values), 3):
+        chunk = values[i : i + 3]
+        n = sum(v * _BASE ** j for j, v in enumerate(chunk))
+        if n > (0xFFFF if len(chunk) == 3 else 0xFF):
+            raise ValueError("invalid character sequence in the encoded entries")
+        data += n.to_bytes(len(chunk) - 1, "big")
+    return bytes(data)
+
+
+def _minutes_between(start: datetime.datetime, end: datetime.datetime) -> int:
+    minutes, remainder = divmod(end - start, _MINUTE)
+    if remainder:
+        raise ValueError(f"{start} and {end} are not a whole number of minutes apart")
+    return minutes
+
+
+def _tz_units(dt: datetime.datetime) -> int:
+    units, remainder = divmod(dt.utcoffset(), _TZ_UNIT)  # type: ignore
+    if remainder:
+        raise ValueError(f"timezone offset of {dt} is not a multiple of 15 minutes")
+    return units
+
+
+def _split_conversation_id(conversation_id: str) -> Tuple[str, Optional[str]]:
+    """Splits the REG/EXP suffix of a recurring occurrence's conversation id from the series' conversation id."""
+    match = _CONVERSATION_SUFFIX_RE.match(conversation_id) if isinstance(conversation_id, str) else None
+    if match is None:
+        raise ValueError(f"unsupported conversation id {conversation_id!r}")
+    return match.group(1), match.group(2)
+
+
+def _enum_index(values: Tuple[str, ...], value: str, name: str) -> int:
+    try:
+        return values.index(value)
+    except ValueError:
+        raise ValueError(f"unsupported {name} {value!r}") from None
+
+
+def _write_conversation_id(buf: bytearray, conversation_id: str) -> None:
+    """Outlook ConversationIDs are uppercase hex strings, those are stored as bytes (half their length)."""
+    if re.fullmatch(r"(?:[0-9A-F]{2})+", conversation_id):
+        _write_uint(buf, _HEX_CONVERSATION_ID)
+        _write_bytes(buf, bytes.fromhex(conversation_id))
+    else:
+        _write_uint(buf, 0)
+        _write_bytes(buf, conversation_id.encode("utf-8"))
+
+
+def _read_conversation_id(reader: "_Reader") -> str:
+    kind = reader.read_uint()
+    data = reader.read_bytes()
+    return data.hex().upper() if kind == _HEX_CONVERSATION_ID else data.decode("utf-8")
+
+
+def _write_uint(buf: bytearray, n: int) -> None:
+    while n >= 0x80:
+        buf.append(n & 0x7F | 0x80)
+        n >>= 7
+    buf.append(n)
+
+
+def _write_int(buf: bytearray, n: int) -> None:
+    _write_uint(buf, n * 2 if n >= 0 else -n * 2 - 1)
+
+
+def _write_bytes(buf: bytearray, data: bytes) -> None:
+    _write_uint(buf, len(data))
+    buf += data
+
+
+class _Reader:
+    def __init__(self, data: bytes):
+        self._data = data
+        self._pos = 0
+
+    def _byte(self) -> int:
+        if self._pos >= len(self._data):
+            raise ValueError("encoded entries are truncated")
+        self._pos += 1
+        return self._data[self._pos - 1]
+
+    def read_uint(self) -> int:
+        n, shift = 0, 0
+        for b in self._iter_varint_bytes():
+            n |= (b & 0x7F) << shift
+            shift += 7
+        return n
+
+    def read_int(self) -> int:
+        n = self.read_uint()
+        return n // 2 if n % 2 == 0 else -(n + 1) // 2
+
+    def read_bytes(self) -> bytes:
+        length = self.read_uint()
+        if self._pos + length > len(self._data):
+            raise ValueError("encoded entries are truncated")
+        self._pos += length
+        return self._data[self._pos - length : self._pos]
+
+    def at_end(self) -> bool:
+        return self._pos == len(self._data)
+
+    def _iter_varint_bytes(self) -> Iterator[int]:
+        while True:
+            b = self._byte()
+            yield b
+            if b < 0x80:
+                return
@@ -1,14 +1,14 @@
-from contextlib import contextmanager
+import threading
+from typing import Any, Dict, Iterable
 
-import pandas as pd
 from sqlalchemy import Column, String
 from sqlalchemy.dialects.sqlite import insert
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.orm import Query
 
 from utils.config import DB_ENGINE
+from utils.db import Base, get_session
 
-Base = declarative_base()
+_MAX_SQL_VARIABLES = 500  # sqlite limits the number of bound parameters in a query
 
 
 class ConvIdToExportName(Base):  # type: ignore
@@ -19,21 +19,45 @@ class ConvIdToExportName(Base):  # type: ignore
 
 Base.metadata.create_all(DB_ENGINE)
 
-_Session = sessionmaker(bind=DB_ENGINE)
+# conversation_id -> export name ("" for ids without one), this process is the only writer of the table
+_export_name_cache: Dict[str, str] = {}
+_cache_generation = 0  # bumped on every change of the cache, names read while it changed may be stale
+_cache_lock = threading.Lock()
 
 
-@contextmanager
-def get_session() -> Session:
-    """Returns a session object with commit/rollback functionality as a context."""
-    session = _Session()
-    try:
-        yield session
-        session.commit()
-    except Exception:  # noqa
-        session.rollback()
-        raise
-    finally:
-        session.close()
+def get_export_names(conversation_ids: Iterable[str]) -> Dict[str, str]:
+    """Returns the safe names for export of $conversation_ids, "" for ids without one in the DB.
+
+    Ids that aren't cached yet are read in a single query, names (and missing names) are cached for the process.
+    Names upserted while the query runs win over the names it read.
+    Args:
+        conversation_ids: unique ids of the meetings
+    """
+    conversation_ids = list(conversation_ids)
+    with _cache_lock:
+        ret = {conv_id: _export_name_cache[conv_id] for conv_id in conversation_ids if conv_id in _export_name_cache}
+        generation = _cache_generation
+    missing_ids = list({conv_id for conv_id in conversation_ids if conv_id not in ret})
+    if len(missing_ids) == 0:
+        return ret
+
+    read_names = dict.fromkeys(missing_ids, "")
+    with get_session() as sess:
+        for chunk_start in range(0, len(missing_ids), _MAX_SQL_VARIABLES):
+            rows: Query[Any] = sess.query(ConvIdToExportName.conversation_id, ConvIdToExportName.exported_name).filter(
+                ConvIdToExportName.conversation_id.in_(missing_ids[chunk_start : chunk_start + _MAX_SQL_VARIABLES])
+            )
+            read_names.update({row.conversation_id: row.exported_name or "" for row in rows})
+
+    with _cache_lock:
+        if _cache_generation == generation:
+            _export_name_cache.update(read_names)
+        else:  # names were upserted during the read, they are newer than the read ones, which aren't cached
+            read_names.update(
+                {conv_id: _export_name_cache[conv_id] for conv_id in read_names if conv_id in _export_name_cache}
+            )
+    ret.update(read_names)
+    return ret
 
 
 def get_export_name(conversation_id: str) -> str:
@@ -42,17 +66,31 @@ def get_export_name(conversation_id: str) -> str:
     Args:
         conversation_id: unique id for the meeting
     """
-    ret_df = pd.read_sql(
-        f"""
-        select {ConvIdToExportName.exported_name.name} as name
-        from {ConvIdToExportName.__tablename__} where {ConvIdToExportName.conversation_id.name}='{conversation_id}'
-        """,
-        con=DB_ENGINE,
-    )
+    return get_export_names([conversation_id])[conversation_id]
 
-    if len(ret_df) != 0:
-        return ret_df.iloc[0]["name"]  # type: ignore
-    return ""
+
+def upsert_export_names(export_names: Dict[str, str]) -> None:
+    """Update/Insert the export names of several conversation ids in a single transaction.
+
+    Args:
+        export_names: dict of conversation id (unique id for the meeting) to the name to export for it
+    """
+    if len(export_names) == 0:
+        return
+    insert_stmt = insert(ConvIdToExportName)
+    upsert_stmt = insert_stmt.on_conflict_do_update(
+        index_elements=[ConvIdToExportName.conversation_id.name],
+        set_=dict(exported_name=insert_stmt.excluded.exported_name),
+    )
+    with get_session() as sess:
+        sess.execute(
+            upsert_stmt,
+            [dict(conversation_id=conv_id, exported_name=name) for conv_id, name in export_names.items()],
+        )
+    global _cache_generation
+    with _cache_lock:
+        _export_name_cache.update(export_names)
+        _cache_generation += 1
 
 
 def upsert_export_name(conversation_id: str, export_name: str) -> None:
@@ -62,16 +100,15 @@ def upsert_export_name(conversation_id: str, export_name: str) -> None:
         conversation_id: unique id for the meeting
         export_name: name to export for conv
     """
-    with get_session() as sess:
-        insert_stmt = insert(ConvIdToExportName).values(conversation_id=conversation_id, exported_name=export_name)
-        upsert_stmt = insert_stmt.on_conflict_do_update(
-            index_elements=[ConvIdToExportName.conversation_id.name], set_=dict(exported_name=export_name)
-        )
-        sess.execute(upsert_stmt)
+    upsert_export_names({conversation_id: export_name})
+
 
-    assert (
-        get_export_name(conversation_id) == export_name
-    ), f"{get_export_name(conversation_id)} == {export_name}\n {upsert_stmt}"
+def clear_export_name_cache() -> None:
+    """Drops the cached names, e.g. after the table was changed by another process."""
+    global _cache_generation
+    with _cache_lock:
+        _export_name_cache.clear()
+        _cache_generation += 1
 
 
 if __name__ == "__main__":
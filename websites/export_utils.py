@@ -1,34 +1,87 @@
+import dataclasses
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 import streamlit as st
 
 from utils.outlook_reader.outlook_event import OutlookCalendarEntry
-from websites.export_storage import get_export_name
+from utils.qr.chunks import is_chunk, QrChunkAssembler
+from utils.qr.generate import create_qr_pngs
+from websites.export_codec import decode_entries, encode_entries
+from websites.export_storage import get_export_name, get_export_names
 
 SPLIT_STR = "984651651"
+CODEC_MARKER = "$"  # starts the payloads of export_codec, never the first character of a legacy payload
 
 
 def export_entry_list_as_str(entries: List[OutlookCalendarEntry]) -> str:
     """Export list of outlook entries as clean string for QR consumption."""
+    return str(st.secrets["unique_identifier"]) + _export_payload(entries)
+
+
+def export_entry_list_as_qr_pngs(entries: List[OutlookCalendarEntry], importer_url: str) -> List[bytes]:
+    """Export list of outlook entries as PNG QR codes of $importer_url, split into several moderately sized codes.
+
+    Each code holds a chunk of the payload (see utils.qr.chunks), read them with add_exported_chunk().
+    """
+    return exported_str_as_qr_pngs(export_entry_list_as_str(entries), importer_url)
+
+
+def exported_str_as_qr_pngs(exported_str: str, importer_url: str) -> List[bytes]:
+    """Same as export_entry_list_as_qr_pngs() for a string already exported by export_entry_list_as_str()."""
+    return create_qr_pngs([importer_url, str(st.secrets["unique_identifier"])], _strip_unique_identifier(exported_str))
+
+
+def _export_payload(entries: List[OutlookCalendarEntry]) -> str:
+    export_names = get_export_names(ent.conversation_id for ent in entries)
+    export_entries = [dataclasses.replace(ent, subject=export_names[ent.conversation_id]) for ent in entries]
+    return CODEC_MARKER + encode_entries(export_entries)
+
+
+def export_entry_list_as_legacy_str(entries: List[OutlookCalendarEntry]) -> str:
+    """Export list of outlook entries in the format used before export_codec, for importers that predate it."""
+    get_export_names(ent.conversation_id for ent in entries)  # caches the names export_entry_clean_str() looks up
     return str(st.secrets["unique_identifier"]) + SPLIT_STR.join([export_entry_clean_str(ent) for ent in entries])
 
 
 def read_exported_str_to_entry_list(exported_str: str) -> List[OutlookCalendarEntry]:
-    """Read string read from the QR code, assumes it was generated by export_entry_list_as_str()."""
+    """Read string read from the QR code, assumes it was generated by export_entry_list_as_str().
+
+    Strings in the legacy format (export_entry_list_as_legacy_str()) are still supported.
+    """
+    exporter_str = _strip_unique_identifier(exported_str)
+    if exporter_str.startswith(CODEC_MARKER):
+        return decode_entries(exporter_str[len(CODEC_MARKER) :])
+    return [import_from_clean_str(repr_s) for repr_s in exporter_str.split(SPLIT_STR)]
+
+
+def is_exported_chunk(exported_str: str) -> bool:
+    """Whether $exported_str is one of several QR codes created by export_entry_list_as_qr_pngs()."""
+    return is_chunk(_strip_unique_identifier(exported_str))
+
+
+def add_exported_chunk(exported_str: str, assembler: QrChunkAssembler) -> Optional[str]:
+    """Add a chunk read from a QR code to $assembler.
+
+    Returns:
+        The whole exported string (for read_exported_str_to_entry_list()) if it was the last missing chunk, else None
+    """
+    payload = assembler.add(_strip_unique_identifier(exported_str))
+    return None if payload is None else str(st.secrets["unique_identifier"]) + payload
+
+
+def _strip_unique_identifier(exported_str: str) -> str:
     assert (
         exported_str[: len(st.secrets["unique_identifier"])] == st.secrets["unique_identifier"]
     ), "QR code was generated with this id at the beginning"
-
-    exporter_str = exported_str[len(st.secrets["unique_identifier"]) :]
-    return [import_from_clean_str(repr_s) for repr_s in exporter_str.split(SPLIT_STR)]
+    return exported_str[len(st.secrets["unique_identifier"]) :]
 
 
 _KEYS = sorted(["subject", "start_date", "end_date", "location", "busystatus", "categories_colors", "conversation_id"])
 
 
 def _export_relevant_items(ent: OutlookCalendarEntry) -> Dict[str, object]:
-    relevant_vals = {k: ent.__dict__[k].upper() if isinstance(ent.__dict__[k], str) else ent.__dict__[k] for k in _KEYS}
+    relevant_vals = {k: getattr(ent, k).upper() if isinstance(getattr(ent, k), str) else getattr(ent, k) for k in _KEYS}
     relevant_vals["categories_colors"] = ent.categories_colors[:1]
     relevant_vals["subject"] = get_export_name(conversation_id=ent.conversation_id)
     return relevant_vals
@@ -4,6 +4,7 @@ import os.path
 import sys
 import time
 from pathlib import Path
+from typing import Callable
 
 import streamlit as st
 from google.oauth2 import service_account
@@ -16,12 +17,27 @@ sys.path.append(str(_root_path))
 
 from utils.google_calendar.events import upsert_gc_event_from_outlook_entry  # pylint: disable=C0413
 from utils.google_calendar.general import create_gc_object, GC_SECRET_JSON_PATH  # pylint: disable=C0413
+from utils.profiling import profiling_from_env  # pylint: disable=C0413
+from utils.qr.chunks import QrChunkAssembler  # pylint: disable=C0413
 from utils.streamlit_utils import streamlit_run_js  # pylint: disable=C0413
-from websites.export_utils import read_exported_str_to_entry_list  # pylint: disable=C0413
+from websites.export_utils import (  # pylint: disable=C0413
+    add_exported_chunk,
+    is_exported_chunk,
+    read_exported_str_to_entry_list,
+)
 
 logger = logging.getLogger(__name__)
 
 
+def _create_chunk_assembler() -> QrChunkAssembler:
+    """Chunks of a multi QR export arrive in separate sessions (one per scan), collect them server-side."""
+    return QrChunkAssembler()
+
+
+# wrapped without decorator syntax, an untyped decorator would leave the function untyped
+get_chunk_assembler: Callable[[], QrChunkAssembler] = st.experimental_singleton(_create_chunk_assembler)
+
+
 def main() -> None:
     st.header("Google Calendar Importer Website")
     if not os.path.exists(GC_SECRET_JSON_PATH):
@@ -30,7 +46,15 @@ def main() -> None:
 
     ctx = get_report_ctx()
     query_str = ctx.query_string
-    print("query_str\n" + query_str)
+    logger.debug("query_str\n%s", query_str)
+    if query_str != "" and is_exported_chunk(query_str):
+        exported_str = add_exported_chunk(query_str, get_chunk_assembler())
+        if exported_str is None:
+            received, total = get_chunk_assembler().progress(query_str)
+            st.info(f"Received {received}/{total} QR codes of this export, scan the next one")
+            return
+        query_str = exported_str
+
     if query_str != "":
         entry_list = read_exported_str_to_entry_list(query_str)
         st.text(str(entry_list))
@@ -45,7 +69,7 @@ def main() -> None:
         gc = create_gc_object(st.secrets["gc_calendar_id"], credentials)
 
         for outlook_entry in stqdm(entry_list):
-            print(outlook_entry)
+            logger.debug("upserting %s", outlook_entry)
             upsert_gc_event_from_outlook_entry(gc, outlook_entry)
         st.balloons()
         st.success("DONE!")
@@ -65,4 +89,5 @@ if __name__ == "__main__":
 
     logger.setLevel(level=logging.DEBUG)  # if DEBUG else logging.INFO
 
-    main()
+    with profiling_from_env():
+        main()
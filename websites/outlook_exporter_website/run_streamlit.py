@@ -1,16 +1,62 @@
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+
 import streamlit as st
 
 from utils.outlook_reader.calendar import get_current_user_outlook_calendar, read_local_outlook_calendar
-from utils.qr.generate import create_qr_image
-from websites.export_storage import get_export_name, upsert_export_name
-from websites.export_utils import export_entry_list_as_str
+from utils.outlook_reader.outlook_event import OutlookCalendarEntry
+from websites.export_storage import get_export_names, upsert_export_names
+from websites.export_utils import export_entry_list_as_str, exported_str_as_qr_pngs
+
+IMPORTER_URL = (
+    "https://share.streamlit.io/jonzarecki/outlook-exporter/websites/google_calendar_importer_website/run_streamlit.py?"
+)
+SNAPSHOT_TTL_S = float(os.environ.get("OUTLOOK_SNAPSHOT_TTL_S", 300))
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class OutlookSnapshot:
+    entries: List[OutlookCalendarEntry]
+    read_at: float  # time.time() of the read
+    read_seconds: float  # duration of the COM read
+
+
+def get_outlook_snapshot(days_ahead: int, refresh: bool = False) -> OutlookSnapshot:
+    """Returns the calendar entries of the next $days_ahead days, read over COM at most once per SNAPSHOT_TTL_S.
+
+    Streamlit re-runs the script on every input, the snapshot is kept in the session's state per $days_ahead.
+    """
+    key = f"outlook_snapshot_{days_ahead}"
+    snapshot: Optional[OutlookSnapshot] = st.session_state.get(key)
+    if refresh or snapshot is None or time.time() - snapshot.read_at > SNAPSHOT_TTL_S:
+        start_t = time.perf_counter()
+        entries = read_local_outlook_calendar(get_current_user_outlook_calendar(), days_ahead)
+        snapshot = OutlookSnapshot(entries, time.time(), time.perf_counter() - start_t)
+        st.session_state[key] = snapshot
+    return snapshot
+
 
 if __name__ == "__main__":
+    run_start_t = time.perf_counter()
     st.header("Outlook Exporter")
-    days_ahead = st.number_input("Enter number of days ahead to export", value=4, min_value=1, max_value=30)
-    calendar = get_current_user_outlook_calendar()
-    entries = read_local_outlook_calendar(calendar, days_ahead)
+    days_ahead = st.number_input("Enter number of days ahead to export", value=4, min_value=1, max_value=90)
+    refresh = st.button("Refresh from Outlook")
+
+    snapshot_start_t = time.perf_counter()
+    snapshot = get_outlook_snapshot(days_ahead, refresh)
+    snapshot_seconds = time.perf_counter() - snapshot_start_t
+    entries = snapshot.entries
+    st.caption(
+        f"Outlook snapshot from {time.time() - snapshot.read_at:.0f}s ago (read in {snapshot.read_seconds:.2f}s), "
+        f"took {snapshot_seconds:.3f}s in this run"
+    )
 
+    saved_names = get_export_names(ent.conversation_id for ent in entries)
     saved_inputs = []
     for ent in entries:
         col1, col2 = st.beta_columns(2)
@@ -19,28 +65,33 @@ if __name__ == "__main__":
             f"<h2 style='text-align: center; vertical-align: middle'>{ent.subject}</h2>", unsafe_allow_html=True
         )
 
-        saved_val = get_export_name(conversation_id=ent.conversation_id)  # is "" if not saved
+        saved_val = saved_names[ent.conversation_id]  # is "" if not saved
         entered_export_name = col2.text_input(
             key=f"export_name_{ent.conversation_id}", label="enter_export_name", value=saved_val
         )
         saved_inputs.append((ent.conversation_id, saved_val, entered_export_name))
 
-    exported_str = export_entry_list_as_str(entries)
+    if st.button("Save export names"):
+        changed_names = {
+            conversation_id: entered_export_name
+            for (conversation_id, saved_val, entered_export_name) in saved_inputs
+            if entered_export_name != saved_val
+        }
+        upsert_export_names(changed_names)
+        logger.info("saved %d new export names", len(changed_names))
+
+    exported_str = export_entry_list_as_str(entries)  # encoded once for the text and the QR codes
     st.text(exported_str)
     st.text(str(len(exported_str)))
 
-    if st.button("Save export names"):
-        for (conversation_id, saved_val, entered_export_name) in saved_inputs:
-            if entered_export_name != saved_val:
-                upsert_export_name(conversation_id, entered_export_name)
-                print(f"saved new value for {entered_export_name}")
-
-    st.image(
-        create_qr_image(
-            [
-                "https://share.streamlit.io/jonzarecki/outlook-exporter/websites/"
-                "google_calendar_importer_website/run_streamlit.py?",
-                exported_str,
-            ]
-        ),
+    qr_pngs = exported_str_as_qr_pngs(exported_str, IMPORTER_URL)
+    if len(qr_pngs) > 1:
+        st.info(f"The export is split into {len(qr_pngs)} QR codes, scan all of them (in any order)")
+    for i, qr_png in enumerate(qr_pngs):
+        st.image(qr_png, caption=f"{i + 1}/{len(qr_pngs)}" if len(qr_pngs) > 1 else None)
+
+    logger.info(
+        "exporter run took %.3fs, %.3fs of it getting the outlook snapshot",
+        time.perf_counter() - run_start_t,
+        snapshot_seconds,
     )